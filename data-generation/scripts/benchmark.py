@@ -0,0 +1,287 @@
+"""
+Generator and KPI Benchmarks
+Measures rows/sec and peak RSS for each generator engine, the compliance
+rule set and timings for the standard local content KPI queries, saves the
+results as JSON and compares them against a stored baseline (a slowdown
+beyond the tolerance fails)
+Each case runs in a fresh process so peak RSS is attributable to that case
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.normpath(os.path.join(SCRIPTS_DIR, '..', 'benchmarks', 'results.json'))
+DEFAULT_BASELINE = os.path.normpath(os.path.join(SCRIPTS_DIR, '..', 'benchmarks', 'baseline.json'))
+
+DEFAULT_SCALES = [1000, 100000, 10000000]
+
+# Allowed slowdown (or memory growth) relative to the baseline before a check fails
+DEFAULT_TOLERANCE = 0.25
+
+# Registry size used for procurement benchmarks
+PROCUREMENT_SUPPLIERS = 500
+
+# Approximate performance rows per supplier (quarters since registration)
+PERFORMANCE_ROWS_PER_SUPPLIER = 39
+
+QUERY_REPEATS = 20
+
+# Short runs are repeated (best time kept) until this much time is measured
+MIN_MEASURE_SECONDS = 2.0
+MAX_RUN_REPEATS = 10
+
+# Row-at-a-time engines are skipped above this scale unless --full is given
+LOOP_ENGINE_MAX_ROWS = 100000
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _registry(num_suppliers):
+    from generate_suppliers import SupplierGenerator
+    return SupplierGenerator(num_suppliers=num_suppliers).generate_suppliers_vectorized(seed=1)
+
+
+def _procurement_generator(rows, workdir):
+    from generate_procurement import ProcurementGenerator
+    return ProcurementGenerator(num_transactions=rows, supplier_df=_registry(PROCUREMENT_SUPPLIERS))
+
+
+def _performance_generator(rows, workdir):
+    from generate_supplier_performance import PerformanceGenerator
+    num_suppliers = max(1, rows // PERFORMANCE_ROWS_PER_SUPPLIER)
+    return PerformanceGenerator(supplier_df=_registry(num_suppliers))
+
+
+def _setup_suppliers(rows, workdir):
+    from generate_suppliers import SupplierGenerator
+    generator = SupplierGenerator(num_suppliers=rows)
+    generator.contact_pools()  # one-off pool sampling is setup, not per-row cost
+    return generator
+
+
+def _setup_nadef(rows, workdir):
+    from generate_nadef_projects import NADeFGenerator
+    return NADeFGenerator(num_projects=rows)
+
+
+def _setup_kpis(rows, workdir):
+    generator = _procurement_generator(rows, workdir)
+    transactions_df = pd.concat(generator.iter_transaction_batches(seed=1), ignore_index=True)
+    return transactions_df, generator.supplier_df
+
+
+def _kpi_queries(data):
+    """Build the cube, then run the standard KPI queries"""
+    from local_content_kpis import LocalContentCube
+
+    transactions_df, supplier_df = data
+    timings = {}
+
+    started = time.perf_counter()
+    cube = LocalContentCube(transactions_df, supplier_df)
+    timings['cube_build'] = time.perf_counter() - started
+
+    queries = {
+        'overall': lambda: cube.query(),
+        'by_year': lambda: [cube.query(year=y) for y in range(cube.first_year, cube.last_year + 1)],
+        'local_tiers_2024': lambda: cube.query(year=2024, classification=['Local-Local', 'Ghanaian Owned']),
+        'financial_services': lambda: cube.query(category='Financial Services'),
+        'spend_by_classification': lambda: cube.spend_by_classification(),
+        'classification_distribution': lambda: cube.classification_distribution()
+    }
+    # Best of several repeats: sub-millisecond timings are otherwise dominated by noise
+    for name, query in queries.items():
+        repeats = []
+        for _ in range(QUERY_REPEATS):
+            started = time.perf_counter()
+            query()
+            repeats.append(time.perf_counter() - started)
+        timings[name] = min(repeats)
+    return timings
+
+
+def _compliance_rules(data):
+    """Evaluate the LI 2431 rule set over the ledger"""
+    from compliance_rules import RuleEngine
+
+    transactions_df, supplier_df = data
+    RuleEngine().evaluate(transactions_df, supplier_df)
+    return len(transactions_df)
+
+
+# name -> (setup(rows, workdir), run(setup_result) -> rows or timings, row-at-a-time engine)
+CASES = {
+    'suppliers.generate_suppliers': (_setup_suppliers, lambda g: len(g.generate_suppliers()), True),
+    'suppliers.vectorized': (_setup_suppliers, lambda g: len(g.generate_suppliers_vectorized()), False),
+    'procurement.generate_transactions': (_procurement_generator, lambda g: len(g.generate_transactions()), True),
+    'procurement.streamed': (
+        _procurement_generator, lambda g: sum(len(b) for b in g.iter_transaction_batches()), False),
+    'performance.generate_performance': (_performance_generator, lambda g: len(g.generate_performance()), True),
+    'performance.streamed': (
+        _performance_generator, lambda g: sum(len(b) for b in g.iter_performance_batches()), False),
+    'nadef.generate_projects': (_setup_nadef, lambda g: len(g.generate_projects()), True),
+    'kpi.local_content_queries': (_setup_kpis, _kpi_queries, False),
+    'compliance.rules': (_setup_kpis, _compliance_rules, False)
+}
+
+
+def _run_case(name, rows):
+    """Child-process body: set up, time the run and report peak RSS"""
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    setup, run, _ = CASES[name]
+    with tempfile.TemporaryDirectory() as workdir:
+        data = setup(rows, workdir)
+        rss_before = _peak_rss_mb()
+        timings = []
+        while sum(timings) < MIN_MEASURE_SECONDS and len(timings) < MAX_RUN_REPEATS:
+            started = time.perf_counter()
+            outcome = run(data)
+            timings.append(time.perf_counter() - started)
+        seconds = min(timings)
+
+    result = {'case': name, 'scale': rows, 'seconds': seconds, 'repeats': len(timings),
+              'peak_rss_mb': _peak_rss_mb(), 'setup_rss_mb': rss_before}
+    if isinstance(outcome, dict):
+        result['timings'] = outcome
+    else:
+        result['rows'] = outcome
+        result['rows_per_sec'] = outcome / seconds if seconds else None
+    return result
+
+
+def run_benchmarks(cases=None, scales=DEFAULT_SCALES, full=False):
+    """Run every (case, scale) in its own process; returns a list of results"""
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for name in cases or CASES:
+        loop_engine = CASES[name][2]
+        for rows in scales:
+            if loop_engine and rows > LOOP_ENGINE_MAX_ROWS and not full:
+                results.append({'case': name, 'scale': rows, 'skipped': 'row-at-a-time engine (use --full)'})
+                continue
+            with context.Pool(processes=1, maxtasksperchild=1) as pool:
+                results.append(pool.apply(_run_case, (name, rows)))
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Regressions of results against a baseline run (slower, or more memory)"""
+
+    previous = {(entry['case'], entry['scale']): entry for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry['case'], entry['scale']))
+        if before is None or 'skipped' in entry or 'skipped' in before:
+            continue
+        label = f"{entry['case']} @ {entry['scale']:,}"
+
+        if entry.get('rows_per_sec') and before.get('rows_per_sec'):
+            if entry['rows_per_sec'] < before['rows_per_sec'] * (1 - tolerance):
+                regressions.append(
+                    f"{label}: {entry['rows_per_sec']:,.0f} rows/s vs baseline {before['rows_per_sec']:,.0f}")
+        for query, seconds in entry.get('timings', {}).items():
+            reference = before.get('timings', {}).get(query)
+            if reference and seconds > reference * (1 + tolerance):
+                regressions.append(f"{label} [{query}]: {seconds * 1e3:.3f}ms vs baseline {reference * 1e3:.3f}ms")
+        if entry.get('peak_rss_mb') and before.get('peak_rss_mb'):
+            if entry['peak_rss_mb'] > before['peak_rss_mb'] * (1 + tolerance):
+                regressions.append(
+                    f"{label}: peak RSS {entry['peak_rss_mb']:,.0f}MB vs baseline {before['peak_rss_mb']:,.0f}MB")
+    return regressions
+
+
+def _environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__
+    }
+
+
+def _write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump(payload, handle, indent=2)
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description='Benchmark generators and KPI queries')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=None)
+    parser.add_argument('--scales', nargs='+', type=int, default=DEFAULT_SCALES)
+    parser.add_argument('--full', action='store_true',
+                        help=f'Also run row-at-a-time engines above {LOOP_ENGINE_MAX_ROWS:,} rows')
+    parser.add_argument('--output', default=DEFAULT_RESULTS)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    print("Running Benchmarks...")
+    print("-" * 50)
+
+    results = run_benchmarks(args.cases, args.scales, args.full)
+    payload = {'environment': _environment(), 'results': results}
+    _write_json(args.output, payload)
+
+    print("\nResults:")
+    for entry in results:
+        label = f"  {entry['case']:<36} {entry['scale']:>12,}"
+        if 'skipped' in entry:
+            print(f"{label}  skipped: {entry['skipped']}")
+        elif 'timings' in entry:
+            queries = ', '.join(f"{name} {seconds * 1e3:.2f}ms" for name, seconds in entry['timings'].items())
+            print(f"{label}  {queries}  peak {entry['peak_rss_mb']:,.0f}MB")
+        else:
+            print(f"{label}  {entry['rows_per_sec']:>12,.0f} rows/s  peak {entry['peak_rss_mb']:,.0f}MB")
+    print(f"\nResults saved to: {args.output}")
+
+    exit_code = 0
+    if args.update_baseline:
+        _write_json(args.baseline, payload)
+        print(f"Baseline updated: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        if regressions:
+            exit_code = 1
+            print(f"\nRegressions (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+        else:
+            print("No regressions against the baseline")
+    else:
+        print(f"No baseline at {args.baseline} (run with --update-baseline to create one)")
+
+    print("-" * 50)
+    print("Benchmarks Complete!")
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Supplier Classification History
+Generates time-versioned supplier tiers (SUPPLIER_CLASSIFICATION_HISTORY):
+each supplier starts at a tier on its registration date and may move up the
+Ghanaian ownership ladder before reaching its current registry tier.
+Versions carry valid_from / valid_to ranges (valid_to exclusive, empty for
+the current version), and an as-of index answers "which tier applied on
+this date" by binary search
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from output_formats import write_dataset
+from streaming import format_ids
+
+# Tier ladder, lowest Ghanaian participation first (upward movement = supplier development)
+TIER_LADDER = ['International', 'Ghanaian Registered', 'Ghanaian Participation',
+               'Ghanaian Owned', 'Local-Local']
+
+# Ownership percentage bounds per ladder rung (as drawn by the supplier generator)
+TIER_OWNERSHIP = np.array([[0, 0], [0, 20], [10, 50], [51, 95], [80, 100]], dtype=float)
+
+# Probability of 0, 1 or 2 earlier tiers, by current rung (International never moves,
+# and development starts no lower than Ghanaian Registered)
+DEVELOPMENT_PROBABILITIES = np.array([
+    [1.00, 0.00, 0.00],
+    [1.00, 0.00, 0.00],
+    [0.70, 0.30, 0.00],
+    [0.55, 0.35, 0.10],
+    [0.70, 0.25, 0.05]
+])
+
+# Last date covered by the generated history
+HISTORY_END = '2025-09-30'
+
+# Supplier code / day packing for the single sorted key of the as-of index
+_DAY_OFFSET = 1 << 31
+
+
+def epoch_days(dates):
+    """Dates (strings or datetimes) as int64 days since the epoch (NaT -> min int64)
+
+    Only the distinct values are parsed: transaction tables repeat a few
+    thousand dates across millions of rows.
+    """
+    codes, uniques = pd.factorize(pd.Series(dates), use_na_sentinel=False)
+    values = pd.to_datetime(pd.Series(uniques)).to_numpy().astype('datetime64[D]')
+    return values.astype(np.int64)[codes]
+
+
+def _codes(index, values):
+    """Positions of values in index (-1 where absent), matching distinct values only"""
+    codes, uniques = pd.factorize(pd.Series(values))
+    return np.where(codes >= 0, index.get_indexer(uniques)[codes], -1).astype(np.int64)
+
+
+def generate_history(supplier_df, seed=42, history_end=HISTORY_END):
+    """Classification history for a supplier registry, one row per tier version
+
+    The latest version of every supplier matches its registry classification
+    and ownership; earlier versions sit one rung lower each, with ownership
+    drawn from that tier's range (never above the following version).
+    """
+
+    # A child stream: the registry itself is drawn from default_rng(seed), and
+    # reusing that stream would tie tier movements to the tier draws
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(
+        np.random.SeedSequence(seed).spawn(1)[0])
+    n = len(supplier_df)
+    ladder = pd.Index(TIER_LADDER)
+    rung = ladder.get_indexer(supplier_df['classification'])
+    if (rung < 0).any():
+        raise KeyError(supplier_df['classification'][rung < 0].iloc[0])
+
+    registered = epoch_days(supplier_df['registration_date'])
+    span = np.int64(np.datetime64(history_end, 'D').astype(np.int64)) - registered
+
+    # Number of earlier tiers (room is needed in the calendar for each move)
+    probabilities = DEVELOPMENT_PROBABILITIES[rung].cumsum(axis=1)
+    earlier = (rng.random(n)[:, None] >= probabilities).sum(axis=1)
+    earlier = np.where(span > 2 * earlier, earlier, 0)
+
+    # One row per version, grouped by supplier, oldest first
+    counts = earlier + 1
+    supplier_pos = np.repeat(np.arange(n), counts)
+    version = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    moves = earlier[supplier_pos]
+    version_rung = rung[supplier_pos] - (moves - version)
+
+    # Move dates: sorted uniform draws after registration, strictly increasing
+    u = np.where(version == 0, -1.0, rng.random(len(version)))
+    u = u[np.lexsort((u, supplier_pos))]
+    offset = 1 + np.floor(u * (span[supplier_pos] - moves)).astype(np.int64) + (version - 1)
+    valid_from = registered[supplier_pos] + np.where(version == 0, 0, offset)
+
+    is_current = version == moves
+    valid_to = np.where(is_current, np.iinfo(np.int64).min, np.roll(valid_from, -1))
+
+    # Ownership: registry value now, tier-range draws before, never decreasing over time
+    low, high = TIER_OWNERSHIP[version_rung, 0], TIER_OWNERSHIP[version_rung, 1]
+    ownership = np.round(rng.uniform(low, high), 1)
+    current_ownership = supplier_df['ownership_percentage'].to_numpy(dtype=float)
+    ownership[is_current] = current_ownership[supplier_pos[is_current]]
+    for step in range(int(moves.max()) if len(moves) else 0):
+        earlier_rows = np.flatnonzero(version == moves - step - 1)
+        ownership[earlier_rows] = np.fmin(ownership[earlier_rows], ownership[earlier_rows + 1])
+
+    to_date = lambda days: np.datetime_as_string(days.astype('datetime64[D]'), unit='D')
+    return pd.DataFrame({
+        'history_id': format_ids('CLH', 1, len(version), 6),
+        'supplier_id': supplier_df['supplier_id'].to_numpy()[supplier_pos],
+        'classification': np.asarray(TIER_LADDER)[version_rung],
+        'ownership_percentage': ownership,
+        'valid_from': to_date(valid_from),
+        'valid_to': np.where(is_current, None, to_date(np.where(is_current, 0, valid_to))),
+        'change_reason': np.where(version == 0, 'Registration', 'Supplier Development')
+    })
+
+
+class AsOfIndex:
+    """Sorted (supplier, valid_from) index over a classification history
+
+    Versions are packed into one sorted int64 key (supplier code in the
+    high bits, valid_from day in the low bits), so finding the version in
+    force for any (supplier, date) is one binary search: O(log n) per
+    lookup, vectorized over any number of lookups.
+    """
+
+    def __init__(self, history_df):
+        codes, self.suppliers = pd.factorize(history_df['supplier_id'])
+        start = epoch_days(history_df['valid_from'])
+        end = epoch_days(history_df['valid_to'])
+        end = np.where(history_df['valid_to'].isna().to_numpy(), np.iinfo(np.int64).max, end)
+
+        order = np.lexsort((start, codes))
+        self.history = history_df.iloc[order].reset_index(drop=True)
+        self._codes = codes[order].astype(np.int64)
+        self._start = start[order]
+        self._end = end[order]
+        self._keys = (self._codes << 32) | (self._start + _DAY_OFFSET)
+        # First version of each supplier code
+        self._first = np.searchsorted(self._codes, np.arange(len(self.suppliers)))
+        self._classification = self.history['classification'].to_numpy()
+        self._ownership = self.history['ownership_percentage'].to_numpy(dtype=float)
+
+    def positions(self, supplier_ids, dates, extend_initial=False):
+        """History row positions in force for each (supplier, date); -1 where none
+
+        With extend_initial, dates before a supplier's first version resolve
+        to that first version (e.g. transactions dated before registration).
+        """
+
+        codes = _codes(self.suppliers, supplier_ids)
+        days = epoch_days(dates)
+        known = codes >= 0
+        keys = (np.where(known, codes, 0) << 32) | (days + _DAY_OFFSET)
+        pos = np.searchsorted(self._keys, keys, side='right') - 1
+
+        safe = np.maximum(pos, 0)
+        found = known & (pos >= 0) & (self._codes[safe] == codes)
+        in_force = found & (days < self._end[safe])
+        positions = np.where(in_force, pos, -1)
+        if extend_initial:
+            before_first = known & ~found
+            positions[before_first] = self._first[codes[before_first]]
+        return positions
+
+    def classification_at(self, supplier_ids, dates, extend_initial=False):
+        """Tier in force for each (supplier, date); None where no version applies"""
+        positions = self.positions(supplier_ids, dates, extend_initial)
+        return np.where(positions >= 0, self._classification[positions], None)
+
+    def ownership_at(self, supplier_ids, dates, extend_initial=False):
+        """Ownership percentage in force for each (supplier, date); NaN where none"""
+        positions = self.positions(supplier_ids, dates, extend_initial)
+        return np.where(positions >= 0, self._ownership[positions], np.nan)
+
+    def as_of(self, supplier_id, date):
+        """The history row (dict) in force for one supplier on one date, or None"""
+        position = self.positions([supplier_id], [date])[0]
+        return None if position < 0 else self.history.iloc[position].to_dict()
+
+    def versions(self, supplier_id):
+        """All versions of one supplier, oldest first"""
+        code = self.suppliers.get_loc(supplier_id)
+        stop = self._first[code + 1] if code + 1 < len(self._first) else len(self.history)
+        return self.history.iloc[self._first[code]:stop]
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description="Generate supplier classification history")
+    parser.add_argument('--suppliers', default='../output/supplier_registry.csv')
+    parser.add_argument('--transactions', default='../output/procurement_transactions.csv',
+                        help="Attribute these transactions to the tier in force on their date (skipped if absent)")
+    parser.add_argument('--output', default='../output/supplier_classification_history.csv')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("Starting Supplier Classification History Generation...")
+    print("-" * 50)
+
+    supplier_df = pd.read_csv(args.suppliers)
+    history_df = generate_history(supplier_df, seed=args.seed)
+    index = AsOfIndex(history_df)
+
+    movers = history_df.loc[history_df['change_reason'] == 'Supplier Development', 'supplier_id'].nunique()
+    print(f"\nSuppliers: {len(supplier_df)}")
+    print(f"History Versions: {len(history_df)}")
+    print(f"Suppliers with Upward Tier Movements: {movers}")
+
+    print("\nUpward Movements by Tier Reached:")
+    print(history_df.loc[history_df['change_reason'] == 'Supplier Development', 'classification'].value_counts())
+
+    example = history_df.loc[history_df['change_reason'] == 'Supplier Development', 'supplier_id']
+    if len(example):
+        supplier_id = example.iloc[0]
+        print(f"\nTier History for {supplier_id}:")
+        versions = index.versions(supplier_id)
+        print(versions[['classification', 'ownership_percentage', 'valid_from', 'valid_to']].to_string(index=False))
+        as_of_date = versions['valid_from'].iloc[0]
+        print(f"Tier of {supplier_id} on {as_of_date}: {index.as_of(supplier_id, as_of_date)['classification']}")
+
+    if os.path.exists(args.transactions):
+        transactions_df = pd.read_csv(args.transactions, usecols=['supplier_id', 'transaction_date'])
+        as_of_tier = index.classification_at(transactions_df['supplier_id'], transactions_df['transaction_date'],
+                                             extend_initial=True)
+        current_tier = transactions_df['supplier_id'].map(supplier_df.set_index('supplier_id')['classification'])
+        changed = (as_of_tier != current_tier.to_numpy()) & current_tier.notna().to_numpy()
+        print(f"\nTransactions Attributed to an Earlier Tier: {changed.sum():,} of {len(transactions_df):,}")
+
+    write_dataset(history_df, args.output, 'history')
+    print(f"\nData saved to: {args.output}")
+    print("-" * 50)
+    print("Supplier Classification History Generation Complete!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Community Investment ROI Engine
+Pre-aggregated cube for the Community investment ROI KPI
+(docs/business-requirements.md): impact_score / (actual_spend_usd / budget_usd)
+plus cost per beneficiary and budget efficiency, by community, category,
+year and implementing partner
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from local_content_kpis import as_list
+
+AXES = ['year', 'community', 'category', 'implementing_partner']
+
+
+def project_roi(projects_df):
+    """Per-project ROI, NaN where it is undefined
+
+    ROI needs an impact score (Planning and On Hold projects have none) and
+    a positive budget and actual spend.
+    """
+
+    impact = pd.to_numeric(projects_df['impact_score'], errors='coerce').to_numpy(dtype=float)
+    budget = projects_df['budget_usd'].to_numpy(dtype=float)
+    spend = projects_df['actual_spend_usd'].to_numpy(dtype=float)
+    defined = ~np.isnan(impact) & (budget > 0) & (spend > 0)
+    roi = np.full(len(projects_df), np.nan)
+    roi[defined] = impact[defined] * budget[defined] / spend[defined]
+    return roi
+
+
+def _ratio(numerator, denominator):
+    """Elementwise numerator / denominator, NaN where the denominator is zero"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+class CommunityInvestmentCube:
+    """Dense cube of additive project measures by year x community x category x partner
+
+    Ratios (ROI, cost per beneficiary, budget efficiency) are derived from
+    the summed measures at query time, so every rollup is exact and rows
+    without an ROI only drop out of the ROI measures. Rollups are cached.
+    """
+
+    MEASURES = [
+        'projects', 'budget_usd', 'actual_spend_usd', 'beneficiaries',
+        'scored_projects', 'roi_sum', 'impact_sum', 'scored_budget_usd', 'scored_spend_usd'
+    ]
+
+    def __init__(self, projects_df):
+        year = pd.to_datetime(projects_df['start_date']).dt.year.to_numpy()
+        self.first_year = int(year.min()) if len(projects_df) else 0
+        self.last_year = int(year.max()) if len(projects_df) else -1
+
+        codes = [year - self.first_year]
+        self.labels = {'year': np.arange(self.first_year, self.last_year + 1)}
+        for axis in AXES[1:]:
+            axis_codes, labels = pd.factorize(projects_df[axis].fillna('Unknown'), sort=True)
+            codes.append(axis_codes)
+            self.labels[axis] = np.asarray(labels)
+        self.shape = tuple(len(self.labels[axis]) for axis in AXES)
+
+        flat = np.ravel_multi_index(codes, self.shape)
+        size = int(np.prod(self.shape))
+
+        budget = projects_df['budget_usd'].to_numpy(dtype=float)
+        spend = projects_df['actual_spend_usd'].to_numpy(dtype=float)
+        roi = project_roi(projects_df)
+        scored = ~np.isnan(roi)
+        impact = pd.to_numeric(projects_df['impact_score'], errors='coerce').to_numpy(dtype=float)
+
+        weights = [
+            None, budget, spend, projects_df['beneficiaries_count'].to_numpy(dtype=float),
+            scored.astype(float), np.where(scored, roi, 0.0), np.where(scored, impact, 0.0),
+            np.where(scored, budget, 0.0), np.where(scored, spend, 0.0)
+        ]
+        self.cube = np.stack([
+            np.bincount(flat, weights=w, minlength=size).astype(float) for w in weights
+        ]).reshape((len(self.MEASURES),) + self.shape)
+
+        self._label_index = {
+            axis: {label: i for i, label in enumerate(self.labels[axis])} for axis in AXES
+        }
+        self._rollups = {}
+
+    def _select(self, filters):
+        """Sub-cube of all measures for {axis: value(s)} filters"""
+
+        cube = self.cube
+        for axis_number, axis in enumerate(AXES, start=1):
+            values = as_list(filters.get(axis))
+            if values is None:
+                continue
+            positions = [self._label_index[axis].get(v) for v in values]
+            cube = cube.take([p for p in positions if p is not None], axis=axis_number)
+        return cube
+
+    @staticmethod
+    def _metrics(totals):
+        """KPI columns from summed measures (first axis = MEASURES)"""
+
+        m = dict(zip(CommunityInvestmentCube.MEASURES, totals))
+        return {
+            'projects': m['projects'],
+            'budget_usd': m['budget_usd'],
+            'actual_spend_usd': m['actual_spend_usd'],
+            'beneficiaries': m['beneficiaries'],
+            'scored_projects': m['scored_projects'],
+            # Mean of the per-project ROI over projects where it is defined
+            'mean_roi': _ratio(m['roi_sum'], m['scored_projects']),
+            # The same formula applied to the aggregate: mean impact / (spend / budget)
+            'portfolio_roi': _ratio(_ratio(m['impact_sum'], m['scored_projects']),
+                                    _ratio(m['scored_spend_usd'], m['scored_budget_usd'])),
+            'cost_per_beneficiary_usd': _ratio(m['actual_spend_usd'], m['beneficiaries']),
+            'budget_efficiency': _ratio(m['actual_spend_usd'], m['budget_usd'])
+        }
+
+    def query(self, **filters):
+        """Portfolio KPIs for any combination of year/community/category/implementing_partner filters"""
+
+        unknown = set(filters) - set(AXES)
+        if unknown:
+            raise ValueError(f"Unknown filter(s) {sorted(unknown)}, expected {AXES}")
+        totals = self._select(filters).reshape(len(self.MEASURES), -1).sum(axis=1)
+        return {name: float(value) for name, value in self._metrics(totals).items()}
+
+    def rollup(self, by, **filters):
+        """KPIs grouped by one or more axes (DataFrame, empty groups dropped); cached"""
+
+        by = as_list(by)
+        key = (tuple(by), tuple(sorted((axis, tuple(as_list(v))) for axis, v in filters.items() if v is not None)))
+        if key not in self._rollups:
+            cube = self._select(filters)
+            summed_axes = tuple(i + 1 for i, axis in enumerate(AXES) if axis not in by)
+            totals = cube.sum(axis=summed_axes)
+            kept = [axis for axis in AXES if axis in by]
+            totals = totals.reshape(len(self.MEASURES), -1)
+            nonempty = np.flatnonzero(totals[0])
+
+            kept_shape = [self._axis_length(cube, axis) for axis in kept]
+            positions = np.unravel_index(nonempty, kept_shape)
+            frame = pd.DataFrame({
+                axis: self._axis_labels(axis, filters)[pos] for axis, pos in zip(kept, positions)
+            })
+            for name, values in self._metrics(totals[:, nonempty]).items():
+                frame[name] = values
+            frame['projects'] = frame['projects'].astype(int)
+            frame['scored_projects'] = frame['scored_projects'].astype(int)
+            self._rollups[key] = frame[by + [c for c in frame.columns if c not in by]]
+        return self._rollups[key].copy()
+
+    def _axis_labels(self, axis, filters):
+        """Labels along an axis after filtering (same order as _select)"""
+        values = as_list(filters.get(axis))
+        if values is None:
+            return self.labels[axis]
+        return np.array([v for v in values if v in self._label_index[axis]], dtype=self.labels[axis].dtype)
+
+    def _axis_length(self, cube, axis):
+        return cube.shape[AXES.index(axis) + 1]
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description="Community investment ROI analytics over NADeF projects")
+    parser.add_argument('--input', default='../output/nadef_projects.csv')
+    parser.add_argument('--by', nargs='+', choices=AXES, default=['community'],
+                        help="Axes for the written rollup")
+    parser.add_argument('--output', help="Write the rollup as CSV to this path")
+    args = parser.parse_args()
+
+    print("Building Community Investment ROI Cube...")
+    print("-" * 50)
+
+    projects_df = pd.read_csv(args.input)
+    cube = CommunityInvestmentCube(projects_df)
+
+    overall = cube.query()
+    print(f"\nProjects: {overall['projects']:,.0f} ({overall['scored_projects']:,.0f} with a defined ROI)")
+    print(f"Total Budget: ${overall['budget_usd']:,.2f}")
+    print(f"Total Spend: ${overall['actual_spend_usd']:,.2f}")
+    print(f"Budget Efficiency (spend / budget): {overall['budget_efficiency']:.2f}")
+    print(f"Mean Project ROI: {overall['mean_roi']:.2f}")
+    print(f"Portfolio ROI: {overall['portfolio_roi']:.2f}")
+    print(f"Cost per Beneficiary: ${overall['cost_per_beneficiary_usd']:,.2f}")
+
+    columns = ['projects', 'mean_roi', 'cost_per_beneficiary_usd', 'budget_efficiency']
+    for axis in ['community', 'category', 'implementing_partner']:
+        print(f"\nROI by {axis.replace('_', ' ').title()}:")
+        print(cube.rollup(axis).set_index(axis)[columns].sort_values('mean_roi', ascending=False).round(2))
+
+    if args.output:
+        cube.rollup(args.by).to_csv(args.output, index=False)
+        print(f"\nRollup by {', '.join(args.by)} saved to: {args.output}")
+
+    print("-" * 50)
+    print("Community Investment ROI Calculation Complete!")
+
+if __name__ == "__main__":
+    main()
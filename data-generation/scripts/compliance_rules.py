@@ -0,0 +1,296 @@
+"""
+LI 2431 Compliance Rule Engine
+Evaluates the regulatory compliance matrix (docs/business-requirements.md)
+against the procurement ledger. Rules are declared in
+data-generation/config/compliance_rules.json and compiled to vectorized
+predicates: every column a rule refers to is factorized once and shared by
+all rules, a filter becomes a boolean lookup table over the column's codes,
+and share thresholds are bincount aggregates per group
+Rules on tables the pipeline does not generate are reported as skipped
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from scenario_config import CONFIG_DIR, GHS_PER_USD, read_scenario
+from classification_history import AsOfIndex
+
+DEFAULT_RULES = os.path.join(CONFIG_DIR, 'compliance_rules.json')
+
+# Columns derived from the transaction date rather than read from a table
+DATE_PARTS = ['year', 'quarter']
+
+
+def load_rules(path=None):
+    """Raw rule set dict (default rules when None) with any 'extends' chain resolved"""
+    return read_scenario(os.path.abspath(path or DEFAULT_RULES))
+
+
+class LedgerColumns:
+    """Procurement ledger columns as integer codes, resolved once and shared by all rules
+
+    A column may be a transaction column, a date part (year, quarter), a
+    supplier registry column (looked up through supplier_id) or
+    classification, which is the tier in force on the transaction date when
+    a classification history is given and the registry tier otherwise.
+    """
+
+    def __init__(self, transactions_df, supplier_df, history_df=None):
+        self.transactions_df = transactions_df
+        self.supplier_df = supplier_df
+        self.history = AsOfIndex(history_df) if history_df is not None else None
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.transactions_df)
+
+    def codes(self, column):
+        """(codes, labels) for a column; codes index labels, -1 where missing"""
+
+        if column not in self._columns:
+            self._columns[column] = self._resolve(column)
+        return self._columns[column]
+
+    def _resolve(self, column):
+        if column in DATE_PARTS:
+            day_codes, days = self.codes('transaction_date')
+            parts = getattr(pd.DatetimeIndex(pd.to_datetime(days)), column).to_numpy()
+            part_codes, labels = pd.factorize(parts, sort=True)
+            return np.where(day_codes >= 0, part_codes[day_codes], -1), labels
+        if column == 'classification':
+            return self._classification()
+        if column in self.transactions_df.columns:
+            return pd.factorize(self.transactions_df[column])
+        if column in self.supplier_df.columns:
+            supplier_codes, suppliers = self.codes('supplier_id')
+            values = pd.Series(suppliers).map(self.supplier_df.set_index('supplier_id')[column])
+            value_codes, labels = pd.factorize(values)
+            return np.where(supplier_codes >= 0, np.append(value_codes, -1)[supplier_codes], -1), labels
+        raise KeyError(f"Unknown column '{column}'")
+
+    def _classification(self):
+        """Supplier tier codes, point-in-time when a classification history is available"""
+
+        supplier_codes, suppliers = self.codes('supplier_id')
+        registry = pd.Series(suppliers).map(self.supplier_df.set_index('supplier_id')['classification'])
+        if self.history is None:
+            tier_codes, labels = pd.factorize(registry)
+            return np.where(supplier_codes >= 0, np.append(tier_codes, -1)[supplier_codes], -1), labels
+
+        labels = pd.Index(sorted(set(registry.dropna()) | set(self.history.history['classification'])))
+        day_codes, days = self.codes('transaction_date')
+        dates = pd.to_datetime(days).to_numpy().astype('datetime64[D]')[day_codes]
+        positions = self.history.positions(
+            pd.Categorical.from_codes(supplier_codes, suppliers), dates, extend_initial=True)
+        history_codes = labels.get_indexer(self.history.history['classification'])
+        registry_codes = np.append(labels.get_indexer(registry), -1)[supplier_codes]
+        return np.where(positions >= 0, history_codes[np.maximum(positions, 0)], registry_codes), labels
+
+    def value_usd(self):
+        """Contract values in USD (GHS rows converted)"""
+
+        if 'value_usd' not in self._columns:
+            currency_codes, currencies = self.codes('currency')
+            rate = np.append(np.where(np.asarray(currencies) == 'GHS', GHS_PER_USD, 1.0), 1.0)
+            value = self.transactions_df['contract_value_usd'].to_numpy(dtype=float)
+            self._columns['value_usd'] = value / rate[currency_codes]
+        return self._columns['value_usd']
+
+    def mask(self, filters):
+        """Rows matching every {column: [allowed values]} filter"""
+
+        mask = np.ones(len(self), dtype=bool)
+        for column, allowed in (filters or {}).items():
+            codes, labels = self.codes(column)
+            # Lookup table over the column's codes; the trailing slot is for missing values
+            table = np.append(pd.Index(labels).isin(allowed), False)
+            mask &= table[codes]
+        return mask
+
+    def groups(self, by):
+        """(group code per row, group labels) for a list of columns; one group when empty"""
+
+        if not by:
+            return np.zeros(len(self), dtype=np.int64), ['']
+        codes, labels = zip(*(self.codes(column) for column in by))
+        shape = tuple(len(label) + 1 for label in labels)
+        flat = np.ravel_multi_index([np.where(c >= 0, c, len(l)) for c, l in zip(codes, labels)], shape)
+        group_codes, used = pd.factorize(flat, sort=True)
+        positions = np.unravel_index(used, shape)
+        names = [', '.join(f"{column}={np.append(np.asarray(label, dtype=object), None)[p]}"
+                           for column, label, p in zip(by, labels, position))
+                 for position in zip(*positions)]
+        return group_codes, names
+
+
+def _percent(part, whole):
+    """part / whole * 100, NaN where whole is zero"""
+    out = np.full(len(whole), np.nan)
+    np.divide(part * 100.0, whole, out=out, where=whole != 0)
+    return out
+
+
+def _spend_shares(ledger, where, matching, by):
+    """In-scope rows, the in-scope rows matching a filter, and the matching share of spend per group"""
+
+    scope = ledger.mask(where)
+    matched = scope & ledger.mask(matching)
+    group_codes, names = ledger.groups(by)
+    value = ledger.value_usd()
+    total = np.bincount(group_codes[scope], weights=value[scope], minlength=len(names))
+    part = np.bincount(group_codes[matched], weights=value[matched], minlength=len(names))
+    return scope, matched, group_codes, names, total, _percent(part, total)
+
+
+def _split_by_group(rows, group_codes, num_groups):
+    """Row positions split into one array per group (positions stay in row order)"""
+    order = np.argsort(group_codes[rows], kind='stable')
+    bounds = np.searchsorted(group_codes[rows][order], np.arange(num_groups + 1))
+    return [rows[order[bounds[g]:bounds[g + 1]]] for g in range(num_groups)]
+
+
+class MinShareRule:
+    """At least min_percent of the spend in scope (where) must match numerator, per group"""
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.where = spec.get('where', {})
+        self.numerator = spec['numerator']
+        self.min_percent = float(spec['min_percent'])
+        self.by = spec.get('by', [])
+
+    def evaluate(self, ledger):
+        """One check per group; a failing group's offending rows are its in-scope rows outside the numerator"""
+
+        scope, matched, group_codes, names, total, share = _spend_shares(
+            ledger, self.where, self.numerator, self.by)
+        offending = _split_by_group(np.flatnonzero(scope & ~matched), group_codes, len(names))
+        return [(names[g], share[g], self.min_percent,
+                 offending[g] if share[g] < self.min_percent else offending[g][:0])
+                for g in np.flatnonzero(total > 0)]
+
+
+class RequireRule:
+    """Every row in scope (where) must match require; reported as the compliant share of spend"""
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.where = spec.get('where', {})
+        self.require = spec['require']
+        self.by = spec.get('by', [])
+
+    def evaluate(self, ledger):
+        """One check per group; offending rows are the in-scope rows failing the requirement"""
+
+        scope, compliant, group_codes, names, total, share = _spend_shares(
+            ledger, self.where, self.require, self.by)
+        offending = _split_by_group(np.flatnonzero(scope & ~compliant), group_codes, len(names))
+        return [(names[g], share[g], 100.0, offending[g]) for g in np.flatnonzero(total > 0)]
+
+
+RULE_TYPES = {
+    'min_share': MinShareRule,
+    'require': RequireRule
+}
+
+
+class RuleEngine:
+    """A rule set compiled once and evaluated against ledgers
+
+    Rules on tables other than procurement (e.g. employment data for
+    General Manager localization) cannot be evaluated on the generated data
+    and are listed in skipped with the reason.
+    """
+
+    def __init__(self, rules=None):
+        config = rules if isinstance(rules, dict) else load_rules(rules)
+        self.name = config.get('name', 'rules')
+        self.rules = []
+        self.skipped = []
+        for spec in config['rules']:
+            table = spec.get('table', 'procurement')
+            if table != 'procurement':
+                self.skipped.append((spec['name'], f"needs the '{table}' table, which is not generated"))
+                continue
+            if spec.get('type') not in RULE_TYPES:
+                raise ValueError(f"Unknown rule type '{spec.get('type')}' in {spec['name']}, "
+                                 f"expected one of {sorted(RULE_TYPES)}")
+            self.rules.append(RULE_TYPES[spec['type']](spec))
+
+    def evaluate(self, transactions_df, supplier_df, history_df=None):
+        """All rules over one ledger: a DataFrame with one row per rule and group
+
+        Columns: rule, group, measured_percent, limit_percent, passed,
+        violations (offending row count) and transaction_ids (their ids).
+        """
+
+        ledger = LedgerColumns(transactions_df, supplier_df, history_df)
+        transaction_ids = transactions_df['transaction_id'].to_numpy()
+        rows = []
+        for rule in self.rules:
+            for group, measured, limit, offending in rule.evaluate(ledger):
+                rows.append({
+                    'rule': rule.name,
+                    'group': group,
+                    'measured_percent': measured,
+                    'limit_percent': limit,
+                    'passed': len(offending) == 0,
+                    'violations': len(offending),
+                    'transaction_ids': transaction_ids[offending]
+                })
+        columns = ['rule', 'group', 'measured_percent', 'limit_percent', 'passed', 'violations', 'transaction_ids']
+        return pd.DataFrame(rows, columns=columns)
+
+
+def violation_list(checks):
+    """One row per (rule, group, offending transaction_id) from evaluate() output"""
+
+    failed = checks[~checks['passed']]
+    return pd.DataFrame({
+        'rule': np.repeat(failed['rule'].to_numpy(), failed['violations'].to_numpy()),
+        'group': np.repeat(failed['group'].to_numpy(), failed['violations'].to_numpy()),
+        'transaction_id': np.concatenate(failed['transaction_ids'].tolist()) if len(failed) else []
+    })
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description="Evaluate LI 2431 compliance rules against the procurement ledger")
+    parser.add_argument('--transactions', default='../output/procurement_transactions.csv')
+    parser.add_argument('--suppliers', default='../output/supplier_registry.csv')
+    parser.add_argument('--history', help="Classification history, to judge each transaction by the tier in force on its date")
+    parser.add_argument('--rules', help="Rule set (default: config/compliance_rules.json)")
+    parser.add_argument('--output', help="Write the violation list (rule, group, transaction_id) as CSV to this path")
+    args = parser.parse_args()
+
+    print("Evaluating LI 2431 Compliance Rules...")
+    print("-" * 50)
+
+    engine = RuleEngine(args.rules)
+    transactions_df = pd.read_csv(args.transactions)
+    supplier_df = pd.read_csv(args.suppliers)
+    history_df = pd.read_csv(args.history) if args.history else None
+    checks = engine.evaluate(transactions_df, supplier_df, history_df)
+
+    print(f"\nTransactions: {len(transactions_df):,}  Rules: {len(engine.rules)} evaluated, {len(engine.skipped)} skipped")
+    for rule, group in checks.groupby('rule', sort=False):
+        failed = group[~group['passed']]
+        print(f"\n{rule}: {len(failed)} of {len(group)} check(s) failed, {failed['violations'].sum():,} offending transactions")
+        print(group[['group', 'measured_percent', 'limit_percent', 'passed', 'violations']]
+              .round({'measured_percent': 1}).to_string(index=False))
+    for rule, reason in engine.skipped:
+        print(f"\n{rule}: skipped ({reason})")
+
+    if args.output:
+        violation_list(checks).to_csv(args.output, index=False)
+        print(f"\nViolation list saved to: {args.output}")
+
+    print("-" * 50)
+    print("Compliance Rule Evaluation Complete!")
+
+if __name__ == "__main__":
+    main()
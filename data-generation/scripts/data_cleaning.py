@@ -0,0 +1,198 @@
+"""
+Data Cleaning Pipeline
+Vectorized cleaning rules for the data quality issues injected by the
+generators; every rule reports how many defects it found or fixed (or, for
+normalization rules, how many values it rewrote)
+Rules are column-wise, so the pipeline can run chunk by chunk over a stream
+"""
+
+import pandas as pd
+import numpy as np
+
+from scenario_config import GHS_PER_USD
+
+# Robust z-score (median/MAD on log value) above which a contract is flagged
+OUTLIER_THRESHOLD = 3.5
+
+
+# Procurement rules
+
+def normalize_currency_rule(df, context):
+    """Convert GHS contract values back to USD"""
+    ghs = (df['currency'] == 'GHS').to_numpy()
+    df.loc[ghs, 'contract_value_usd'] = df.loc[ghs, 'contract_value_usd'] / GHS_PER_USD
+    df.loc[ghs, 'currency'] = 'USD'
+    return df, int(ghs.sum())
+
+
+def flag_missing_po_rule(df, context):
+    """Flag transactions without a PO number"""
+    df['po_missing'] = df['po_number'].isna()
+    return df, int(df['po_missing'].sum())
+
+
+def flag_missing_location_rule(df, context):
+    """Flag transactions without a delivery location"""
+    df['delivery_location_missing'] = df['delivery_location'].isna()
+    return df, int(df['delivery_location_missing'].sum())
+
+
+def flag_outlier_rule(df, context):
+    """Flag contract values far from their classification/category peers
+
+    Uses a robust z-score on log value: (x - median) / (1.4826 * MAD) within
+    each (classification, category) group. Run after currency normalization.
+    """
+
+    supplier_tiers = context.get('supplier_tiers')
+    if supplier_tiers is not None:
+        group_tier = df['supplier_id'].map(supplier_tiers).fillna('Unknown')
+    else:
+        group_tier = pd.Series('All', index=df.index)
+
+    log_value = np.log(df['contract_value_usd'].clip(lower=1.0))
+    groups = [group_tier, df['category']]
+    median = log_value.groupby(groups).transform('median')
+    mad = (log_value - median).abs().groupby(groups).transform('median')
+
+    robust_z = (log_value - median) / (1.4826 * mad.replace(0, np.nan))
+    df['value_outlier'] = (robust_z.abs() > context.get('outlier_threshold', OUTLIER_THRESHOLD)).fillna(False)
+    return df, int(df['value_outlier'].sum())
+
+
+# Supplier rules
+
+def canonicalize_name_rule(df, context):
+    """Canonical company name: collapse whitespace and unify Ltd/Limited
+
+    Counts the names rewritten, not defects: the generator spells legitimate
+    names with Ltd or Limited at random, so an injected variant cannot be
+    told apart from a correct name.
+    """
+    names = df['company_name'].astype('string')
+    cleaned = names.str.strip().str.replace(r'\s+', ' ', regex=True)
+    cleaned = cleaned.str.replace(r'\bLimited\b', 'Ltd', regex=True)
+    changed = (cleaned != names).fillna(False)
+    df['company_name'] = cleaned
+    return df, int(changed.sum())
+
+
+def round_ownership_rule(df, context):
+    """Round ownership percentages back to one decimal and clip to 0-100"""
+    ownership = df['ownership_percentage']
+    rounded = ownership.round(1).clip(0, 100)
+    changed = (rounded != ownership) & ownership.notna()
+    df['ownership_percentage'] = rounded
+    return df, int(changed.sum())
+
+
+def flag_missing_contact_rule(df, context):
+    """Count suppliers missing a phone number or email"""
+    missing = df['phone'].isna() | df['email'].isna()
+    df['contact_incomplete'] = missing
+    return df, int(missing.sum())
+
+
+def fill_certification_rule(df, context):
+    """Mark missing certification status as 'Unknown'"""
+    missing = df['certification_status'].isna()
+    df['certification_status'] = df['certification_status'].fillna('Unknown')
+    return df, int(missing.sum())
+
+
+PROCUREMENT_RULES = [
+    ('currency_normalization', normalize_currency_rule),
+    ('missing_po_number', flag_missing_po_rule),
+    ('missing_delivery_location', flag_missing_location_rule),
+    ('contract_value_outlier', flag_outlier_rule)
+]
+
+SUPPLIER_RULES = [
+    ('company_name_canonicalized', canonicalize_name_rule),
+    ('ownership_precision', round_ownership_rule),
+    ('missing_contact', flag_missing_contact_rule),
+    ('missing_certification', fill_certification_rule)
+]
+
+# Rules that rewrite values to a canonical form; their counts are not defects
+NORMALIZATION_RULES = {'company_name_canonicalized'}
+
+
+class CleaningPipeline:
+    """Ordered set of vectorized cleaning rules with per-rule defect counts"""
+
+    def __init__(self, rules, context=None):
+        self.rules = list(rules)
+        self.context = dict(context or {})
+        self.defect_counts = {name: 0 for name, _ in self.rules}
+        self.rows_processed = 0
+
+    @classmethod
+    def for_procurement(cls, supplier_df=None, outlier_threshold=OUTLIER_THRESHOLD):
+        """Pipeline for procurement_transactions (supplier tiers enable per-tier outliers)"""
+        context = {'outlier_threshold': outlier_threshold}
+        if supplier_df is not None:
+            context['supplier_tiers'] = supplier_df.set_index('supplier_id')['classification']
+        return cls(PROCUREMENT_RULES, context)
+
+    @classmethod
+    def for_suppliers(cls):
+        """Pipeline for supplier_registry"""
+        return cls(SUPPLIER_RULES)
+
+    def run(self, df):
+        """Clean one DataFrame (or chunk) and accumulate defect counts"""
+        df = df.copy()
+        for name, rule in self.rules:
+            df, count = rule(df, self.context)
+            self.defect_counts[name] += count
+        self.rows_processed += len(df)
+        return df
+
+    def run_chunks(self, chunks):
+        """Clean an iterable of chunks lazily (e.g. pd.read_csv(..., chunksize=...))
+
+        Outlier statistics are computed per chunk, so chunks should be large
+        enough (100k+ rows) for stable group medians.
+        """
+        for chunk in chunks:
+            yield self.run(chunk)
+
+    def report(self):
+        """Per-rule counts as a DataFrame; kind tells defects from normalized values"""
+        report = pd.DataFrame({
+            'rule': list(self.defect_counts),
+            'kind': ['normalized' if name in NORMALIZATION_RULES else 'defect' for name in self.defect_counts],
+            'count': list(self.defect_counts.values())
+        })
+        report['rate_pct'] = report['count'] / max(self.rows_processed, 1) * 100
+        return report
+
+
+def main():
+    """Main execution function"""
+
+    print("Starting Data Cleaning...")
+    print("-" * 50)
+
+    supplier_df = pd.read_csv('../output/supplier_registry.csv')
+    transactions_df = pd.read_csv('../output/procurement_transactions.csv')
+
+    supplier_pipeline = CleaningPipeline.for_suppliers()
+    clean_suppliers = supplier_pipeline.run(supplier_df)
+    print("\nSupplier Registry Defects:")
+    print(supplier_pipeline.report().to_string(index=False))
+
+    procurement_pipeline = CleaningPipeline.for_procurement(supplier_df)
+    clean_transactions = procurement_pipeline.run(transactions_df)
+    print("\nProcurement Transaction Defects:")
+    print(procurement_pipeline.report().to_string(index=False))
+
+    clean_suppliers.to_csv('../output/supplier_registry_clean.csv', index=False)
+    clean_transactions.to_csv('../output/procurement_transactions_clean.csv', index=False)
+    print("\nCleaned data saved to: ../output/*_clean.csv")
+    print("-" * 50)
+    print("Data Cleaning Complete!")
+
+if __name__ == "__main__":
+    main()
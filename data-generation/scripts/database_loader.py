@@ -0,0 +1,268 @@
+"""
+Database Loader
+Bulk loads the generated datasets into the SUPPLIERS, PROCUREMENT_TRANSACTIONS,
+SUPPLIER_PERFORMANCE and NADEF_PROJECTS tables of a SQLite or DuckDB store
+through SQLAlchemy; secondary indexes are built once, after the load
+"""
+
+import argparse
+import time
+
+import pandas as pd
+from sqlalchemy import (
+    MetaData, Table, Column, String, Integer, Float, Numeric, Date, Index,
+    create_engine, inspect, text
+)
+from sqlalchemy.schema import CreateIndex
+
+from instrumentation import phase
+from streaming import DEFAULT_BATCH_SIZE
+
+DEFAULT_DATABASE_URL = 'sqlite:///../output/local_content.db'
+
+# Dataset -> (table name, default CSV written by the generator)
+TABLES = {
+    'suppliers': ('suppliers', '../output/supplier_registry.csv'),
+    'procurement': ('procurement_transactions', '../output/procurement_transactions.csv'),
+    'performance': ('supplier_performance', '../output/supplier_performance.csv'),
+    'nadef': ('nadef_projects', '../output/nadef_projects.csv')
+}
+
+# Non-text columns per dataset (everything else is stored as VARCHAR)
+DATE_COLUMNS = {
+    'suppliers': ['registration_date'],
+    'procurement': ['transaction_date', 'contract_start_date', 'contract_end_date'],
+    'performance': ['assessment_date'],
+    'nadef': ['start_date', 'end_date']
+}
+INTEGER_COLUMNS = {
+    'suppliers': ['employees_count', 'founded_year'],
+    'procurement': ['contract_duration_months'],
+    'performance': ['year', 'quarter'],
+    'nadef': ['beneficiaries_count']
+}
+MONEY_COLUMNS = {
+    'suppliers': ['annual_revenue_usd'],
+    'procurement': ['contract_value_usd'],
+    'performance': [],
+    'nadef': ['budget_usd', 'actual_spend_usd']
+}
+FLOAT_COLUMNS = {
+    'suppliers': ['ownership_percentage', 'distance_from_mine_km'],
+    'procurement': ['local_content_percentage'],
+    'performance': [
+        'delivery_performance_pct', 'quality_score', 'cost_competitiveness_score',
+        'safety_compliance_score', 'contract_compliance_pct', 'innovation_score',
+        'capacity_utilization_pct', 'overall_score'
+    ],
+    'nadef': ['impact_score', 'completion_percentage']
+}
+
+# Secondary indexes for the compliance matrix and KPI queries, created after the load
+INDEXES = {
+    'suppliers': [['supplier_id'], ['classification']],
+    'procurement': [['supplier_id'], ['transaction_date'], ['category', 'transaction_date']],
+    'performance': [['supplier_id'], ['year', 'quarter']],
+    'nadef': [['community'], ['start_date']]
+}
+
+
+def _column_type(dataset, column):
+    if column in DATE_COLUMNS[dataset]:
+        return Date()
+    if column in INTEGER_COLUMNS[dataset]:
+        return Integer()
+    if column in MONEY_COLUMNS[dataset]:
+        return Numeric(18, 2)
+    if column in FLOAT_COLUMNS[dataset]:
+        return Float()
+    return String()
+
+
+def table_for(dataset, columns, metadata=None):
+    """SQLAlchemy Table for a dataset with the given column order"""
+
+    if dataset not in TABLES:
+        raise ValueError(f"Unknown dataset '{dataset}', expected one of {sorted(TABLES)}")
+    metadata = metadata if metadata is not None else MetaData()
+    table_name = TABLES[dataset][0]
+    return Table(
+        table_name, metadata,
+        *[Column(column, _column_type(dataset, column)) for column in columns])
+
+
+def _rows(df):
+    """DataFrame -> list of tuples with NaN/NaT replaced by None (DB-API parameters)
+
+    Datetime columns become ISO date strings, the storage form SQLite uses
+    for DATE columns.
+    """
+    columns = []
+    for _, column in df.items():
+        if pd.api.types.is_datetime64_any_dtype(column):
+            column = column.dt.strftime('%Y-%m-%d')
+        columns.append(column.astype(object).where(column.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+def _prepare_bulk_load(connection):
+    """Relax durability on SQLite while bulk loading (the load is re-runnable)"""
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('PRAGMA synchronous = OFF')
+        connection.exec_driver_sql('PRAGMA journal_mode = MEMORY')
+
+
+def create_indexes(engine, dataset):
+    """Build the secondary indexes for a loaded dataset"""
+
+    table_name = TABLES[dataset][0]
+    # Index DDL only needs the indexed columns; reflecting the table is not
+    # supported by every dialect (duckdb-engine on SQLAlchemy 2.1)
+    table = table_for(dataset, list(dict.fromkeys(c for columns in INDEXES[dataset] for c in columns)))
+    created = []
+    with engine.begin() as connection:
+        for columns in INDEXES[dataset]:
+            index = Index(f"ix_{table_name}_{'_'.join(columns)}", *[table.c[c] for c in columns])
+            if connection.dialect.name == 'duckdb':
+                # duckdb-engine cannot reflect indexes, so checkfirst would not see existing ones
+                connection.execute(CreateIndex(index, if_not_exists=True))
+            else:
+                index.create(connection, checkfirst=True)
+            created.append(index.name)
+    return created
+
+
+def _insert_batch(connection, table, batch):
+    """Insert one DataFrame batch using the fastest path the dialect offers"""
+
+    dialect = connection.dialect
+    if dialect.name == 'duckdb':
+        # Native columnar append: DuckDB scans the registered DataFrame directly
+        duck = connection.connection.driver_connection
+        duck.register('_load_batch', batch)
+        try:
+            duck.execute(f"INSERT INTO {table.name} SELECT * FROM _load_batch")
+        finally:
+            duck.unregister('_load_batch')
+    elif dialect.paramstyle == 'qmark':
+        # Plain DB-API executemany skips per-row SQLAlchemy parameter processing
+        placeholders = ', '.join(['?'] * len(table.columns))
+        connection.exec_driver_sql(f"INSERT INTO {table.name} VALUES ({placeholders})", _rows(batch))
+    else:
+        records = [dict(zip(batch.columns, row)) for row in _rows(batch)]
+        connection.execute(table.insert(), records)
+
+
+def load_batches(engine, dataset, batches, replace=True, build_indexes=True):
+    """Bulk insert an iterable of DataFrame batches into the dataset's table
+
+    Each batch is one executemany (or native append) inside its own
+    transaction. With replace, an existing table and its indexes are dropped
+    first. Returns the number of rows loaded.
+    """
+
+    batches = [batches] if isinstance(batches, pd.DataFrame) else batches
+    table = None
+    rows_loaded = 0
+
+    for batch in batches:
+        with engine.begin() as connection:
+            _prepare_bulk_load(connection)
+            if table is None:
+                table = table_for(dataset, list(batch.columns))
+                if replace:
+                    table.drop(connection, checkfirst=True)
+                table.create(connection, checkfirst=True)
+            with phase('write.database', rows=len(batch)):
+                _insert_batch(connection, table, batch)
+        rows_loaded += len(batch)
+
+    if build_indexes and table is not None:
+        with phase('write.database_indexes'):
+            create_indexes(engine, dataset)
+    return rows_loaded
+
+
+def load_csv(engine, dataset, csv_path=None, batch_size=DEFAULT_BATCH_SIZE, replace=True):
+    """Stream a generator CSV into its table in batch_size chunks"""
+
+    csv_path = csv_path or TABLES[dataset][1]
+    if engine.dialect.name == 'duckdb':
+        return _duckdb_copy(engine, dataset, csv_path, replace)
+
+    chunks = pd.read_csv(csv_path, chunksize=batch_size)
+    return load_batches(engine, dataset, chunks, replace=replace)
+
+
+def _duckdb_copy(engine, dataset, csv_path, replace):
+    """DuckDB native bulk path: COPY the CSV straight into the typed table"""
+
+    columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    table = table_for(dataset, columns)
+    with engine.begin() as connection:
+        if replace:
+            table.drop(connection, checkfirst=True)
+        table.create(connection, checkfirst=True)
+        # COPY takes the file as a string literal, so quotes in the path are doubled
+        path_literal = "'" + str(csv_path).replace("'", "''") + "'"
+        connection.exec_driver_sql(f"COPY {table.name} FROM {path_literal} (HEADER)")
+        rows_loaded = connection.execute(text(f"SELECT COUNT(*) FROM {table.name}")).scalar()
+    create_indexes(engine, dataset)
+    return rows_loaded
+
+
+def read_table(engine, dataset, columns=None):
+    """Read a loaded dataset back with the generators' CSV dtypes (ISO date strings)"""
+
+    # A plain query rather than read_sql_table, which needs table reflection
+    selected = '*' if columns is None else ', '.join(columns)
+    df = pd.read_sql_query(text(f"SELECT {selected} FROM {TABLES[dataset][0]}"), engine)
+    for column in DATE_COLUMNS[dataset]:
+        if column in df:
+            df[column] = pd.to_datetime(df[column]).dt.strftime('%Y-%m-%d')
+    return df
+
+
+def table_counts(engine):
+    """Row count of every loaded dataset table"""
+    existing = set(inspect(engine).get_table_names())
+    counts = {}
+    with engine.connect() as connection:
+        for dataset, (table_name, _) in TABLES.items():
+            if table_name in existing:
+                counts[table_name] = connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+    return counts
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description='Load generated datasets into a SQL database')
+    parser.add_argument('--database-url', default=DEFAULT_DATABASE_URL,
+                        help='SQLAlchemy URL, e.g. sqlite:///../output/local_content.db or duckdb:///../output/local_content.duckdb')
+    parser.add_argument('--datasets', nargs='+', choices=list(TABLES), default=list(TABLES),
+                        help='Datasets to load (default: all)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Rows per insert transaction (default: {DEFAULT_BATCH_SIZE})')
+    args = parser.parse_args()
+
+    print("Loading Datasets into Database...")
+    print("-" * 50)
+
+    engine = create_engine(args.database_url)
+    for dataset in args.datasets:
+        started = time.perf_counter()
+        rows = load_csv(engine, dataset, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"{TABLES[dataset][0]}: {rows:,} rows in {elapsed:.1f}s")
+
+    print("\nTable Row Counts:")
+    for table_name, count in table_counts(engine).items():
+        print(f"  {table_name}: {count:,}")
+
+    print(f"\nDatabase: {args.database_url}")
+    print("-" * 50)
+    print("Database Load Complete!")
+
+if __name__ == "__main__":
+    main()
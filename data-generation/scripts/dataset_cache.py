@@ -0,0 +1,127 @@
+"""
+Dataset Cache
+Content-addressed store for generated datasets: artifacts are keyed by
+generator, parameters, seed and code version, so repeat requests are served
+by a file copy instead of a regeneration. Least-recently-used entries are
+evicted when the cache grows past its disk budget
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'LOCAL_CONTENT_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'local-content-datasets'))
+
+# Disk budget for cached artifacts (bytes)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def cache_key(generator, params, seed, code_version):
+    """Stable key for one generator invocation"""
+    payload = {'generator': generator, 'params': params, 'seed': seed, 'code': code_version}
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+class DatasetCache:
+    """Directory of cached artifacts with an LRU disk budget
+
+    Each entry is <key><suffix> plus a <key>.json metadata sidecar. The
+    artifact's modification time records its last use.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _metadata_path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def _artifact_path(self, key):
+        """Path of a stored artifact (None when the key is not cached)"""
+        metadata = self.metadata(key)
+        if metadata is None:
+            return None
+        path = os.path.join(self.cache_dir, key + metadata['suffix'])
+        return path if os.path.exists(path) else None
+
+    def metadata(self, key):
+        """Metadata recorded with an entry, or None"""
+        try:
+            with open(self._metadata_path(key)) as handle:
+                return json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def __contains__(self, key):
+        return self._artifact_path(key) is not None
+
+    def fetch(self, key, destination):
+        """Copy a cached artifact to destination; returns its metadata or None on a miss"""
+
+        path = self._artifact_path(key)
+        if path is None:
+            return None
+        os.utime(path)  # mark as recently used
+        tmp_path = destination + '.partial'
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, destination)
+        return self.metadata(key)
+
+    def store(self, key, source_path, **metadata):
+        """Copy an artifact into the cache and evict old entries past the budget"""
+
+        suffix = os.path.splitext(source_path)[1]
+        path = os.path.join(self.cache_dir, key + suffix)
+        shutil.copyfile(source_path, path + '.partial')
+        os.replace(path + '.partial', path)
+
+        metadata['suffix'] = suffix
+        with open(self._metadata_path(key) + '.partial', 'w') as handle:
+            json.dump(metadata, handle, sort_keys=True)
+        os.replace(self._metadata_path(key) + '.partial', self._metadata_path(key))
+
+        self.evict()
+        return path
+
+    def entries(self):
+        """(key, path, size_bytes, last_used) of every entry, least recently used first"""
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            key, suffix = os.path.splitext(name)
+            if suffix in ('.json', '.partial'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            entries.append((key, path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[3])
+
+    def size_bytes(self):
+        return sum(entry[2] for entry in self.entries())
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits its budget"""
+
+        entries = self.entries()
+        total = sum(entry[2] for entry in entries)
+        evicted = []
+        for key, path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            if os.path.exists(self._metadata_path(key)):
+                os.remove(self._metadata_path(key))
+            total -= size
+            evicted.append(key)
+        return evicted
+
+    def clear(self):
+        """Remove every cached entry"""
+        for key, path, _, _ in self.entries():
+            os.remove(path)
+            if os.path.exists(self._metadata_path(key)):
+                os.remove(self._metadata_path(key))
@@ -0,0 +1,119 @@
+"""
+Defect Injection Engine
+Applies declarative data quality defect specs to generated DataFrames with
+whole-column masked operations (one positional write per defect action)
+Rates can be scaled up to stress-test the cleaning code
+"""
+
+import numpy as np
+
+
+class Defect:
+    """A share of rows (rate) that receives one or more actions
+
+    Rows are drawn once per defect, so every action of a defect hits the
+    same rows (e.g. a currency switch and the matching value conversion).
+    Actions are (column, kind, params) tuples built by missing(), set_value(),
+    scale(), scale_uniform(), jitter() and swap_text().
+    """
+
+    def __init__(self, name, rate, actions):
+        self.name = name
+        self.rate = rate
+        self.actions = actions
+
+    def __repr__(self):
+        return f"Defect({self.name!r}, rate={self.rate})"
+
+
+def missing(column):
+    """Blank the value (None / NaN)"""
+    return (column, 'missing', {})
+
+
+def set_value(column, value):
+    """Overwrite with a constant"""
+    return (column, 'set', {'value': value})
+
+
+def scale(column, factor):
+    """Multiply by a constant factor"""
+    return (column, 'scale', {'factor': factor})
+
+
+def scale_uniform(column, low, high):
+    """Multiply by a per-row factor drawn from U(low, high)"""
+    return (column, 'scale_uniform', {'low': low, 'high': high})
+
+
+def jitter(column, low, high, decimals=None):
+    """Add per-row noise drawn from U(low, high), optionally rounded"""
+    return (column, 'jitter', {'low': low, 'high': high, 'decimals': decimals})
+
+
+def swap_text(column, replacements):
+    """Replace the first matching (old, new) substring pair in each row"""
+    return (column, 'swap_text', {'replacements': replacements})
+
+
+def _numeric(df, column, positions):
+    values = df[column].to_numpy(dtype=float, copy=True)
+    return values, values[positions]
+
+
+def _swap_text(df, column, positions, replacements):
+    names = df[column].iloc[positions].astype(str)
+    remaining = np.ones(len(names), dtype=bool)
+    for old, new in replacements:
+        matched = remaining & names.str.contains(old, regex=False).to_numpy()
+        if matched.any():
+            df.iloc[positions[matched], df.columns.get_loc(column)] = (
+                names[matched].str.replace(old, new, regex=False).to_numpy())
+        remaining &= ~matched
+
+
+def apply_action(df, positions, action, rng):
+    """Apply one (column, kind, params) action to the rows at positions"""
+
+    column, kind, params = action
+    if kind == 'missing':
+        df.iloc[positions, df.columns.get_loc(column)] = None
+    elif kind == 'set':
+        df.iloc[positions, df.columns.get_loc(column)] = params['value']
+    elif kind == 'swap_text':
+        _swap_text(df, column, positions, params['replacements'])
+    elif kind in ('scale', 'scale_uniform', 'jitter'):
+        values, selected = _numeric(df, column, positions)
+        if kind == 'scale':
+            selected = selected * params['factor']
+        elif kind == 'scale_uniform':
+            selected = selected * rng.uniform(params['low'], params['high'], size=len(positions))
+        else:
+            selected = selected + rng.uniform(params['low'], params['high'], size=len(positions))
+            if params['decimals'] is not None:
+                selected = np.round(selected, params['decimals'])
+        values[positions] = selected
+        df[column] = values
+    else:
+        raise ValueError(f"Unknown defect action '{kind}'")
+
+
+def inject_defects(df, defects, rng=None, rate_scale=1.0):
+    """Apply defect specs to df in order; returns df (modified in place)
+
+    rng is a np.random.Generator, or the legacy global state when None. Each
+    defect draws int(len(df) * rate) distinct rows, then each action draws
+    its own random parameters, so a spec reproduces the equivalent
+    hand-written rng.choice / df.loc sequence exactly. rate_scale multiplies
+    every rate (capped at 1.0) for stress tests.
+    """
+
+    if rng is None:
+        rng = np.random
+    n = len(df)
+    for defect in defects:
+        rate = min(1.0, defect.rate * rate_scale)
+        positions = rng.choice(n, size=int(n * rate), replace=False)
+        for action in defect.actions:
+            apply_action(df, positions, action, rng)
+    return df
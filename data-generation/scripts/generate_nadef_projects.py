@@ -3,18 +3,28 @@ NADeF Community Projects Data Generator
 Generates Newmont Ahafo Development Foundation project data
 """
 
+import argparse
 import pandas as pd
 import numpy as np
+from sqlalchemy import create_engine
 import random
 from datetime import datetime, timedelta
 
+from streaming import DEFAULT_BATCH_SIZE, format_ids
+from output_formats import OUTPUT_FORMATS, output_path_for, write_dataset
+from database_loader import load_batches
+from instrumentation import phase, timed
+from scenario_config import load_scenario
+
 # Set random seeds
 np.random.seed(42)
 random.seed(42)
 
 class NADeFGenerator:
-    def __init__(self, num_projects=200):
+    def __init__(self, num_projects=200, scenario=None):
         self.num_projects = num_projects
+        # Business rules (path to a scenario file, a Scenario, or the default scenario)
+        self.scenario = load_scenario(scenario)
         
         # Communities near Ahafo mine
         self.communities = [
@@ -31,6 +41,10 @@ class NADeFGenerator:
         
         self.statuses = ['Planning', 'Active', 'Completed', 'On Hold', 'Cancelled']
         
+        # Project start window
+        self.start_date = datetime(2006, 1, 1)
+        self.end_date = datetime(2024, 12, 31)
+        
     def get_project_name(self, category, community):
         """Generate project name based on category"""
         names = {
@@ -49,165 +63,266 @@ class NADeFGenerator:
     
     def get_budget_range(self, category):
         """Budget ranges by project type"""
-        ranges = {
-            'Education': (25000, 150000),
-            'Healthcare': (50000, 200000),
-            'Infrastructure': (75000, 400000),
-            'Economic Development': (20000, 100000),
-            'Agriculture': (15000, 75000),
-            'Water & Sanitation': (40000, 180000),
-            'Skills Training': (30000, 120000),
-            'Youth Development': (20000, 80000),
-            'Women Empowerment': (10000, 50000),
-            'Environmental Conservation': (15000, 60000)
-        }
-        return ranges.get(category, (10000, 100000))
+        return self.scenario.budget_range(category)
     
     def get_project_duration(self, category):
         """Duration in months by project type"""
-        durations = {
-            'Education': [6, 9, 12, 18],
-            'Healthcare': [4, 6, 9, 12],
-            'Infrastructure': [8, 12, 18, 24],
-            'Economic Development': [3, 6, 9, 12],
-            'Agriculture': [6, 9, 12],
-            'Water & Sanitation': [4, 6, 8, 12],
-            'Skills Training': [3, 6, 9, 12],
-            'Youth Development': [6, 12, 18],
-            'Women Empowerment': [6, 9, 12],
-            'Environmental Conservation': [12, 18, 24, 36]
-        }
-        return random.choice(durations.get(category, [6, 12]))
+        return random.choice(self.scenario.duration_choices(category))
     
     def calculate_beneficiaries(self, category, budget):
         """Estimate beneficiaries based on category and budget"""
-        multipliers = {
-            'Education': 50,
-            'Healthcare': 200,
-            'Infrastructure': 500,
-            'Economic Development': 100,
-            'Agriculture': 75,
-            'Water & Sanitation': 300,
-            'Skills Training': 25,
-            'Youth Development': 150,
-            'Women Empowerment': 50,
-            'Environmental Conservation': 1000
-        }
         
-        multiplier = multipliers.get(category, 100)
+        multiplier = self.scenario.beneficiary_multiplier(category)
         beneficiaries = int(budget / 1000 * multiplier / 100)
-        return max(10, beneficiaries)
+        return max(self.scenario.min_beneficiaries, beneficiaries)
+    
+    def build_project(self, i):
+        """Build a single project record (i is the zero-based global row number)"""
+        
+        # Basic project info
+        category = random.choice(self.categories)
+        community = random.choice(self.communities)
+        project_name = self.get_project_name(category, community)
+        
+        # Budget
+        min_budget, max_budget = self.get_budget_range(category)
+        budget = np.random.uniform(min_budget, max_budget)
+        
+        # Project dates
+        start_date = self.start_date
+        end_date = self.end_date
+        days_between = (end_date - start_date).days
+        random_days = random.randint(0, days_between)
+        project_start = start_date + timedelta(days=random_days)
+        
+        duration_months = self.get_project_duration(category)
+        project_end = project_start + timedelta(days=duration_months * 30)
+        
+        # Status based on timeline
+        if project_end < datetime.now():
+            status = np.random.choice(['Completed', 'Cancelled'], p=[0.92, 0.08])
+        elif project_start <= datetime.now() <= project_end:
+            status = 'Active'
+        else:
+            status = np.random.choice(['Planning', 'On Hold'], p=[0.85, 0.15])
+        
+        # Actual spend based on status
+        if status == 'Completed':
+            actual_spend = budget * np.random.uniform(0.85, 1.15)
+        elif status == 'Active':
+            progress = (datetime.now() - project_start).days / (project_end - project_start).days
+            progress = max(0, min(1, progress))
+            actual_spend = budget * progress * np.random.uniform(0.8, 1.1)
+        elif status == 'Cancelled':
+            actual_spend = budget * np.random.uniform(0.1, 0.4)
+        else:  # Planning or On Hold
+            actual_spend = budget * np.random.uniform(0, 0.1)
+        
+        # Completion percentage
+        if status == 'Completed':
+            completion_pct = 100
+        elif status == 'Cancelled':
+            completion_pct = np.random.uniform(10, 40)
+        elif status == 'Active':
+            completion_pct = progress * 100
+        else:
+            completion_pct = 0
+        
+        # Beneficiaries
+        beneficiaries = self.calculate_beneficiaries(category, budget)
+        
+        # Impact score (only for completed projects)
+        if status == 'Completed':
+            budget_efficiency = actual_spend / budget if budget > 0 else 1
+            if 0.9 <= budget_efficiency <= 1.1:
+                impact_score = np.random.uniform(7, 10)
+            else:
+                impact_score = np.random.uniform(5, 8)
+        elif status == 'Active':
+            impact_score = np.random.uniform(6, 9)
+        elif status == 'Cancelled':
+            impact_score = np.random.uniform(1, 4)
+        else:
+            impact_score = None
+        
+        # Build project record
+        return {
+            'project_id': f'NAD{i+1:04d}',
+            'project_name': project_name,
+            'community': community,
+            'category': category,
+            'start_date': project_start.strftime('%Y-%m-%d'),
+            'end_date': project_end.strftime('%Y-%m-%d'),
+            'budget_usd': round(budget, 2),
+            'actual_spend_usd': round(actual_spend, 2),
+            'beneficiaries_count': beneficiaries,
+            'status': status,
+            'impact_score': round(impact_score, 1) if impact_score else None,
+            'completion_percentage': round(completion_pct, 1),
+            'project_manager': f'PM_{random.randint(1, 25):02d}',
+            'implementing_partner': random.choice([
+                'NADeF Direct', 'Local NGO', 'Government Partnership', 
+                'International NGO', 'Community-led'
+            ]),
+            'funding_source': random.choice([
+                'NADeF Core', 'Special Projects Fund', 'Partnership Fund'
+            ])
+        }
+    
+    @timed('nadef.generate_vectorized')
+    def generate_projects_vectorized(self, seed=42, start_index=0, size=None):
+        """Generate NADeF projects as whole NumPy arrays
+        
+        Same schema and distributions as build_project, drawn from a single
+        np.random.Generator; budgets, durations and beneficiaries come from
+        the scenario's coded-category lookup arrays. start_index offsets the
+        NAD numbering so batches can be chained.
+        """
+        
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        n = self.num_projects if size is None else size
+        
+        category = np.asarray(self.categories)[rng.integers(0, len(self.categories), size=n)]
+        community = np.asarray(self.communities)[rng.integers(0, len(self.communities), size=n)]
+        name_suffix = pd.Series([self.get_project_name(c, '').lstrip() for c in self.categories],
+                                index=self.categories)
+        project_name = pd.Series(community) + ' ' + name_suffix.reindex(category).to_numpy()
+        
+        # Budget
+        budget_bounds = self.scenario.budget_ranges(category)
+        budget = rng.uniform(budget_bounds[:, 0], budget_bounds[:, 1])
+        
+        # Project dates
+        start_date = np.datetime64(self.start_date.date(), 'D')
+        days_between = (np.datetime64(self.end_date.date(), 'D') - start_date).astype(int)
+        project_start = start_date + rng.integers(0, days_between + 1, size=n)
+        duration_months = self.scenario.sample_durations(rng, category)
+        project_end = project_start + duration_months * 30
+        
+        # Status based on timeline (codes index self.statuses)
+        today = np.datetime64(datetime.now(), 'D')
+        closed = np.where(rng.random(n) < 0.92, 2, 4)
+        upcoming = np.where(rng.random(n) < 0.85, 0, 3)
+        status_code = np.where(project_end < today, closed,
+                               np.where(project_start <= today, 1, upcoming))
+        status = np.asarray(self.statuses)[status_code]
+        is_active = status_code == 1
+        
+        # Actual spend as a share of budget, by status (Active also scales with progress)
+        span = np.maximum((project_end - project_start).astype(float), 1)
+        progress = np.clip((today - project_start).astype(float) / span, 0, 1)
+        spend_bounds = np.array([[0, 0.1], [0.8, 1.1], [0.85, 1.15], [0, 0.1], [0.1, 0.4]])
+        actual_spend = budget * rng.uniform(spend_bounds[status_code, 0], spend_bounds[status_code, 1])
+        actual_spend = np.where(is_active, actual_spend * progress, actual_spend)
+        
+        # Completion percentage
+        completion_pct = np.select(
+            [status_code == 2, status_code == 4, is_active],
+            [100.0, rng.uniform(10, 40, size=n), progress * 100], default=0.0)
+        
+        # Impact score, drawn from a 3-point range by status (none for Planning and On Hold)
+        efficient = np.abs(actual_spend / budget - 1) <= 0.1
+        impact_low = np.select(
+            [(status_code == 2) & efficient, status_code == 2, is_active, status_code == 4],
+            [7, 5, 6, 1], default=0)
+        impact_score = np.round(rng.uniform(impact_low, impact_low + 3), 1)
+        impact_score = np.where((status_code == 0) | (status_code == 3), np.nan, impact_score)
+        
+        partners = np.array(['NADeF Direct', 'Local NGO', 'Government Partnership',
+                             'International NGO', 'Community-led'])
+        funding_sources = np.array(['NADeF Core', 'Special Projects Fund', 'Partnership Fund'])
+        return pd.DataFrame({
+            'project_id': format_ids('NAD', start_index + 1, n, 4),
+            'project_name': project_name.to_numpy(),
+            'community': community,
+            'category': category,
+            'start_date': np.datetime_as_string(project_start, unit='D'),
+            'end_date': np.datetime_as_string(project_end, unit='D'),
+            'budget_usd': np.round(budget, 2),
+            'actual_spend_usd': np.round(actual_spend, 2),
+            'beneficiaries_count': self.scenario.beneficiaries(category, budget),
+            'status': status,
+            'impact_score': impact_score,
+            'completion_percentage': np.round(completion_pct, 1),
+            'project_manager': pd.Series(rng.integers(1, 26, size=n)).astype(str).str.zfill(2).radd('PM_').to_numpy(),
+            'implementing_partner': partners[rng.integers(0, len(partners), size=n)],
+            'funding_source': funding_sources[rng.integers(0, len(funding_sources), size=n)]
+        })
     
+    @timed('nadef.generate')
     def generate_projects(self):
         """Generate NADeF community projects"""
         
         projects = []
-        start_date = datetime(2006, 1, 1)
-        end_date = datetime(2024, 12, 31)
         
         for i in range(self.num_projects):
-            
-            # Basic project info
-            category = random.choice(self.categories)
-            community = random.choice(self.communities)
-            project_name = self.get_project_name(category, community)
-            
-            # Budget
-            min_budget, max_budget = self.get_budget_range(category)
-            budget = np.random.uniform(min_budget, max_budget)
-            
-            # Project dates
-            days_between = (end_date - start_date).days
-            random_days = random.randint(0, days_between)
-            project_start = start_date + timedelta(days=random_days)
-            
-            duration_months = self.get_project_duration(category)
-            project_end = project_start + timedelta(days=duration_months * 30)
-            
-            # Status based on timeline
-            if project_end < datetime.now():
-                status = np.random.choice(['Completed', 'Cancelled'], p=[0.92, 0.08])
-            elif project_start <= datetime.now() <= project_end:
-                status = 'Active'
-            else:
-                status = np.random.choice(['Planning', 'On Hold'], p=[0.85, 0.15])
-            
-            # Actual spend based on status
-            if status == 'Completed':
-                actual_spend = budget * np.random.uniform(0.85, 1.15)
-            elif status == 'Active':
-                progress = (datetime.now() - project_start).days / (project_end - project_start).days
-                progress = max(0, min(1, progress))
-                actual_spend = budget * progress * np.random.uniform(0.8, 1.1)
-            elif status == 'Cancelled':
-                actual_spend = budget * np.random.uniform(0.1, 0.4)
-            else:  # Planning or On Hold
-                actual_spend = budget * np.random.uniform(0, 0.1)
-            
-            # Completion percentage
-            if status == 'Completed':
-                completion_pct = 100
-            elif status == 'Cancelled':
-                completion_pct = np.random.uniform(10, 40)
-            elif status == 'Active':
-                completion_pct = progress * 100
-            else:
-                completion_pct = 0
-            
-            # Beneficiaries
-            beneficiaries = self.calculate_beneficiaries(category, budget)
-            
-            # Impact score (only for completed projects)
-            if status == 'Completed':
-                budget_efficiency = actual_spend / budget if budget > 0 else 1
-                if 0.9 <= budget_efficiency <= 1.1:
-                    impact_score = np.random.uniform(7, 10)
-                else:
-                    impact_score = np.random.uniform(5, 8)
-            elif status == 'Active':
-                impact_score = np.random.uniform(6, 9)
-            elif status == 'Cancelled':
-                impact_score = np.random.uniform(1, 4)
-            else:
-                impact_score = None
-            
-            # Build project record
-            project = {
-                'project_id': f'NAD{i+1:04d}',
-                'project_name': project_name,
-                'community': community,
-                'category': category,
-                'start_date': project_start.strftime('%Y-%m-%d'),
-                'end_date': project_end.strftime('%Y-%m-%d'),
-                'budget_usd': round(budget, 2),
-                'actual_spend_usd': round(actual_spend, 2),
-                'beneficiaries_count': beneficiaries,
-                'status': status,
-                'impact_score': round(impact_score, 1) if impact_score else None,
-                'completion_percentage': round(completion_pct, 1),
-                'project_manager': f'PM_{random.randint(1, 25):02d}',
-                'implementing_partner': random.choice([
-                    'NADeF Direct', 'Local NGO', 'Government Partnership', 
-                    'International NGO', 'Community-led'
-                ]),
-                'funding_source': random.choice([
-                    'NADeF Core', 'Special Projects Fund', 'Partnership Fund'
-                ])
-            }
-            
-            projects.append(project)
+            projects.append(self.build_project(i))
         
         return pd.DataFrame(projects)
+    
+    def iter_project_batches(self, batch_size=DEFAULT_BATCH_SIZE, vectorized=False, seed=42):
+        """Yield projects in batches of at most batch_size rows with continuous NAD ids
+        
+        With vectorized, batches come from generate_projects_vectorized and
+        share one Generator seeded with seed.
+        """
+        
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        for batch_start in range(0, self.num_projects, batch_size):
+            batch_end = min(batch_start + batch_size, self.num_projects)
+            if vectorized:
+                yield self.generate_projects_vectorized(seed=rng, start_index=batch_start,
+                                                        size=batch_end - batch_start)
+                continue
+            with phase('nadef.build_records', rows=batch_end - batch_start):
+                df = pd.DataFrame([self.build_project(i) for i in range(batch_start, batch_end)])
+            yield df
 
 def main():
     """Main execution function"""
     
+    parser = argparse.ArgumentParser(description="Generate NADeF community projects")
+    parser.add_argument('--num-projects', type=int, default=200)
+    parser.add_argument('--vectorized', action='store_true',
+                        help="Use the NumPy engine with the scenario's coded-category lookups")
+    parser.add_argument('--stream', action='store_true',
+                        help="Append fixed-size batches to the output instead of building one DataFrame")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+    parser.add_argument('--partition-by-year', action='store_true',
+                        help="Write year=YYYY partitions (parquet/arrow only)")
+    parser.add_argument('--database-url',
+                        help="Load projects into this SQLAlchemy database instead of a file")
+    parser.add_argument('--scenario', help="Scenario config with the business rules (default: config/default_scenario.json)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the vectorized engine")
+    args = parser.parse_args()
+    
     print("Starting NADeF Community Projects Data Generation...")
     print("-" * 50)
     
+    output_path = output_path_for('../output/nadef_projects.csv', args.format, args.partition_by_year)
+    generator = NADeFGenerator(num_projects=args.num_projects, scenario=args.scenario)
+    engine = create_engine(args.database_url) if args.database_url else None
+    if engine is not None:
+        output_path = args.database_url
+    
+    if args.stream:
+        batches = generator.iter_project_batches(args.batch_size, vectorized=args.vectorized, seed=args.seed)
+        if engine is not None:
+            rows = load_batches(engine, 'nadef', batches)
+        else:
+            rows = write_dataset(batches, output_path, 'nadef', args.format, args.partition_by_year)
+        print(f"\nTotal Projects Generated: {rows}")
+        print(f"Data streamed to: {output_path}")
+        print("-" * 50)
+        print("NADeF Community Projects Generation Complete!")
+        return
+    
     # Generate projects
-    generator = NADeFGenerator(num_projects=200)
-    projects_df = generator.generate_projects()
+    if args.vectorized:
+        projects_df = generator.generate_projects_vectorized(seed=args.seed)
+    else:
+        projects_df = generator.generate_projects()
     
     # Display summary
     print(f"\nTotal Projects Generated: {len(projects_df)}")
@@ -238,9 +353,11 @@ def main():
         avg_impact = completed_projects['impact_score'].mean()
         print(f"Average Impact Score (Completed): {avg_impact:.1f}/10")
     
-    # Save to CSV
-    output_path = '../output/nadef_projects.csv'
-    projects_df.to_csv(output_path, index=False)
+    # Save output
+    if engine is not None:
+        load_batches(engine, 'nadef', projects_df)
+    else:
+        write_dataset(projects_df, output_path, 'nadef', args.format, args.partition_by_year)
     print(f"\nData saved to: {output_path}")
     print("-" * 50)
     print("NADeF Community Projects Generation Complete!")
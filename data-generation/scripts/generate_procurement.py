@@ -3,19 +3,55 @@ Procurement Transactions Data Generator
 Generates realistic procurement transaction data with local content tracking
 """
 
+import argparse
 import pandas as pd
 import numpy as np
+from sqlalchemy import create_engine
 import random
 from datetime import datetime, timedelta
 
+from supplier_index import SupplierIndex, LocalPreferenceCurve
+from local_content_kpis import LocalContentCube
+from streaming import DEFAULT_BATCH_SIZE, format_ids
+from output_formats import OUTPUT_FORMATS, as_dataframe, output_path_for, write_dataset
+from database_loader import load_batches, read_table
+from instrumentation import phase, timed
+from scenario_config import GHS_PER_USD, load_scenario
+from defects import Defect, inject_defects, missing, scale, scale_uniform, set_value
+
 # Set random seeds
 np.random.seed(42)
 random.seed(42)
 
 class ProcurementGenerator:
-    def __init__(self, supplier_file='../output/supplier_registry.csv', num_transactions=5000):
+    # Intentional data quality issues, applied in order
+    DEFECTS = [
+        Defect('missing_po_number', 0.03, [missing('po_number')]),
+        # Currency mixing - some in GHS instead of USD, converted at the approximate rate
+        Defect('ghs_currency', 0.05, [
+            set_value('currency', 'GHS'),
+            scale('contract_value_usd', GHS_PER_USD)
+        ]),
+        Defect('missing_delivery_location', 0.02, [missing('delivery_location')]),
+        Defect('outlier_contract_value', 0.01, [scale_uniform('contract_value_usd', 5, 10)])
+    ]
+    
+    def __init__(self, supplier_file='../output/supplier_registry.csv', num_transactions=5000,
+                 local_preference=None, supplier_df=None, defect_rate_scale=1.0, scenario=None):
         self.num_transactions = num_transactions
-        self.supplier_df = pd.read_csv(supplier_file)
+        # Business rules (path to a scenario file, a Scenario, or the default scenario)
+        self.scenario = load_scenario(scenario)
+        # Multiplies every defect rate (stress tests for the cleaning code)
+        self.defect_rate_scale = defect_rate_scale
+        # An in-memory registry (DataFrame or Arrow table) skips the CSV round trip
+        if supplier_df is None:
+            self.supplier_df = pd.read_csv(supplier_file)
+        else:
+            self.supplier_df = as_dataframe(supplier_df)
+        
+        # Supplier pools are indexed once instead of filtered per transaction
+        self.supplier_index = SupplierIndex(self.supplier_df)
+        self.local_preference = local_preference or LocalPreferenceCurve()
         
         # Procurement categories
         self.departments = [
@@ -30,71 +66,32 @@ class ProcurementGenerator:
         
     def get_contract_value_range(self, classification, category):
         """Determine realistic contract value based on supplier type and category"""
-        
-        base_ranges = {
-            'Local-Local': (5000, 50000),
-            'Ghanaian Owned': (10000, 200000),
-            'Ghanaian Participation': (25000, 500000),
-            'Ghanaian Registered': (50000, 1000000),
-            'International': (100000, 5000000)
-        }
-        
-        min_val, max_val = base_ranges[classification]
-        
-        # Adjust for category
-        high_value_categories = ['Construction Services', 'Equipment Rental', 'Equipment Parts']
-        if category in high_value_categories:
-            min_val *= 2
-            max_val *= 3
-            
-        return min_val, max_val
+        return self.scenario.contract_value_range(classification, category)
+    
+    def get_local_content_range(self, classification):
+        """Local content percentage range by supplier classification"""
+        return self.scenario.local_content_range(classification)
     
     def calculate_local_content(self, classification):
         """Calculate local content percentage based on supplier classification"""
         
-        local_content_ranges = {
-            'Local-Local': (95, 100),
-            'Ghanaian Owned': (70, 95),
-            'Ghanaian Participation': (30, 70),
-            'Ghanaian Registered': (10, 40),
-            'International': (0, 15)
-        }
-        
-        min_pct, max_pct = local_content_ranges[classification]
+        min_pct, max_pct = self.get_local_content_range(classification)
         return np.random.uniform(min_pct, max_pct)
     
-    def inject_data_quality_issues(self, df):
+    def inject_data_quality_issues(self, df, rng=None):
         """Add realistic data quality problems"""
         
-        # Missing PO numbers (3%)
-        missing_po_idx = np.random.choice(df.index, size=int(len(df) * 0.03), replace=False)
-        df.loc[missing_po_idx, 'po_number'] = None
-        
-        # Currency mixing - some in GHS instead of USD (5%)
-        ghs_idx = np.random.choice(df.index, size=int(len(df) * 0.05), replace=False)
-        df.loc[ghs_idx, 'currency'] = 'GHS'
-        # Convert USD to GHS (approximate rate)
-        for idx in ghs_idx:
-            df.loc[idx, 'contract_value_usd'] *= 12.5
-        
-        # Missing delivery locations (2%)
-        missing_loc_idx = np.random.choice(df.index, size=int(len(df) * 0.02), replace=False)
-        df.loc[missing_loc_idx, 'delivery_location'] = None
-        
-        # Outlier contract values (1%)
-        outlier_idx = np.random.choice(df.index, size=int(len(df) * 0.01), replace=False)
-        for idx in outlier_idx:
-            current_value = df.loc[idx, 'contract_value_usd']
-            df.loc[idx, 'contract_value_usd'] = current_value * np.random.uniform(5, 10)
-        
-        return df
+        # Global numpy state unless a Generator is supplied (vectorized engine)
+        return inject_defects(df, self.DEFECTS, rng, self.defect_rate_scale)
     
+    @timed('procurement.generate')
     def generate_transactions(self):
         """Generate procurement transactions with realistic patterns"""
         
         transactions = []
         start_date = datetime(2010, 1, 1)
         end_date = datetime(2025, 9, 30)
+        local_positions = self.supplier_index.pool(local=True).positions
         
         for i in range(self.num_transactions):
             
@@ -105,19 +102,17 @@ class ProcurementGenerator:
             year = transaction_date.year
             
             # Local content policy effect - increase local preference over time
-            local_bias = min(0.7, 0.2 + (year - 2010) * 0.03)
+            local_bias = self.local_preference(year)
             
-            # Select supplier with local preference
-            if np.random.random() < local_bias:
-                local_suppliers = self.supplier_df[
-                    self.supplier_df['classification'].isin(['Local-Local', 'Ghanaian Owned'])
-                ]
-                if len(local_suppliers) > 0:
-                    supplier = local_suppliers.sample(1).iloc[0]
-                else:
-                    supplier = self.supplier_df.sample(1).iloc[0]
+            # Select supplier with local preference. DataFrame.sample(1) on the global
+            # RNG draws np.random.choice(len, size=1, replace=False), which permutes the
+            # whole pool; drawing the same way keeps the baseline random stream (and
+            # therefore the output) unchanged while indexing positions directly
+            if np.random.random() < local_bias and len(local_positions) > 0:
+                position = local_positions[np.random.choice(len(local_positions), size=1, replace=False)[0]]
             else:
-                supplier = self.supplier_df.sample(1).iloc[0]
+                position = np.random.choice(len(self.supplier_df), size=1, replace=False)[0]
+            supplier = self.supplier_df.iloc[position]
             
             # Contract value
             min_val, max_val = self.get_contract_value_range(
@@ -192,32 +187,206 @@ class ProcurementGenerator:
         df = pd.DataFrame(transactions)
         
         # Inject data quality issues
-        df = self.inject_data_quality_issues(df)
+        with phase('data_quality', rows=len(df)):
+            df = self.inject_data_quality_issues(df)
         
         return df
+    
+    def _supplier_arrays(self):
+        """Per-supplier value ranges, local content ranges and duration flags as arrays"""
+        
+        suppliers = self.supplier_df
+        value_bounds = self.scenario.contract_value_ranges(
+            suppliers['classification'], suppliers['primary_category'])
+        content_bounds = self.scenario.local_content_ranges(suppliers['classification'])
+        
+        is_service = suppliers['primary_category'].str.contains('Services', regex=False).to_numpy()
+        
+        return value_bounds, content_bounds, is_service
+    
+    @timed('procurement.generate_vectorized')
+    def generate_transactions_vectorized(self, seed=42, start_index=0, size=None):
+        """Generate procurement transactions as whole NumPy arrays
+        
+        Same schema and distributions as generate_transactions, drawn from a
+        single np.random.Generator instead of one Python iteration per row.
+        start_index offsets the TXN numbering so batches can be chained.
+        """
+        
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        n = self.num_transactions if size is None else size
+        
+        value_bounds, content_bounds, is_service = self._supplier_arrays()
+        
+        # Transaction dates
+        start_date = np.datetime64('2010-01-01')
+        end_date = np.datetime64('2025-09-30')
+        days_between = (end_date - start_date).astype(int)
+        transaction_date = start_date + rng.integers(0, days_between + 1, size=n)
+        year = transaction_date.astype('datetime64[Y]').astype(int) + 1970
+        
+        # Select supplier with local preference that increases over time
+        with phase('supplier_sampling', rows=n):
+            supplier_idx = self.supplier_index.sample_local_biased(rng, year, self.local_preference)
+        
+        # Contract value
+        min_val = value_bounds[supplier_idx, 0]
+        max_val = value_bounds[supplier_idx, 1]
+        contract_value = rng.uniform(min_val, max_val)
+        
+        # Contract duration
+        service_durations = np.array([1, 3, 6, 12, 24, 36])
+        goods_durations = np.array([1, 2, 3])
+        duration_months = np.where(
+            is_service[supplier_idx],
+            service_durations[rng.integers(0, len(service_durations), size=n)],
+            goods_durations[rng.integers(0, len(goods_durations), size=n)]
+        )
+        
+        # Department allocation
+        dept_weights = [0.4, 0.2, 0.1, 0.1, 0.1, 0.1]
+        department = np.asarray(self.departments)[
+            rng.choice(len(self.departments), size=n, p=dept_weights)
+        ]
+        
+        # Tender type based on contract value (rows: low, mid, high value bands)
+        tender_probs = np.array([
+            [0.0, 0.3, 0.7],
+            [0.5, 0.3, 0.2],
+            [0.8, 0.2, 0.0]
+        ])
+        value_band = (contract_value > 25000).astype(int) + (contract_value > 100000)
+        tender_code = (rng.random(n)[:, None] >= tender_probs.cumsum(axis=1)[value_band]).sum(axis=1)
+        tender_type = np.asarray(self.tender_types)[np.minimum(tender_code, 2)]
+        
+        # Local content percentage
+        local_content_pct = rng.uniform(content_bounds[supplier_idx, 0], content_bounds[supplier_idx, 1])
+        
+        # Contract dates
+        contract_end = transaction_date + duration_months * 30
+        
+        # Contract status
+        today = np.datetime64(datetime.now(), 'D')
+        status = np.where(
+            contract_end < today,
+            np.where(rng.random(n) < 0.95, 'Completed', 'Cancelled'),
+            'Active'
+        )
+        
+        # Build transaction columns
+        transaction_date_str = np.datetime_as_string(transaction_date, unit='D')
+        suppliers = self.supplier_df
+        df = pd.DataFrame({
+            'transaction_id': format_ids('TXN', start_index + 1, n, 6),
+            'supplier_id': suppliers['supplier_id'].to_numpy()[supplier_idx],
+            'transaction_date': transaction_date_str,
+            'contract_value_usd': np.round(contract_value, 2),
+            'currency': 'USD',
+            'category': suppliers['primary_category'].to_numpy()[supplier_idx],
+            'subcategory': suppliers['secondary_category'].to_numpy()[supplier_idx],
+            'department': department,
+            'contract_duration_months': duration_months,
+            'tender_type': tender_type,
+            'local_content_percentage': np.round(local_content_pct, 1),
+            'payment_terms': np.asarray(self.payment_terms)[
+                rng.integers(0, len(self.payment_terms), size=n)
+            ],
+            'contract_start_date': transaction_date_str,
+            'contract_end_date': np.datetime_as_string(contract_end, unit='D'),
+            'po_number': _prefixed_numbers('PO', rng.integers(100000, 1000000, size=n)),
+            'delivery_location': np.asarray(self.delivery_locations)[
+                rng.integers(0, len(self.delivery_locations), size=n)
+            ],
+            'project_code': _prefixed_numbers('PRJ', rng.integers(1000, 10000, size=n)),
+            'budget_code': _prefixed_numbers('BUD', rng.integers(100, 1000, size=n)),
+            'approval_level': np.array(['Manager', 'Director', 'VP', 'SVP'])[
+                rng.integers(0, 4, size=n)
+            ],
+            'contract_status': status
+        })
+        
+        # Inject data quality issues
+        with phase('data_quality', rows=n):
+            df = self.inject_data_quality_issues(df, rng=rng)
+        
+        return df
+
+    def iter_transaction_batches(self, batch_size=DEFAULT_BATCH_SIZE, seed=42):
+        """Yield num_transactions rows in batches of at most batch_size rows
+        
+        Batches share one Generator, so a given seed and batch size always
+        produce the same ledger, and TXN ids run on continuously.
+        """
+        
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        
+        for batch_start in range(0, self.num_transactions, batch_size):
+            size = min(batch_size, self.num_transactions - batch_start)
+            yield self.generate_transactions_vectorized(seed=rng, start_index=batch_start, size=size)
+
+def _prefixed_numbers(prefix, numbers):
+    """Vectorized f'{prefix}{number}' formatting"""
+    return pd.Series(numbers).astype(str).radd(prefix).to_numpy()
 
 def main():
     """Main execution function"""
     
+    parser = argparse.ArgumentParser(description="Generate procurement transactions")
+    parser.add_argument('--num-transactions', type=int, default=5000)
+    parser.add_argument('--vectorized', action='store_true',
+                        help="Use the NumPy batch engine (recommended for large ledgers)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Append fixed-size vectorized batches to the output (bounded memory)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+    parser.add_argument('--partition-by-year', action='store_true',
+                        help="Write year=YYYY partitions (parquet/arrow only)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url',
+                        help="Read suppliers from and load transactions into this SQLAlchemy database instead of files")
+    parser.add_argument('--defect-rate-scale', type=float, default=1.0,
+                        help="Multiply every data quality defect rate (stress-test the cleaning code)")
+    parser.add_argument('--scenario', help="Scenario config with the business rules (default: config/default_scenario.json)")
+    args = parser.parse_args()
+    
     print("Starting Procurement Transactions Data Generation...")
     print("-" * 50)
     
-    # Generate transactions
-    generator = ProcurementGenerator(num_transactions=5000)
-    transactions_df = generator.generate_transactions()
+    output_path = output_path_for('../output/procurement_transactions.csv', args.format, args.partition_by_year)
+    engine = create_engine(args.database_url) if args.database_url else None
+    if engine is not None:
+        output_path = args.database_url
+        generator = ProcurementGenerator(num_transactions=args.num_transactions,
+                                         supplier_df=read_table(engine, 'suppliers'),
+                                         defect_rate_scale=args.defect_rate_scale, scenario=args.scenario)
+    else:
+        generator = ProcurementGenerator(num_transactions=args.num_transactions,
+                                         defect_rate_scale=args.defect_rate_scale, scenario=args.scenario)
     
-    # Calculate statistics
-    total_value = transactions_df['contract_value_usd'].sum()
-    local_suppliers = transactions_df.merge(
-        generator.supplier_df[['supplier_id', 'classification']], 
-        on='supplier_id'
-    )
+    if args.stream:
+        batches = generator.iter_transaction_batches(args.batch_size, seed=args.seed)
+        if engine is not None:
+            rows = load_batches(engine, 'procurement', batches)
+        else:
+            rows = write_dataset(batches, output_path, 'procurement',
+                                 args.format, args.partition_by_year)
+        print(f"\nTotal Transactions Generated: {rows}")
+        print(f"Data streamed to: {output_path}")
+        print("-" * 50)
+        print("Procurement Transactions Generation Complete!")
+        return
     
-    local_local_value = local_suppliers[
-        local_suppliers['classification'].isin(['Local-Local', 'Ghanaian Owned'])
-    ]['contract_value_usd'].sum()
+    # Generate transactions
+    if args.vectorized:
+        transactions_df = generator.generate_transactions_vectorized(seed=args.seed)
+    else:
+        transactions_df = generator.generate_transactions()
     
-    local_content_pct = (local_local_value / total_value) * 100
+    # Calculate statistics (GHS rows normalized to USD)
+    kpis = LocalContentCube(transactions_df, generator.supplier_df).query()
+    total_value = kpis['spend_usd']
+    local_local_value = kpis['local_spend_usd']
+    local_content_pct = kpis['local_spend_share']
     
     # Display summary
     print(f"\nTotal Transactions Generated: {len(transactions_df)}")
@@ -236,9 +405,11 @@ def main():
     print(f"Currency Mixing (GHS): {(transactions_df['currency'] == 'GHS').sum()}")
     print(f"Missing Delivery Locations: {transactions_df['delivery_location'].isna().sum()}")
     
-    # Save to CSV
-    output_path = '../output/procurement_transactions.csv'
-    transactions_df.to_csv(output_path, index=False)
+    # Save output
+    if engine is not None:
+        load_batches(engine, 'procurement', transactions_df)
+    else:
+        write_dataset(transactions_df, output_path, 'procurement', args.format, args.partition_by_year)
     print(f"\nData saved to: {output_path}")
     print("-" * 50)
     print("Procurement Transactions Generation Complete!")
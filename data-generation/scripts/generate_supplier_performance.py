@@ -4,43 +4,58 @@ Generates quarterly performance assessments for suppliers
 Shows performance improvement over time
 """
 
+import argparse
 import pandas as pd
 import numpy as np
+from sqlalchemy import create_engine
 from datetime import datetime
 
+from streaming import DEFAULT_BATCH_SIZE, format_ids
+from output_formats import OUTPUT_FORMATS, as_dataframe, output_path_for, write_dataset
+from database_loader import load_batches, read_table
+from instrumentation import phase, timed
+from scenario_config import load_scenario
+
 # Set random seeds
 np.random.seed(42)
 
 class PerformanceGenerator:
-    def __init__(self, supplier_file='../output/supplier_registry.csv'):
-        self.supplier_df = pd.read_csv(supplier_file)
+    def __init__(self, supplier_file='../output/supplier_registry.csv', supplier_df=None, scenario=None):
+        # An in-memory registry (DataFrame or Arrow table) skips the CSV round trip
+        if supplier_df is None:
+            self.supplier_df = pd.read_csv(supplier_file)
+        else:
+            self.supplier_df = as_dataframe(supplier_df)
         self.start_year = 2010
         self.end_year = 2025
+        # Business rules (path to a scenario file, a Scenario, or the default scenario)
+        self.scenario = load_scenario(scenario)
         
     def get_base_performance(self, classification):
         """Base performance score by supplier classification"""
-        base_scores = {
-            'Local-Local': np.random.normal(7.5, 1.2),
-            'Ghanaian Owned': np.random.normal(8.0, 1.0),
-            'Ghanaian Participation': np.random.normal(8.2, 0.8),
-            'Ghanaian Registered': np.random.normal(8.5, 0.7),
-            'International': np.random.normal(8.8, 0.6)
-        }
-        return base_scores.get(classification, 7.5)
+        return self.sample_base_performance([classification])[0]
+    
+    def sample_base_performance(self, classifications, rng=None):
+        """Base performance scores drawn from each supplier's tier distribution in one call"""
+        return self.scenario.sample_base_performance(np.random if rng is None else rng, classifications)
     
+    @timed('performance.generate')
     def generate_performance(self):
         """Generate quarterly performance assessments"""
         
         performance_records = []
         
-        for _, supplier in self.supplier_df.iterrows():
+        # Base performance for every supplier, from its own tier distribution
+        base_scores = self.sample_base_performance(self.supplier_df['classification'])
+        
+        for position, (_, supplier) in enumerate(self.supplier_df.iterrows()):
             
             # Get supplier start year
             reg_year = int(supplier['registration_date'][:4])
             supplier_start_year = max(self.start_year, reg_year)
             
             # Base performance for this supplier
-            base_performance = self.get_base_performance(supplier['classification'])
+            base_performance = base_scores[position]
             
             # Generate quarterly assessments
             for year in range(supplier_start_year, self.end_year + 1):
@@ -129,16 +144,205 @@ class PerformanceGenerator:
                     performance_records.append(performance)
         
         return pd.DataFrame(performance_records)
+    
+    def _quarter_grid(self, suppliers):
+        """Build the (supplier, quarter) assessment grid as flat arrays"""
+        
+        reg_year = suppliers['registration_date'].str[:4].astype(int).to_numpy()
+        supplier_start_year = np.maximum(self.start_year, reg_year)
+        
+        # Quarters run from Q1 of the start year to Q3 of the final year
+        first_quarter = supplier_start_year * 4
+        last_quarter = self.end_year * 4 + 2
+        counts = np.maximum(0, last_quarter - first_quarter + 1)
+        
+        supplier_pos = np.repeat(np.arange(len(suppliers)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        quarter_index = first_quarter[supplier_pos] + offsets
+        
+        year = quarter_index // 4
+        quarter = quarter_index % 4 + 1
+        years_experience = offsets / 4.0
+        
+        return supplier_pos, year, quarter, years_experience
+    
+    @timed('performance.block')
+    def _performance_block(self, suppliers, rng, start_index):
+        """Vectorized assessments for a block of suppliers"""
+        
+        # Base performance per supplier, drawn from its own tier distribution
+        supplier_base = self.sample_base_performance(suppliers['classification'], rng)
+        
+        with phase('quarter_grid'):
+            supplier_pos, year, quarter, years_experience = self._quarter_grid(suppliers)
+        n = len(supplier_pos)
+        base = supplier_base[supplier_pos]
+        
+        # Experience effect (improvement over time)
+        experience_boost = np.minimum(1.0, years_experience * 0.1)
+        
+        # Performance metrics
+        delivery_performance = np.clip(
+            base * 12 + experience_boost * 5 + rng.normal(0, 5, n), 0, 100)
+        quality_score = np.clip(
+            base + experience_boost + rng.normal(0, 0.5, n), 1, 10)
+        cost_competitiveness = np.clip(
+            base + rng.normal(0, 0.8, n), 1, 10)
+        safety_compliance = np.clip(
+            base + experience_boost * 0.5 + rng.normal(0, 0.6, n), 1, 10)
+        contract_compliance = np.clip(
+            base * 11 + experience_boost * 3 + rng.normal(0, 8, n), 0, 100)
+        innovation_score = np.clip(
+            base * 0.8 + rng.normal(0, 1.2, n), 1, 10)
+        capacity_utilization = np.clip(
+            60 + base * 4 + rng.normal(0, 10, n), 10, 100)
+        
+        overall_score = (quality_score + cost_competitiveness +
+                         safety_compliance + innovation_score) / 4.0
+        
+        # Improvement recommendations based on performance
+        recommendations = np.array([
+            'Comprehensive improvement plan required',
+            'Enhance quality controls',
+            'Focus on delivery timelines',
+            'Minor process improvements needed',
+            'None - Excellent Performance'
+        ])
+        recommendation = recommendations[np.searchsorted([6, 7, 8, 9], overall_score, side='right')]
+        
+        # Contract renewal eligibility
+        renewal_eligible = np.where(
+            (overall_score >= 8) & (safety_compliance >= 8), 'Yes',
+            np.where(overall_score >= 6, 'Under Review', 'No')
+        )
+        
+        # Low-cardinality labels are formatted once and gathered by index
+        assessors = np.array([f'Assessor_{i:02d}' for i in range(1, 20)])
+        assessor = assessors[rng.integers(0, len(assessors), size=n)]
+        first_year = year.min() if n else self.start_year
+        assessment_dates = np.array([
+            f'{y}-{q*3:02d}-01' for y in range(first_year, self.end_year + 1) for q in range(1, 5)
+        ])
+        assessment_date = assessment_dates[(year - first_year) * 4 + quarter - 1]
+        
+        return pd.DataFrame({
+            'performance_id': format_ids('PERF', start_index + 1, n, 6),
+            'supplier_id': suppliers['supplier_id'].to_numpy()[supplier_pos],
+            'year': year,
+            'quarter': quarter,
+            'assessment_date': assessment_date,
+            'delivery_performance_pct': np.round(delivery_performance, 1),
+            'quality_score': np.round(quality_score, 1),
+            'cost_competitiveness_score': np.round(cost_competitiveness, 1),
+            'safety_compliance_score': np.round(safety_compliance, 1),
+            'contract_compliance_pct': np.round(contract_compliance, 1),
+            'innovation_score': np.round(innovation_score, 1),
+            'capacity_utilization_pct': np.round(capacity_utilization, 1),
+            'overall_score': np.round(overall_score, 1),
+            'improvement_recommendations': recommendation,
+            'contract_renewals_eligible': renewal_eligible,
+            'assessed_by': assessor
+        })
+    
+    def generate_performance_vectorized(self, seed=42, supplier_chunk_size=10000):
+        """Generate quarterly performance assessments with array operations
+        
+        The (supplier, quarter) grid is built per block of supplier_chunk_size
+        suppliers, so intermediate arrays are bounded by roughly
+        supplier_chunk_size * quarters rows regardless of registry size.
+        """
+        
+        blocks = list(self._iter_supplier_blocks(seed, supplier_chunk_size))
+        
+        if not blocks:
+            return pd.DataFrame()
+        return pd.concat(blocks, ignore_index=True)
+    
+    def assessment_counts(self, suppliers=None):
+        """Number of quarterly assessments each supplier receives"""
+        
+        if suppliers is None:
+            suppliers = self.supplier_df
+        supplier_pos, _, _, _ = self._quarter_grid(suppliers)
+        return np.bincount(supplier_pos, minlength=len(suppliers))
+    
+    def _iter_supplier_blocks(self, seed, supplier_chunk_size, supplier_start=0,
+                              supplier_stop=None, start_index=0):
+        """Yield vectorized assessment blocks with continuous PERF ids
+        
+        supplier_start/supplier_stop select a contiguous slice of the registry
+        and start_index is the number of assessments preceding that slice.
+        """
+        
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        if supplier_stop is None:
+            supplier_stop = len(self.supplier_df)
+        
+        next_index = start_index
+        for start in range(supplier_start, supplier_stop, supplier_chunk_size):
+            suppliers = self.supplier_df.iloc[start:min(start + supplier_chunk_size, supplier_stop)]
+            block = self._performance_block(suppliers, rng, next_index)
+            next_index += len(block)
+            yield block
+    
+    def iter_performance_batches(self, batch_size=DEFAULT_BATCH_SIZE, seed=42):
+        """Yield assessments in batches of at most batch_size rows
+        
+        Suppliers are grouped so that each block holds at most batch_size
+        assessments (a supplier contributes at most one row per quarter).
+        """
+        
+        quarters = (self.end_year - self.start_year + 1) * 4
+        suppliers_per_batch = max(1, batch_size // quarters)
+        return self._iter_supplier_blocks(seed, suppliers_per_batch)
 
 def main():
     """Main execution function"""
     
+    parser = argparse.ArgumentParser(description="Generate supplier performance assessments")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="Use the array-backed quarterly engine (recommended for large registries)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Append vectorized batches to the output (bounded memory)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+    parser.add_argument('--partition-by-year', action='store_true',
+                        help="Write year=YYYY partitions (parquet/arrow only)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url',
+                        help="Read suppliers from and load assessments into this SQLAlchemy database instead of files")
+    parser.add_argument('--scenario', help="Scenario config with the business rules (default: config/default_scenario.json)")
+    args = parser.parse_args()
+    
     print("Starting Supplier Performance Data Generation...")
     print("-" * 50)
     
+    output_path = output_path_for('../output/supplier_performance.csv', args.format, args.partition_by_year)
+    engine = create_engine(args.database_url) if args.database_url else None
+    if engine is not None:
+        output_path = args.database_url
+        generator = PerformanceGenerator(supplier_df=read_table(engine, 'suppliers'), scenario=args.scenario)
+    else:
+        generator = PerformanceGenerator(scenario=args.scenario)
+    
+    if args.stream:
+        batches = generator.iter_performance_batches(args.batch_size, seed=args.seed)
+        if engine is not None:
+            rows = load_batches(engine, 'performance', batches)
+        else:
+            rows = write_dataset(batches, output_path, 'performance',
+                                 args.format, args.partition_by_year)
+        print(f"\nTotal Performance Assessments: {rows}")
+        print(f"Data streamed to: {output_path}")
+        print("-" * 50)
+        print("Supplier Performance Generation Complete!")
+        return
+    
     # Generate performance data
-    generator = PerformanceGenerator()
-    performance_df = generator.generate_performance()
+    if args.vectorized:
+        performance_df = generator.generate_performance_vectorized(seed=args.seed)
+    else:
+        performance_df = generator.generate_performance()
     
     # Display summary
     print(f"\nTotal Performance Assessments: {len(performance_df)}")
@@ -167,9 +371,11 @@ def main():
         print(f"Latest Assessment: {last_score}")
         print(f"Improvement: {improvement:+.1f} points")
     
-    # Save to CSV
-    output_path = '../output/supplier_performance.csv'
-    performance_df.to_csv(output_path, index=False)
+    # Save output
+    if engine is not None:
+        load_batches(engine, 'performance', performance_df)
+    else:
+        write_dataset(performance_df, output_path, 'performance', args.format, args.partition_by_year)
     print(f"\nData saved to: {output_path}")
     print("-" * 50)
     print("Supplier Performance Generation Complete!")
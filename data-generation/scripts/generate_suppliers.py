@@ -4,11 +4,20 @@ Generates realistic supplier data with Ghana's 5-tier classification system
 Includes intentional data quality issues for cleaning practice
 """
 
+import argparse
 import pandas as pd
 import numpy as np
+from sqlalchemy import create_engine
 import random
 from datetime import datetime, timedelta
 
+from streaming import DEFAULT_BATCH_SIZE, format_ids
+from output_formats import OUTPUT_FORMATS, output_path_for, write_dataset
+from database_loader import load_batches
+from instrumentation import phase, timed
+from defects import Defect, inject_defects, jitter, missing, swap_text
+from name_pools import ContactPools, DEFAULT_POOL_SIZE, GHANA_PREFIXES, BUSINESS_TYPES
+
 # Set random seeds for reproducibility
 np.random.seed(42)
 random.seed(42)
@@ -23,8 +32,21 @@ except ImportError:
     fake = None
 
 class SupplierGenerator:
-    def __init__(self, num_suppliers=500):
+    # Intentional data quality issues, applied in order
+    DEFECTS = [
+        Defect('missing_phone', 0.10, [missing('phone')]),
+        Defect('missing_email', 0.08, [missing('email')]),
+        Defect('company_name_variation', 0.05, [
+            swap_text('company_name', [('Limited', 'Ltd'), ('Ltd', 'Limited')])
+        ]),
+        Defect('ownership_precision', 0.15, [jitter('ownership_percentage', -0.5, 0.5, decimals=4)]),
+        Defect('missing_certification', 0.05, [missing('certification_status')])
+    ]
+    
+    def __init__(self, num_suppliers=500, defect_rate_scale=1.0):
         self.num_suppliers = num_suppliers
+        # Multiplies every defect rate (stress tests for the cleaning code)
+        self.defect_rate_scale = defect_rate_scale
         
         # Ghanaian company name components
         self.ghana_prefixes = [
@@ -106,145 +128,319 @@ class SupplierGenerator:
                 'address': f"{random.randint(1,999)} Main Street, Accra"
             }
     
-    def inject_data_quality_issues(self, df):
+    def inject_data_quality_issues(self, df, rng=None):
         """Add realistic data quality problems"""
         
-        # Missing phone numbers (10%)
-        missing_phone_idx = np.random.choice(df.index, size=int(len(df) * 0.1), replace=False)
-        df.loc[missing_phone_idx, 'phone'] = None
-        
-        # Missing emails (8%)
-        missing_email_idx = np.random.choice(df.index, size=int(len(df) * 0.08), replace=False)
-        df.loc[missing_email_idx, 'email'] = None
-        
-        # Company name variations (5%)
-        variation_idx = np.random.choice(df.index, size=int(len(df) * 0.05), replace=False)
-        for idx in variation_idx:
-            name = df.loc[idx, 'company_name']
-            if 'Ltd' in name and 'Limited' not in name:
-                df.loc[idx, 'company_name'] = name.replace('Ltd', 'Limited')
-            elif 'Limited' in name:
-                df.loc[idx, 'company_name'] = name.replace('Limited', 'Ltd')
-        
-        # Ownership percentage precision issues (15%)
-        precision_idx = np.random.choice(df.index, size=int(len(df) * 0.15), replace=False)
-        for idx in precision_idx:
-            current_value = df.loc[idx, 'ownership_percentage']
-            df.loc[idx, 'ownership_percentage'] = round(current_value + np.random.uniform(-0.5, 0.5), 4)
-        
-        # Missing certification status (5%)
-        missing_cert_idx = np.random.choice(df.index, size=int(len(df) * 0.05), replace=False)
-        df.loc[missing_cert_idx, 'certification_status'] = None
+        # Global numpy state unless a Generator is supplied (vectorized engine)
+        return inject_defects(df, self.DEFECTS, rng, self.defect_rate_scale)
+    
+    def draw_classifications(self, size):
+        """Draw supplier classifications from the 5-tier distribution"""
+        return np.random.choice(
+            ['Local-Local', 'Ghanaian Owned', 'Ghanaian Participation', 
+             'Ghanaian Registered', 'International'],
+            size=size,
+            p=[0.15, 0.25, 0.20, 0.25, 0.15]
+        )
+    
+    def build_supplier(self, i, classification):
+        """Build a single supplier record (i is the zero-based global row number)"""
         
-        return df
+        # Company name
+        company_name = self.generate_company_name(classification)
+        
+        # Ownership and distance based on classification
+        if classification == 'Local-Local':
+            ownership_pct = np.random.uniform(80, 100)
+            distance_km = np.random.uniform(1, 25)
+        elif classification == 'Ghanaian Owned':
+            ownership_pct = np.random.uniform(51, 95)
+            distance_km = np.random.uniform(25, 200)
+        elif classification == 'Ghanaian Participation':
+            ownership_pct = np.random.uniform(10, 50)
+            distance_km = np.random.uniform(50, 300)
+        elif classification == 'Ghanaian Registered':
+            ownership_pct = np.random.uniform(0, 20)
+            distance_km = np.random.uniform(100, 400)
+        else:  # International
+            ownership_pct = 0
+            distance_km = np.random.uniform(500, 5000)
+        
+        # Registration date
+        if classification in ['Local-Local', 'Ghanaian Owned']:
+            start_year = 2010
+        else:
+            start_year = 2006
+        
+        year = np.random.randint(start_year, 2025)
+        month = np.random.randint(1, 13)
+        day = np.random.randint(1, 29)
+        reg_date = datetime(year, month, day)
+        
+        # Annual revenue
+        years_operating = (datetime.now() - reg_date).days / 365.0
+        
+        base_revenue_map = {
+            'Local-Local': np.random.uniform(50000, 500000),
+            'Ghanaian Owned': np.random.uniform(200000, 2000000),
+            'Ghanaian Participation': np.random.uniform(500000, 5000000),
+            'Ghanaian Registered': np.random.uniform(1000000, 10000000),
+            'International': np.random.uniform(5000000, 50000000)
+        }
+        
+        base_revenue = base_revenue_map[classification]
+        annual_revenue = base_revenue * (1 + years_operating * 0.1)
+        
+        # Employee count
+        employees = max(1, int(annual_revenue / 100000 * np.random.uniform(0.5, 2.0)))
+        
+        # Contact information
+        contact = self.generate_contact_info()
+        
+        # Build supplier record
+        return {
+            'supplier_id': f'SUP{i+1:04d}',
+            'company_name': company_name,
+            'classification': classification,
+            'ownership_percentage': round(ownership_pct, 1),
+            'distance_from_mine_km': round(distance_km, 1),
+            'registration_date': reg_date.strftime('%Y-%m-%d'),
+            'primary_category': random.choice(self.service_categories),
+            'secondary_category': random.choice(self.service_categories),
+            'annual_revenue_usd': round(annual_revenue, 2),
+            'certification_status': random.choice(['Certified', 'Pending', 'Not Certified']),
+            'contact_person': contact['name'],
+            'phone': contact['phone'],
+            'email': contact['email'],
+            'address': contact['address'],
+            'tax_id': f'TIN{random.randint(10000000, 99999999)}',
+            'employees_count': employees,
+            'founded_year': year,
+            'website': f"www.{company_name.lower().replace(' ', '').replace('ltd', '').replace('limited', '').replace(',', '')}.com.gh" if classification != 'International' else f"www.company{i}.com"
+        }
     
+    @timed('suppliers.generate')
     def generate_suppliers(self):
         """Generate complete supplier registry dataset"""
         
         suppliers = []
         
         # Classification distribution
-        classifications = np.random.choice(
-            ['Local-Local', 'Ghanaian Owned', 'Ghanaian Participation', 
-             'Ghanaian Registered', 'International'],
-            size=self.num_suppliers,
-            p=[0.15, 0.25, 0.20, 0.25, 0.15]
-        )
+        classifications = self.draw_classifications(self.num_suppliers)
         
-        for i, classification in enumerate(classifications):
-            
-            # Company name
-            company_name = self.generate_company_name(classification)
-            
-            # Ownership and distance based on classification
-            if classification == 'Local-Local':
-                ownership_pct = np.random.uniform(80, 100)
-                distance_km = np.random.uniform(1, 25)
-            elif classification == 'Ghanaian Owned':
-                ownership_pct = np.random.uniform(51, 95)
-                distance_km = np.random.uniform(25, 200)
-            elif classification == 'Ghanaian Participation':
-                ownership_pct = np.random.uniform(10, 50)
-                distance_km = np.random.uniform(50, 300)
-            elif classification == 'Ghanaian Registered':
-                ownership_pct = np.random.uniform(0, 20)
-                distance_km = np.random.uniform(100, 400)
-            else:  # International
-                ownership_pct = 0
-                distance_km = np.random.uniform(500, 5000)
-            
-            # Registration date
-            if classification in ['Local-Local', 'Ghanaian Owned']:
-                start_year = 2010
-            else:
-                start_year = 2006
-            
-            year = np.random.randint(start_year, 2025)
-            month = np.random.randint(1, 13)
-            day = np.random.randint(1, 29)
-            reg_date = datetime(year, month, day)
+        with phase('build_records', rows=self.num_suppliers):
+            for i, classification in enumerate(classifications):
+                suppliers.append(self.build_supplier(i, classification))
             
-            # Annual revenue
-            years_operating = (datetime.now() - reg_date).days / 365.0
-            
-            base_revenue_map = {
-                'Local-Local': np.random.uniform(50000, 500000),
-                'Ghanaian Owned': np.random.uniform(200000, 2000000),
-                'Ghanaian Participation': np.random.uniform(500000, 5000000),
-                'Ghanaian Registered': np.random.uniform(1000000, 10000000),
-                'International': np.random.uniform(5000000, 50000000)
-            }
-            
-            base_revenue = base_revenue_map[classification]
-            annual_revenue = base_revenue * (1 + years_operating * 0.1)
-            
-            # Employee count
-            employees = max(1, int(annual_revenue / 100000 * np.random.uniform(0.5, 2.0)))
-            
-            # Contact information
-            contact = self.generate_contact_info()
-            
-            # Build supplier record
-            supplier = {
-                'supplier_id': f'SUP{i+1:04d}',
-                'company_name': company_name,
-                'classification': classification,
-                'ownership_percentage': round(ownership_pct, 1),
-                'distance_from_mine_km': round(distance_km, 1),
-                'registration_date': reg_date.strftime('%Y-%m-%d'),
-                'primary_category': random.choice(self.service_categories),
-                'secondary_category': random.choice(self.service_categories),
-                'annual_revenue_usd': round(annual_revenue, 2),
-                'certification_status': random.choice(['Certified', 'Pending', 'Not Certified']),
-                'contact_person': contact['name'],
-                'phone': contact['phone'],
-                'email': contact['email'],
-                'address': contact['address'],
-                'tax_id': f'TIN{random.randint(10000000, 99999999)}',
-                'employees_count': employees,
-                'founded_year': year,
-                'website': f"www.{company_name.lower().replace(' ', '').replace('ltd', '').replace('limited', '').replace(',', '')}.com.gh" if classification != 'International' else f"www.company{i}.com"
-            }
-            
-            suppliers.append(supplier)
-        
-        # Create DataFrame
-        df = pd.DataFrame(suppliers)
+            # Create DataFrame
+            df = pd.DataFrame(suppliers)
         
         # Inject data quality issues
-        df = self.inject_data_quality_issues(df)
+        with phase('data_quality', rows=len(df)):
+            df = self.inject_data_quality_issues(df)
         
         return df
+    
+    def contact_pools(self, seed=42, ghana_vocabulary=False, pool_size=DEFAULT_POOL_SIZE):
+        """Name/contact vocabulary pools, built once per (seed, vocabulary, size)"""
+        
+        if not hasattr(self, '_contact_pools'):
+            self._contact_pools = {}
+        key = (seed, ghana_vocabulary, pool_size)
+        if key not in self._contact_pools:
+            self._contact_pools[key] = ContactPools(pool_size=pool_size, seed=seed, ghana=ghana_vocabulary)
+        return self._contact_pools[key]
+    
+    @timed('suppliers.generate_vectorized')
+    def generate_suppliers_vectorized(self, seed=42, start_index=0, size=None,
+                                      ghana_vocabulary=False, pool_size=DEFAULT_POOL_SIZE, pool_seed=None):
+        """Generate the supplier registry as whole NumPy arrays
+        
+        Same schema and distributions as generate_suppliers, but names and
+        contacts are drawn from pre-sampled vocabulary pools instead of one
+        Faker call per field per row. ghana_vocabulary switches to the
+        extended Ghanaian prefixes, business types, person names, +233 phone
+        numbers and GhanaPost GPS addresses. start_index offsets SUP ids.
+        Vocabulary pools are built from pool_seed; by default that is seed
+        itself, or a seed spawned from a passed Generator's seed sequence.
+        """
+        
+        if pool_seed is None:
+            pool_seed = seed if not isinstance(seed, np.random.Generator) else _spawn_pool_seed(seed)
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        n = self.num_suppliers if size is None else size
+        with phase('contact_pools'):
+            pools = self.contact_pools(pool_seed, ghana_vocabulary, pool_size)
+        
+        tiers = np.array(['Local-Local', 'Ghanaian Owned', 'Ghanaian Participation',
+                          'Ghanaian Registered', 'International'])
+        tier = rng.choice(len(tiers), size=n, p=[0.15, 0.25, 0.20, 0.25, 0.15])
+        classification = tiers[tier]
+        
+        # Company names by tier
+        prefixes = np.array(GHANA_PREFIXES if ghana_vocabulary else self.ghana_prefixes, dtype=object)
+        business_types = np.array(BUSINESS_TYPES if ghana_vocabulary else self.business_types, dtype=object)
+        legal_suffixes = np.array([' ' + s if s else '' for s in self.legal_suffixes], dtype=object)
+        ltd_or_limited = np.array(['Ltd', 'Limited'], dtype=object)
+        local_name = (prefixes[rng.integers(0, len(prefixes), size=n)] + ' '
+                      + business_types[rng.integers(0, len(business_types), size=n)]
+                      + legal_suffixes[rng.integers(0, len(legal_suffixes), size=n)])
+        participation_name = (pools.company_first_words(rng, n) + ' '
+                              + np.array(['Ghana', 'West Africa'], dtype=object)[rng.integers(0, 2, size=n)] + ' '
+                              + ltd_or_limited[rng.integers(0, 2, size=n)])
+        companies = pools.companies_sample(rng, n)
+        registered_name = companies + ' Ghana ' + ltd_or_limited[rng.integers(0, 2, size=n)]
+        company_name = np.select(
+            [tier <= 1, tier == 2, tier == 3],
+            [local_name, participation_name, registered_name],
+            companies
+        )
+        
+        # Ownership and distance based on classification
+        ownership_bounds = np.array([[80, 100], [51, 95], [10, 50], [0, 20], [0, 0]], dtype=float)
+        distance_bounds = np.array([[1, 25], [25, 200], [50, 300], [100, 400], [500, 5000]], dtype=float)
+        ownership_pct = rng.uniform(ownership_bounds[tier, 0], ownership_bounds[tier, 1])
+        distance_km = rng.uniform(distance_bounds[tier, 0], distance_bounds[tier, 1])
+        
+        # Registration date
+        year = rng.integers(np.where(tier <= 1, 2010, 2006), 2025)
+        month = rng.integers(1, 13, size=n)
+        day = rng.integers(1, 29, size=n)
+        reg_date = ((year - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (month - 1)
+                    ).astype('datetime64[D]') + (day - 1)
+        
+        # Annual revenue and employee count
+        revenue_bounds = np.array([[5e4, 5e5], [2e5, 2e6], [5e5, 5e6], [1e6, 1e7], [5e6, 5e7]])
+        base_revenue = rng.uniform(revenue_bounds[tier, 0], revenue_bounds[tier, 1])
+        years_operating = (np.datetime64(datetime.now(), 'D') - reg_date).astype(int) / 365.0
+        annual_revenue = base_revenue * (1 + years_operating * 0.1)
+        employees = np.maximum(1, (annual_revenue / 100000 * rng.uniform(0.5, 2.0, size=n)).astype(int))
+        
+        categories = np.asarray(self.service_categories)
+        website_stem = (pd.Series(company_name).str.lower()
+                        .str.replace(' ', '', regex=False).str.replace('ltd', '', regex=False)
+                        .str.replace('limited', '', regex=False).str.replace(',', '', regex=False))
+        row_number = np.arange(start_index, start_index + n)
+        website = np.where(
+            tier == 4,
+            'www.company' + row_number.astype(str).astype(object) + '.com',
+            'www.' + website_stem.to_numpy(dtype=object) + '.com.gh'
+        )
+        
+        with phase('contacts', rows=n):
+            contacts = pools.contacts(rng, n)
+        df = pd.DataFrame({
+            'supplier_id': format_ids('SUP', start_index + 1, n, 4),
+            'company_name': company_name,
+            'classification': classification,
+            'ownership_percentage': np.round(ownership_pct, 1),
+            'distance_from_mine_km': np.round(distance_km, 1),
+            'registration_date': np.datetime_as_string(reg_date, unit='D'),
+            'primary_category': categories[rng.integers(0, len(categories), size=n)],
+            'secondary_category': categories[rng.integers(0, len(categories), size=n)],
+            'annual_revenue_usd': np.round(annual_revenue, 2),
+            'certification_status': np.array(['Certified', 'Pending', 'Not Certified'])[
+                rng.integers(0, 3, size=n)
+            ],
+            'contact_person': contacts['contact_person'],
+            'phone': contacts['phone'],
+            'email': contacts['email'],
+            'address': contacts['address'],
+            'tax_id': 'TIN' + rng.integers(10000000, 100000000, size=n).astype(str).astype(object),
+            'employees_count': employees,
+            'founded_year': year,
+            'website': website
+        })
+        
+        # Inject data quality issues
+        with phase('data_quality', rows=n):
+            return self.inject_data_quality_issues(df, rng=rng)
+    
+    def iter_supplier_batches(self, batch_size=DEFAULT_BATCH_SIZE, vectorized=False, seed=42,
+                              ghana_vocabulary=False):
+        """Yield the supplier registry in batches of at most batch_size rows
+        
+        SUP ids stay continuous across batches; data quality issues are
+        injected per batch at the same rates as generate_suppliers. With
+        vectorized, batches come from generate_suppliers_vectorized and share
+        one Generator seeded with seed.
+        """
+        
+        rng = np.random.default_rng(seed)
+        for batch_start in range(0, self.num_suppliers, batch_size):
+            size = min(batch_size, self.num_suppliers - batch_start)
+            if vectorized:
+                # Every batch shares the pools of the run seed
+                yield self.generate_suppliers_vectorized(
+                    seed=rng, start_index=batch_start, size=size, ghana_vocabulary=ghana_vocabulary,
+                    pool_seed=seed)
+                continue
+            classifications = self.draw_classifications(size)
+            
+            with phase('suppliers.build_records', rows=size):
+                df = pd.DataFrame([
+                    self.build_supplier(batch_start + offset, classification)
+                    for offset, classification in enumerate(classifications)
+                ])
+            
+            with phase('suppliers.data_quality', rows=size):
+                df = self.inject_data_quality_issues(df)
+            yield df
+
+def _spawn_pool_seed(rng):
+    """Integer pool seed spawned from a Generator's seed sequence (no draws consumed)"""
+    return int(rng.bit_generator.seed_seq.spawn(1)[0].generate_state(1)[0])
 
 def main():
     """Main execution function"""
     
+    parser = argparse.ArgumentParser(description="Generate the supplier registry")
+    parser.add_argument('--num-suppliers', type=int, default=500)
+    parser.add_argument('--vectorized', action='store_true',
+                        help="Use the NumPy engine with pre-sampled name/contact pools (recommended for large registries)")
+    parser.add_argument('--ghana-vocabulary', action='store_true',
+                        help="Vectorized engine only: Ghanaian company, person, phone and address vocabularies")
+    parser.add_argument('--stream', action='store_true',
+                        help="Append fixed-size batches to the output instead of building one DataFrame")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+    parser.add_argument('--partition-by-year', action='store_true',
+                        help="Write year=YYYY partitions (parquet/arrow only)")
+    parser.add_argument('--database-url',
+                        help="Load suppliers into this SQLAlchemy database instead of a file")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--defect-rate-scale', type=float, default=1.0,
+                        help="Multiply every data quality defect rate (stress-test the cleaning code)")
+    args = parser.parse_args()
+    
     print("Starting Supplier Registry Data Generation...")
     print("-" * 50)
     
+    output_path = output_path_for('../output/supplier_registry.csv', args.format, args.partition_by_year)
+    generator = SupplierGenerator(num_suppliers=args.num_suppliers, defect_rate_scale=args.defect_rate_scale)
+    engine = create_engine(args.database_url) if args.database_url else None
+    if engine is not None:
+        output_path = args.database_url
+    
+    if args.stream:
+        batches = generator.iter_supplier_batches(args.batch_size, vectorized=args.vectorized,
+                                                  seed=args.seed, ghana_vocabulary=args.ghana_vocabulary)
+        if engine is not None:
+            rows = load_batches(engine, 'suppliers', batches)
+        else:
+            rows = write_dataset(batches, output_path, 'suppliers',
+                                 args.format, args.partition_by_year)
+        print(f"\nTotal Suppliers Generated: {rows}")
+        print(f"Data streamed to: {output_path}")
+        print("-" * 50)
+        print("Supplier Registry Generation Complete!")
+        return
+    
     # Generate suppliers
-    generator = SupplierGenerator(num_suppliers=500)
-    supplier_df = generator.generate_suppliers()
+    if args.vectorized:
+        supplier_df = generator.generate_suppliers_vectorized(seed=args.seed, ghana_vocabulary=args.ghana_vocabulary)
+    else:
+        supplier_df = generator.generate_suppliers()
     
     # Display summary
     print(f"\nTotal Suppliers Generated: {len(supplier_df)}")
@@ -259,9 +455,11 @@ def main():
     print(f"Missing Emails: {supplier_df['email'].isna().sum()}")
     print(f"Missing Certification Status: {supplier_df['certification_status'].isna().sum()}")
     
-    # Save to CSV
-    output_path = '../output/supplier_registry.csv'
-    supplier_df.to_csv(output_path, index=False)
+    # Save output
+    if engine is not None:
+        load_batches(engine, 'suppliers', supplier_df)
+    else:
+        write_dataset(supplier_df, output_path, 'suppliers', args.format, args.partition_by_year)
     print(f"\nData saved to: {output_path}")
     print("-" * 50)
     print("Supplier Registry Generation Complete!")
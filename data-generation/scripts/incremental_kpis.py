@@ -0,0 +1,204 @@
+"""
+Incremental Local Content Aggregation
+Running spend and local-content sums per (period, classification, category)
+partition, updated with work proportional to each delta rather than to the
+full procurement history
+"""
+
+import pandas as pd
+import numpy as np
+
+from supplier_index import LOCAL_CLASSIFICATIONS
+from local_content_kpis import normalize_currency
+
+MEASURES = ['spend_usd', 'local_spend_usd', 'local_content_usd', 'transactions']
+
+# Statuses that count towards spend KPIs by default
+EFFECTIVE_STATUSES = ['Active', 'Completed']
+
+
+class _GrowableArray:
+    """Amortized O(1) append buffer over a NumPy array"""
+
+    def __init__(self, shape_tail=(), dtype=float, capacity=1024):
+        self.data = np.zeros((capacity,) + shape_tail, dtype=dtype)
+        self.size = 0
+
+    def extend(self, rows):
+        needed = self.size + len(rows)
+        if needed > len(self.data):
+            capacity = max(needed, 2 * len(self.data))
+            grown = np.zeros((capacity,) + self.data.shape[1:], dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = rows
+        self.size = needed
+
+
+class IncrementalLocalContent:
+    """Running local content sums that absorb appended and re-statused transactions
+
+    Sums are kept per (year, quarter, classification, category) partition and
+    contract status, so moving a contract from Active to Cancelled only moves
+    its own contribution between status cells.
+    """
+
+    def __init__(self, supplier_df):
+        self.tier_by_supplier = supplier_df.set_index('supplier_id')['classification']
+
+        # Partition labels and their running sums (partition x status x measure)
+        self.partition_ids = {}
+        self.partition_labels = []
+        self.status_ids = {}
+        self.sums = np.zeros((0, 0, len(MEASURES)))
+
+        # Per-transaction contributions, needed to retract or move them later
+        self.row_by_transaction = {}
+        self.ledger_partition = _GrowableArray(dtype=np.int64)
+        self.ledger_status = _GrowableArray(dtype=np.int64)
+        self.ledger_measures = _GrowableArray((len(MEASURES),))
+
+    def _status_codes(self, statuses):
+        """Integer codes for contract statuses, registering new ones"""
+        for status in dict.fromkeys(statuses):
+            if status not in self.status_ids:
+                self.status_ids[status] = len(self.status_ids)
+        return np.array([self.status_ids[s] for s in statuses], dtype=np.int64)
+
+    def _partition_codes(self, year, quarter, classification, category):
+        """Integer partition codes for a batch, registering new partitions"""
+
+        keys = pd.MultiIndex.from_arrays([year, quarter, classification, category])
+        batch_codes, unique_keys = pd.factorize(keys)
+        partition_of_key = np.empty(len(unique_keys), dtype=np.int64)
+        for i, key in enumerate(unique_keys):
+            if key not in self.partition_ids:
+                self.partition_ids[key] = len(self.partition_labels)
+                self.partition_labels.append(key)
+            partition_of_key[i] = self.partition_ids[key]
+        return partition_of_key[batch_codes]
+
+    def _ensure_capacity(self):
+        """Grow the sums array to cover newly registered partitions/statuses"""
+        n_partitions, n_statuses = len(self.partition_labels), len(self.status_ids)
+        if self.sums.shape[:2] != (n_partitions, n_statuses):
+            grown = np.zeros((n_partitions, n_statuses, len(MEASURES)))
+            old_p, old_s = self.sums.shape[:2]
+            grown[:old_p, :old_s] = self.sums
+            self.sums = grown
+
+    def _batch_measures(self, df, classification):
+        """Per-row measure vectors for a normalized batch"""
+        value = df['contract_value_usd'].to_numpy(dtype=float)
+        is_local = classification.isin(LOCAL_CLASSIFICATIONS).to_numpy()
+        return np.column_stack([
+            value,
+            np.where(is_local, value, 0.0),
+            value * df['local_content_percentage'].to_numpy(dtype=float) / 100.0,
+            np.ones(len(df))
+        ])
+
+    def append(self, transactions_df):
+        """Add a batch of transactions; ids seen before are treated as corrections"""
+
+        df = normalize_currency(transactions_df.drop_duplicates('transaction_id', keep='last'))
+        transaction_ids = df['transaction_id'].to_numpy()
+
+        # Retract earlier versions of re-sent transactions first
+        known = [tid for tid in transaction_ids if tid in self.row_by_transaction]
+        if known:
+            self._retract(np.array([self.row_by_transaction[tid] for tid in known]))
+
+        classification = df['supplier_id'].map(self.tier_by_supplier).fillna('Unknown')
+        dates = pd.to_datetime(df['transaction_date'])
+        partitions = self._partition_codes(
+            dates.dt.year.to_numpy(), dates.dt.quarter.to_numpy(),
+            classification.to_numpy(), df['category'].to_numpy())
+        statuses = self._status_codes(df['contract_status'].to_numpy())
+        measures = self._batch_measures(df, classification)
+        self._ensure_capacity()
+
+        np.add.at(self.sums, (partitions, statuses), measures)
+
+        # Record (or overwrite) each transaction's contribution
+        new_rows = []
+        for i, tid in enumerate(transaction_ids):
+            row = self.row_by_transaction.get(tid)
+            if row is None:
+                new_rows.append(i)
+                continue
+            self.ledger_partition.data[row] = partitions[i]
+            self.ledger_status.data[row] = statuses[i]
+            self.ledger_measures.data[row] = measures[i]
+
+        first_row = self.ledger_partition.size
+        for offset, i in enumerate(new_rows):
+            self.row_by_transaction[transaction_ids[i]] = first_row + offset
+        self.ledger_partition.extend(partitions[new_rows])
+        self.ledger_status.extend(statuses[new_rows])
+        self.ledger_measures.extend(measures[new_rows])
+
+        return len(df)
+
+    def _retract(self, rows):
+        """Remove ledger rows' contributions from the running sums"""
+        np.subtract.at(
+            self.sums,
+            (self.ledger_partition.data[rows], self.ledger_status.data[rows]),
+            self.ledger_measures.data[rows])
+
+    def update_status(self, transaction_ids, new_status):
+        """Move existing transactions to a new contract status (e.g. Active -> Cancelled)"""
+
+        if isinstance(transaction_ids, str):
+            transaction_ids = [transaction_ids]
+        missing = [tid for tid in transaction_ids if tid not in self.row_by_transaction]
+        if missing:
+            raise KeyError(f"Unknown transaction ids: {missing[:5]}")
+
+        rows = np.array([self.row_by_transaction[tid] for tid in transaction_ids], dtype=np.int64)
+        self._retract(rows)
+
+        status_code = self._status_codes([new_status])[0]
+        self._ensure_capacity()
+        self.ledger_status.data[rows] = status_code
+        np.add.at(
+            self.sums,
+            (self.ledger_partition.data[rows], self.ledger_status.data[rows]),
+            self.ledger_measures.data[rows])
+        return len(rows)
+
+    def to_frame(self, statuses=EFFECTIVE_STATUSES):
+        """Current partition sums for the chosen statuses as a DataFrame"""
+
+        status_codes = [self.status_ids[s] for s in statuses if s in self.status_ids]
+        totals = self.sums[:, status_codes].sum(axis=1)
+        frame = pd.DataFrame(
+            self.partition_labels, columns=['year', 'quarter', 'classification', 'category'])
+        for i, measure in enumerate(MEASURES):
+            frame[measure] = totals[:, i] if len(frame) else []
+        return frame
+
+    def query(self, year=None, quarter=None, classification=None, category=None,
+              statuses=EFFECTIVE_STATUSES):
+        """Local content KPIs from the running sums (cancelled contracts excluded by default)"""
+
+        status_codes = [self.status_ids[s] for s in statuses if s in self.status_ids]
+        mask = np.ones(len(self.partition_labels), dtype=bool)
+        if self.partition_labels:
+            labels = list(zip(*self.partition_labels))
+            for position, wanted in enumerate([year, quarter, classification, category]):
+                if wanted is None:
+                    continue
+                wanted = [wanted] if np.ndim(wanted) == 0 else list(wanted)
+                mask &= np.isin(np.asarray(labels[position], dtype=object), wanted)
+
+        spend, local_spend, local_content, count = (
+            float(total) for total in self.sums[mask][:, status_codes].sum(axis=(0, 1)))
+        return {
+            'transactions': int(count),
+            'spend_usd': spend,
+            'local_spend_usd': local_spend,
+            'local_spend_share': local_spend / spend * 100 if spend else np.nan,
+            'local_content_percentage': local_content / spend * 100 if spend else np.nan
+        }
@@ -0,0 +1,265 @@
+"""
+Generation Instrumentation
+Per-phase timers, rows/sec, allocation counts and peak memory for the
+generators, recorded as structured events. Generators mark their phases
+with phase(); nothing is recorded (and almost nothing is spent) unless a
+Recorder is active. An opt-in capture mode adds cProfile (pstats plus
+flamegraph-ready folded stacks) and tracemalloc top allocation sites
+"""
+
+import argparse
+import cProfile
+import functools
+import json
+import os
+import pstats
+import runpy
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Recorder currently receiving phase events (None = instrumentation off)
+_active = None
+
+
+def _rss_peak_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+class Recorder:
+    """Collects phase events; optional listeners receive each event as it is recorded"""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.events = []
+        self.listeners = []
+        self._stack = []
+        self._peaks = []  # highest traced memory seen by each open phase's finished children
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    @contextmanager
+    def phase(self, name, rows=None, **fields):
+        """Time the block as one event; the yielded event dict may be updated (e.g. rows)"""
+
+        self._stack.append(name)
+        event = {'phase': '/'.join(self._stack), 'rows': rows}
+        event.update(fields)
+        blocks_before = sys.getallocatedblocks()
+        if self.trace_memory:
+            self._fold_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+            self._peaks.append(memory_before)
+        started = time.perf_counter()
+        try:
+            yield event
+        finally:
+            seconds = time.perf_counter() - started
+            self._stack.pop()
+            rows = event['rows']
+            event['seconds'] = seconds
+            event['rows_per_sec'] = rows / seconds if rows and seconds else None
+            # Net interpreter allocations (objects still alive at phase end)
+            event['allocated_blocks'] = sys.getallocatedblocks() - blocks_before
+            event['peak_rss_mb'] = _rss_peak_mb()
+            if self.trace_memory:
+                self._fold_peak()
+                peak = self._peaks.pop()
+                current = tracemalloc.get_traced_memory()[0]
+                event['traced_peak_mb'] = (peak - memory_before) / 1024 ** 2
+                event['traced_net_mb'] = (current - memory_before) / 1024 ** 2
+            self.events.append(event)
+            for listener in self.listeners:
+                listener(event)
+
+    def _fold_peak(self):
+        """Credit the traced peak since the last reset to every open phase, then reset it"""
+        peak = tracemalloc.get_traced_memory()[1]
+        self._peaks[:] = [max(seen, peak) for seen in self._peaks]
+        tracemalloc.reset_peak()
+
+    def summary(self):
+        """Total seconds, calls and rows per phase path, slowest first"""
+
+        totals = {}
+        for event in self.events:
+            entry = totals.setdefault(event['phase'], {'phase': event['phase'], 'calls': 0, 'seconds': 0.0, 'rows': 0})
+            entry['calls'] += 1
+            entry['seconds'] += event['seconds']
+            entry['rows'] += event['rows'] or 0
+        for entry in totals.values():
+            entry['rows_per_sec'] = entry['rows'] / entry['seconds'] if entry['rows'] and entry['seconds'] else None
+        return sorted(totals.values(), key=lambda entry: entry['seconds'], reverse=True)
+
+    def to_json(self, path):
+        with open(path, 'w') as handle:
+            json.dump({'events': self.events, 'summary': self.summary()}, handle, indent=2)
+
+
+@contextmanager
+def phase(name, rows=None, **fields):
+    """Mark a generator phase; a no-op unless a Recorder is active"""
+    if _active is None:
+        yield None
+        return
+    with _active.phase(name, rows=rows, **fields) as event:
+        yield event
+
+
+def timed(name):
+    """Decorator recording each call as a phase, with rows taken from len(result)"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.phase(name) as event:
+                result = func(*args, **kwargs)
+                event['rows'] = len(result)
+            return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def instrument(trace_memory=False, listener=None):
+    """Activate a Recorder for the duration of the block"""
+
+    global _active
+    previous = _active
+    recorder = Recorder(trace_memory=trace_memory)
+    if listener is not None:
+        recorder.subscribe(listener)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active = recorder
+    try:
+        yield recorder
+    finally:
+        _active = previous
+        if trace_memory:
+            recorder.allocation_snapshot = tracemalloc.take_snapshot()
+        # Tracing started by someone else is theirs to stop
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def folded_stacks(stats, max_depth=40, min_seconds=1e-3):
+    """cProfile stats as folded stacks ('a;b;c <microseconds>' lines) for flamegraph tools
+
+    cProfile records caller/callee edges rather than full stacks, so each
+    function's own time is spread over its call paths in proportion to the
+    time spent along each edge (the approach flameprof takes). Paths worth
+    less than min_seconds are pruned to keep the output bounded.
+    """
+
+    def label(func):
+        filename, line, name = func
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    entries = stats.stats  # func -> (cc, nc, tottime, cumtime, callers)
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    lines = {}
+
+    def walk(func, stack, share):
+        _, _, tottime, cumtime, _ = entries[func]
+        stack = stack + [label(func)]
+        key = ';'.join(stack)
+        lines[key] = lines.get(key, 0.0) + tottime * share
+        if len(stack) >= max_depth or cumtime <= 0:
+            return
+        for callee, edge_cumtime in callees.get(func, []):
+            if label(callee) in stack:
+                continue  # recursion: already attributed along this path
+            callee_cumtime = entries[callee][3]
+            if callee_cumtime > 0 and edge_cumtime * share >= min_seconds:
+                walk(callee, stack, share * min(1.0, edge_cumtime / callee_cumtime))
+
+    roots = [func for func, (_, _, _, _, callers) in entries.items() if not callers]
+    for root in roots:
+        walk(root, [], 1.0)
+    return [f"{key} {int(seconds * 1e6)}" for key, seconds in lines.items() if seconds * 1e6 >= 1]
+
+
+def capture(output_dir, target, trace_memory=True, top_allocations=30):
+    """Run target() under cProfile, tracemalloc and a Recorder; write all artifacts
+
+    Writes events.json (phase events and summary), profile.prof (pstats),
+    profile.folded (flamegraph.pl / speedscope input) and allocations.txt
+    (top allocation sites) into output_dir. Returns the Recorder.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    with instrument(trace_memory=trace_memory) as recorder:
+        profiler.enable()
+        try:
+            target()
+        finally:
+            profiler.disable()
+
+    recorder.to_json(os.path.join(output_dir, 'events.json'))
+    profiler.dump_stats(os.path.join(output_dir, 'profile.prof'))
+    with open(os.path.join(output_dir, 'profile.folded'), 'w') as handle:
+        handle.write('\n'.join(folded_stacks(pstats.Stats(profiler))) + '\n')
+
+    if trace_memory:
+        with open(os.path.join(output_dir, 'allocations.txt'), 'w') as handle:
+            for stat in recorder.allocation_snapshot.statistics('lineno')[:top_allocations]:
+                handle.write(f"{stat}\n")
+    return recorder
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(
+        description='Run a generator script with phase instrumentation',
+        epilog='Example: python instrumentation.py --capture ../output/profile generate_procurement.py --vectorized')
+    parser.add_argument('--capture', metavar='DIR',
+                        help='Also write cProfile, folded-stack and tracemalloc output to DIR')
+    parser.add_argument('--events', metavar='PATH', help='Write phase events as JSON to PATH')
+    parser.add_argument('script', help='Generator script to run (e.g. generate_suppliers.py)')
+    parser.add_argument('script_args', nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    sys.argv = [args.script] + args.script_args
+
+    def target():
+        runpy.run_path(args.script, run_name='__main__')
+
+    if args.capture:
+        recorder = capture(args.capture, target)
+    else:
+        with instrument() as recorder:
+            target()
+    if args.events:
+        recorder.to_json(args.events)
+
+    print("\nPhase Timings:")
+    for entry in recorder.summary():
+        rate = f"{entry['rows_per_sec']:>14,.0f} rows/s" if entry['rows_per_sec'] else ''
+        print(f"  {entry['phase']:<55} {entry['seconds']:8.3f}s  x{entry['calls']:<4} {rate}")
+    if args.capture:
+        print(f"\nProfile output written to: {args.capture}")
+
+if __name__ == "__main__":
+    # Run through the importable module so the generators' phase() hooks see the active Recorder
+    import instrumentation
+    instrumentation.main()
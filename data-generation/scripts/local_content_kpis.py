@@ -0,0 +1,351 @@
+"""
+Local Content KPI Engine
+Pre-aggregated cubes for the Local Content Percentage and Supplier
+Classification Distribution KPIs (docs/business-requirements.md), by each
+supplier's current tier or point-in-time by the tier in force on each
+transaction date
+"""
+
+import argparse
+
+import pandas as pd
+import numpy as np
+
+from supplier_index import LOCAL_CLASSIFICATIONS
+from classification_history import AsOfIndex, TIER_LADDER, epoch_days
+from scenario_config import GHS_PER_USD
+
+
+def normalize_currency(transactions_df):
+    """Return a copy with every contract value expressed in USD"""
+
+    df = transactions_df.copy()
+    ghs = (df['currency'] == 'GHS').to_numpy()
+    if ghs.any():
+        df.loc[ghs, 'contract_value_usd'] = df.loc[ghs, 'contract_value_usd'] / GHS_PER_USD
+        df.loc[ghs, 'currency'] = 'USD'
+    return df
+
+
+def as_list(value):
+    """Normalize a scalar/list filter argument to a list (None means all)"""
+    if value is None:
+        return None
+    if isinstance(value, (str, int, np.integer)):
+        return [value]
+    return list(value)
+
+
+class LocalContentCube:
+    """Dense spend cube by (year, quarter) x classification x category x department
+
+    Built once from the ledger; queries slice the cube instead of re-scanning
+    and re-merging transactions.
+
+    With a classification history (history_df), each transaction counts
+    under the tier its supplier held on the transaction date rather than the
+    current one. The period slices of the cube are then the per-period cache:
+    correct_history() re-aggregates only the periods a corrected history can
+    change.
+    """
+
+    MEASURES = ['spend_usd', 'local_spend_usd', 'local_content_usd', 'transactions']
+
+    def __init__(self, transactions_df, supplier_df, history_df=None):
+        df = normalize_currency(transactions_df)
+
+        # Supplier tier via a hash lookup rather than a full merge
+        tier_by_supplier = supplier_df.set_index('supplier_id')['classification']
+
+        dates = pd.to_datetime(df['transaction_date'])
+        year = dates.dt.year.to_numpy()
+        quarter = dates.dt.quarter.to_numpy()
+
+        self.first_year = int(year.min()) if len(df) else 0
+        self.last_year = int(year.max()) if len(df) else -1
+        period_codes = (year - self.first_year) * 4 + quarter - 1
+
+        self.history = None
+        if history_df is None:
+            classification = df['supplier_id'].map(tier_by_supplier).fillna('Unknown')
+            class_codes, self.classifications = pd.factorize(classification, sort=True)
+        else:
+            # Every tier gets a slot up front, so corrections never reshape the cube
+            self.classifications = pd.Index(sorted(
+                set(TIER_LADDER) | set(tier_by_supplier) | set(history_df['classification']) | {'Unknown'}))
+            self.history = AsOfIndex(history_df)
+            supplier_codes, suppliers = pd.factorize(df['supplier_id'])
+            self._suppliers = pd.Categorical.from_codes(supplier_codes, suppliers)
+            self._dates = dates.to_numpy().astype('datetime64[D]')
+            # Registry tier for suppliers without a version in force
+            registry_tier = pd.Series(suppliers).map(tier_by_supplier).fillna('Unknown')
+            self._registry_codes = self.classifications.get_indexer(registry_tier)
+            class_codes = self._point_in_time_codes(slice(None))
+
+        category_codes, self.categories = pd.factorize(df['category'], sort=True)
+        department_codes, self.departments = pd.factorize(df['department'], sort=True)
+
+        self.shape = (
+            (self.last_year - self.first_year + 1) * 4,
+            len(self.classifications),
+            len(self.categories),
+            len(self.departments)
+        )
+
+        value = df['contract_value_usd'].to_numpy(dtype=float)
+        local_content = value * df['local_content_percentage'].to_numpy(dtype=float) / 100.0
+        self.cube = self._aggregate(
+            (period_codes, class_codes, category_codes, department_codes), value, local_content, self.shape)
+
+        if self.history is not None:
+            # Row numbers grouped by period, so a period's rows are one slice
+            self._period_codes = period_codes
+            self._category_codes = category_codes
+            self._department_codes = department_codes
+            self._value = value
+            self._local_content = local_content
+            self._rows_by_period = np.argsort(period_codes, kind='stable')
+            self._period_offsets = np.searchsorted(
+                period_codes[self._rows_by_period], np.arange(self.shape[0] + 1))
+
+        # Supplier Classification Distribution over the whole registry
+        self.supplier_distribution = supplier_df['classification'].value_counts()
+
+        self._label_index = {
+            'classification': {label: i for i, label in enumerate(self.classifications)},
+            'category': {label: i for i, label in enumerate(self.categories)},
+            'department': {label: i for i, label in enumerate(self.departments)}
+        }
+
+    def _aggregate(self, coordinates, value, local_content, shape):
+        """Measures cube for (period, classification, category, department) codes"""
+
+        # Flatten the four coordinates and aggregate each measure with bincount
+        flat = np.ravel_multi_index(coordinates, shape)
+        size = int(np.prod(shape))
+        is_local = np.asarray(self.classifications.isin(LOCAL_CLASSIFICATIONS))[coordinates[1]]
+
+        return np.stack([
+            np.bincount(flat, weights=value, minlength=size),
+            np.bincount(flat, weights=np.where(is_local, value, 0.0), minlength=size),
+            np.bincount(flat, weights=local_content, minlength=size),
+            np.bincount(flat, minlength=size).astype(float)
+        ]).reshape((len(self.MEASURES),) + shape)
+
+    def _tier_codes(self, index, supplier_ids, dates, registry_codes):
+        """Classification codes of the tier in force on each date under an as-of index
+
+        Dates before a supplier's first version take that first version;
+        suppliers missing from the history fall back to registry_codes.
+        """
+
+        positions = index.positions(supplier_ids, dates, extend_initial=True)
+        history_codes = self.classifications.get_indexer(index.history['classification'])
+        return np.where(positions >= 0, history_codes[np.maximum(positions, 0)], registry_codes)
+
+    def _point_in_time_codes(self, rows):
+        """Classification codes of the tier in force on each transaction's date"""
+        return self._tier_codes(self.history, self._suppliers[rows], self._dates[rows],
+                                self._registry_codes[self._suppliers.codes[rows]])
+
+    def _period_of(self, days):
+        """Cube period codes for int64 epoch days"""
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        return (months // 12 + 1970 - self.first_year) * 4 + months % 12 // 3
+
+    def _affected_periods(self, before, after, supplier_ids):
+        """Periods in which any of the suppliers' tiers differ between two as-of indexes
+
+        Each supplier's tier is a step function of time that can only change
+        at a valid_from / valid_to of either history, so comparing the two
+        tiers once per segment between those boundaries is exact.
+        """
+
+        supplier_ids = pd.unique(np.asarray(supplier_ids))
+        columns = ['supplier_id', 'valid_from', 'valid_to']
+        versions = pd.concat([index.history.loc[index.history['supplier_id'].isin(supplier_ids), columns]
+                              for index in (before, after)], ignore_index=True)
+        boundaries = pd.DataFrame({
+            'supplier_id': np.concatenate([versions['supplier_id'], versions['supplier_id']]),
+            'day': np.concatenate([epoch_days(versions['valid_from']), epoch_days(versions['valid_to'])])
+        })
+        boundaries = boundaries[boundaries['day'] != np.iinfo(np.int64).min].drop_duplicates()
+        boundaries = boundaries.sort_values(['supplier_id', 'day'])
+        if boundaries.empty:
+            return np.array([], dtype=np.int64)
+
+        # Segments [start, end): one before each supplier's first boundary, then one per boundary
+        supplier = boundaries['supplier_id'].to_numpy()
+        day = boundaries['day'].to_numpy()
+        leading = np.r_[True, supplier[1:] != supplier[:-1]]
+        trailing = np.r_[supplier[1:] != supplier[:-1], True]
+        next_day = np.r_[day[1:], 0]
+        segment_supplier = np.concatenate([supplier[leading], supplier])
+        segment_start = np.concatenate([day[leading] - 1, day])
+        segment_end = np.concatenate([day[leading], np.where(trailing, 0, next_day)])
+        open_start = np.r_[np.ones(leading.sum(), dtype=bool), np.zeros(len(day), dtype=bool)]
+        open_end = np.r_[np.zeros(leading.sum(), dtype=bool), trailing]
+
+        transaction_supplier = self._suppliers.categories.get_indexer(segment_supplier)
+        registry = np.append(self._registry_codes, -1)[transaction_supplier]
+        dates = segment_start.astype('datetime64[D]')
+        differs = (self._tier_codes(before, segment_supplier, dates, registry)
+                   != self._tier_codes(after, segment_supplier, dates, registry))
+        differs &= transaction_supplier >= 0
+
+        lo = np.where(open_start, 0, self._period_of(segment_start))[differs]
+        hi = np.where(open_end, self.shape[0] - 1, self._period_of(segment_end - 1))[differs]
+        lo = np.clip(lo, 0, self.shape[0])
+        hi = np.clip(hi, -1, self.shape[0] - 1)
+        lo, hi = lo[lo <= hi], hi[lo <= hi]
+
+        affected = np.zeros(self.shape[0] + 1, dtype=np.int64)
+        np.add.at(affected, lo, 1)
+        np.add.at(affected, hi + 1, -1)
+        return np.flatnonzero(np.cumsum(affected)[:-1] > 0)
+
+    def correct_history(self, corrections_df):
+        """Replace the tier history of the suppliers in corrections_df; returns the recomputed (year, quarter)s
+
+        corrections_df holds the complete corrected version list of each
+        supplier it mentions. Only periods in which one of those suppliers'
+        tier actually changes are re-aggregated; every other period slice is
+        reused as is.
+        """
+
+        if self.history is None:
+            raise ValueError("History corrections need a point-in-time cube (built with history_df)")
+        unknown = set(corrections_df['classification']) - set(self.classifications)
+        if unknown:
+            raise ValueError(f"Unknown classification(s) {sorted(unknown)}, expected {list(self.classifications)}")
+
+        before = self.history
+        corrected = before.history['supplier_id'].isin(corrections_df['supplier_id']).to_numpy()
+        self.history = AsOfIndex(pd.concat([before.history[~corrected], corrections_df], ignore_index=True))
+        periods = self._affected_periods(before, self.history, corrections_df['supplier_id'])
+        if len(periods) == 0:
+            return []
+
+        rows = np.concatenate([
+            self._rows_by_period[self._period_offsets[p]:self._period_offsets[p + 1]] for p in periods])
+        period_position = np.zeros(self.shape[0], dtype=np.int64)
+        period_position[periods] = np.arange(len(periods))
+        coordinates = (period_position[self._period_codes[rows]], self._point_in_time_codes(rows),
+                       self._category_codes[rows], self._department_codes[rows])
+        self.cube[:, periods] = self._aggregate(
+            coordinates, self._value[rows], self._local_content[rows], (len(periods),) + self.shape[1:])
+        return [(self.first_year + int(p) // 4, int(p) % 4 + 1) for p in periods]
+
+    def _period_index(self, year, quarter):
+        """Cube period positions for the requested years and quarters"""
+
+        years = as_list(year) or range(self.first_year, self.last_year + 1)
+        quarters = as_list(quarter) or [1, 2, 3, 4]
+        return [
+            (y - self.first_year) * 4 + q - 1
+            for y in years for q in quarters
+            if self.first_year <= y <= self.last_year
+        ]
+
+    def _select(self, year=None, quarter=None, classification=None, category=None, department=None):
+        """Sub-cube of all measures for the given filters"""
+
+        cube = self.cube
+        selections = [
+            (1, self._period_index(year, quarter)),
+            (2, classification and [self._label_index['classification'].get(c) for c in as_list(classification)]),
+            (3, category and [self._label_index['category'].get(c) for c in as_list(category)]),
+            (4, department and [self._label_index['department'].get(d) for d in as_list(department)])
+        ]
+        for axis, positions in selections:
+            if positions is None:
+                continue
+            positions = [p for p in positions if p is not None]
+            cube = cube.take(positions, axis=axis)
+        return cube
+
+    def query(self, year=None, quarter=None, classification=None, category=None, department=None):
+        """Spend and local content KPIs for any combination of filters
+
+        local_spend_share is the share of spend with Local-Local and
+        Ghanaian Owned suppliers; local_content_percentage is the
+        value-weighted average of local_content_percentage.
+        """
+
+        totals = self._select(year, quarter, classification, category, department)
+        totals = totals.reshape(len(self.MEASURES), -1).sum(axis=1)
+        spend, local_spend, local_content, count = (float(total) for total in totals)
+
+        return {
+            'transactions': int(count),
+            'spend_usd': spend,
+            'local_spend_usd': local_spend,
+            'local_spend_share': local_spend / spend * 100 if spend else np.nan,
+            'local_content_percentage': local_content / spend * 100 if spend else np.nan
+        }
+
+    def spend_by_classification(self, year=None, quarter=None, category=None, department=None):
+        """Spend per supplier tier for the given filters"""
+
+        spend = self._select(year, quarter, None, category, department)[0]
+        return pd.Series(
+            spend.sum(axis=(0, 2, 3)), index=self.classifications, name='spend_usd')
+
+    def classification_distribution(self):
+        """Supplier Classification Distribution KPI (share of registered suppliers)"""
+        return self.supplier_distribution / self.supplier_distribution.sum() * 100
+
+    def to_frame(self):
+        """Long-format view of the non-empty cube cells (for export and dashboards)"""
+
+        nonzero = np.flatnonzero(self.cube[3])
+        period, class_code, category_code, department_code = np.unravel_index(nonzero, self.shape)
+        frame = pd.DataFrame({
+            'year': self.first_year + period // 4,
+            'quarter': period % 4 + 1,
+            'classification': np.asarray(self.classifications)[class_code],
+            'category': np.asarray(self.categories)[category_code],
+            'department': np.asarray(self.departments)[department_code]
+        })
+        for i, measure in enumerate(self.MEASURES):
+            frame[measure] = self.cube[i].ravel()[nonzero]
+        return frame
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description="Local content KPIs over the procurement ledger")
+    parser.add_argument('--point-in-time', action='store_true',
+                        help="Attribute each transaction to the supplier tier in force on its date")
+    parser.add_argument('--history', default='../output/supplier_classification_history.csv',
+                        help="Classification history used with --point-in-time")
+    args = parser.parse_args()
+
+    print("Building Local Content KPI Cube...")
+    print("-" * 50)
+
+    transactions_df = pd.read_csv('../output/procurement_transactions.csv')
+    supplier_df = pd.read_csv('../output/supplier_registry.csv')
+    history_df = pd.read_csv(args.history) if args.point_in_time else None
+    cube = LocalContentCube(transactions_df, supplier_df, history_df)
+    if args.point_in_time:
+        print("\nTiers: point-in-time (tier in force on each transaction date)")
+
+    overall = cube.query()
+    print(f"\nTotal Contract Value (USD): ${overall['spend_usd']:,.2f}")
+    print(f"Local Supplier Spend Share: {overall['local_spend_share']:.1f}%")
+    print(f"Local Content Percentage (value-weighted): {overall['local_content_percentage']:.1f}%")
+
+    print("\nSupplier Classification Distribution (% of suppliers):")
+    print(cube.classification_distribution().round(1))
+
+    print("\nLocal Spend Share by Year:")
+    for year in range(cube.first_year, cube.last_year + 1):
+        print(f"  {year}: {cube.query(year=year)['local_spend_share']:.1f}%")
+
+    print("-" * 50)
+    print("Local Content KPI Calculation Complete!")
+
+if __name__ == "__main__":
+    main()
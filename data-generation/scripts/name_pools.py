@@ -0,0 +1,206 @@
+"""
+Name and Contact Pools
+Fast name/contact synthesis for registry-scale supplier generation: Faker is
+sampled once per field into vocabulary pools, and records are composed from
+pool draws by vectorized index (emails, addresses and phone numbers are
+assembled from parts, so their uniqueness grows with the registry like
+Faker's own). Ghana-specific vocabularies are included
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from faker import Faker
+except ImportError:
+    Faker = None
+
+# Draws per Faker field when building a pool
+DEFAULT_POOL_SIZE = 5000
+
+# Ghana vocabularies
+GHANA_PREFIXES = [
+    'Ahafo', 'Asante', 'Kumasi', 'Accra', 'Tema', 'Brong', 'Ghana', 'Golden',
+    'West Africa', 'Ashanti', 'Volta', 'Kenyasi', 'Ntotroso', 'Sunyani', 'Obuasi',
+    'Tarkwa', 'Takoradi', 'Akyem', 'Bono', 'Techiman', 'Koforidua', 'Cape Coast',
+    'Black Star', 'Adinkra', 'Sankofa', 'Gye Nyame', 'Pra River', 'Akwatia', 'Nkawkaw'
+]
+
+BUSINESS_TYPES = [
+    'Services', 'Enterprise', 'Trading', 'Construction', 'Engineering', 'Logistics',
+    'Solutions', 'Industries', 'Mining Services', 'Technical', 'Supplies', 'Ventures',
+    'Contractors', 'Haulage', 'Catering', 'Agro Processing', 'Security', 'Consult',
+    'Drilling', 'Fabrication', 'Transport', 'Resources', 'Energy', 'Hardware'
+]
+
+GHANAIAN_FIRST_NAMES = [
+    'Kwame', 'Kofi', 'Kwaku', 'Yaw', 'Kwabena', 'Kwasi', 'Kojo', 'Kwesi', 'Kobina',
+    'Fiifi', 'Ebo', 'Nana', 'Ama', 'Akosua', 'Abena', 'Adwoa', 'Afua', 'Akua', 'Yaa',
+    'Efua', 'Esi', 'Araba', 'Adjoa', 'Afia', 'Emmanuel', 'Samuel', 'Isaac', 'Daniel',
+    'Joseph', 'Richard', 'Michael', 'Eric', 'Francis', 'Prince', 'Stephen', 'Ebenezer',
+    'Gifty', 'Comfort', 'Grace', 'Mercy', 'Patience', 'Felicia', 'Joyce', 'Vida',
+    'Priscilla', 'Doris', 'Rita', 'Beatrice', 'Sandra', 'Linda'
+]
+
+GHANAIAN_SURNAMES = [
+    'Mensah', 'Owusu', 'Boateng', 'Asante', 'Osei', 'Agyeman', 'Appiah', 'Ofori',
+    'Darko', 'Amoah', 'Acheampong', 'Addo', 'Badu', 'Frimpong', 'Opoku', 'Quaye',
+    'Tetteh', 'Nkrumah', 'Ansah', 'Danquah', 'Amponsah', 'Gyamfi', 'Sarpong', 'Yeboah',
+    'Bonsu', 'Antwi', 'Asamoah', 'Kyei', 'Manu', 'Adjei', 'Annan', 'Quaicoe', 'Arthur',
+    'Essien', 'Baah', 'Nyarko', 'Kusi', 'Ampofo', 'Donkor', 'Obeng', 'Kumi', 'Sekyere',
+    'Awuah', 'Fosu', 'Ntim', 'Oppong', 'Asiedu', 'Wiredu', 'Aidoo', 'Lamptey'
+]
+
+GHANA_TOWNS = [
+    'Accra', 'Kumasi', 'Tema', 'Takoradi', 'Tamale', 'Sunyani', 'Obuasi', 'Tarkwa',
+    'Kenyasi', 'Cape Coast', 'Koforidua', 'Ho', 'Techiman', 'Berekum', 'Goaso',
+    'Hwidiem', 'Duayaw Nkwanta', 'Bechem', 'Dormaa Ahenkro', 'Nkawkaw'
+]
+
+GHANA_STREETS = [
+    'Liberation Road', 'Independence Avenue', 'Kwame Nkrumah Avenue', 'Ring Road',
+    'Oxford Street', 'Spintex Road', 'Harbour Road', 'Lake Road', 'Sunyani Road',
+    'Mine Road', 'Station Road', 'Market Street', 'High Street', 'Hospital Road',
+    'Airport Road', 'Nsawam Road', 'Prempeh II Street', 'Bantama High Street'
+]
+
+# Region codes used in GhanaPost GPS digital addresses
+GHANA_GPS_REGIONS = ['GA', 'AK', 'BA', 'BS', 'WR', 'CR', 'ER', 'VR', 'NR', 'AH']
+
+# Mobile network prefixes (MTN, Vodafone, AirtelTigo)
+GHANA_MOBILE_PREFIXES = ['20', '23', '24', '26', '27', '50', '54', '55', '56', '57', '59']
+
+EMAIL_DOMAINS = ['example.com', 'example.org', 'example.net']
+
+
+def _ascii_lower(values):
+    """Lower-case ASCII form of a string array (for email user names)"""
+    return (
+        pd.Series(values, dtype='string').str.lower()
+        .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+        .str.replace(r'[^a-z0-9]', '', regex=True)
+        .to_numpy(dtype=object)
+    )
+
+
+def _digits(rng, n, width):
+    """n zero-padded random digit strings of the given width"""
+    return np.char.zfill(rng.integers(0, 10 ** width, size=n).astype(str), width).astype(object)
+
+
+class ContactPools:
+    """Vocabulary pools for names, companies and contact details
+
+    Pools are sampled once from Faker (or built from the Ghana vocabularies
+    when ghana is set or Faker is not installed); draw methods then index
+    them with a NumPy Generator, so record synthesis is vectorized.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, seed=42, ghana=False):
+        self.ghana = ghana or Faker is None
+
+        fake = None
+        if Faker is not None:
+            fake = Faker()
+            fake.seed_instance(seed)
+
+        if self.ghana:
+            self.first_names = np.array(GHANAIAN_FIRST_NAMES, dtype=object)
+            self.last_names = np.array(GHANAIAN_SURNAMES, dtype=object)
+            self.streets = np.array(GHANA_STREETS, dtype=object)
+            self.cities = np.array(GHANA_TOWNS, dtype=object)
+        else:
+            self.first_names = np.array([fake.first_name() for _ in range(pool_size)], dtype=object)
+            self.last_names = np.array([fake.last_name() for _ in range(pool_size)], dtype=object)
+            self.streets = np.array([fake.street_name() for _ in range(pool_size)], dtype=object)
+            self.cities = np.array([fake.city() for _ in range(pool_size)], dtype=object)
+            self.states = np.array([fake.state_abbr() for _ in range(pool_size)], dtype=object)
+
+        if fake is not None:
+            self.companies = np.array([fake.company() for _ in range(pool_size)], dtype=object)
+        else:
+            rng = np.random.default_rng(seed)
+            self.companies = (
+                self.last_names[rng.integers(0, len(self.last_names), size=pool_size)]
+                + ' ' + np.array(BUSINESS_TYPES, dtype=object)[rng.integers(0, len(BUSINESS_TYPES), size=pool_size)]
+            )
+        self.first_words = np.array([company.split()[0] for company in self.companies], dtype=object)
+
+        self._first_user = _ascii_lower(self.first_names)
+        self._last_user = _ascii_lower(self.last_names)
+
+    @staticmethod
+    def _pick(rng, pool, n):
+        return pool[rng.integers(0, len(pool), size=n)]
+
+    def person_names(self, rng, n):
+        """Contact person names"""
+        return self._pick(rng, self.first_names, n) + ' ' + self._pick(rng, self.last_names, n)
+
+    def companies_sample(self, rng, n):
+        """Company names (Faker's company() formats)"""
+        return self._pick(rng, self.companies, n)
+
+    def company_first_words(self, rng, n):
+        """First word of a company name (international partner brand)"""
+        return self._pick(rng, self.first_words, n)
+
+    def emails(self, rng, n):
+        """Email addresses built from Faker's user-name patterns
+
+        Patterns: last.first, first.last, first## and ?last (initial + last name).
+        """
+
+        first = rng.integers(0, len(self._first_user), size=n)
+        last = rng.integers(0, len(self._last_user), size=n)
+        first_user = self._first_user[first]
+        last_user = self._last_user[last]
+        initials = np.array(list('abcdefghijklmnopqrstuvwxyz'), dtype=object)[rng.integers(0, 26, size=n)]
+
+        pattern = rng.integers(0, 4, size=n)
+        user = np.select(
+            [pattern == 0, pattern == 1, pattern == 2],
+            [last_user + '.' + first_user, first_user + '.' + last_user, first_user + _digits(rng, n, 2)],
+            initials + last_user
+        )
+        return user + '@' + self._pick(rng, np.array(EMAIL_DOMAINS, dtype=object), n)
+
+    def phones(self, rng, n):
+        """Phone numbers (+233 mobile numbers in Ghana mode)"""
+        if self.ghana:
+            prefix = self._pick(rng, np.array(GHANA_MOBILE_PREFIXES, dtype=object), n)
+            return '+233 ' + prefix + ' ' + _digits(rng, n, 3) + ' ' + _digits(rng, n, 4)
+
+        area = rng.integers(200, 1000, size=n).astype(str).astype(object)
+        exchange = _digits(rng, n, 3)
+        line = _digits(rng, n, 4)
+        style = rng.integers(0, 3, size=n)
+        return np.select(
+            [style == 0, style == 1],
+            [area + '.' + exchange + '.' + line, '(' + area + ')' + exchange + '-' + line],
+            '+1-' + area + '-' + exchange + '-' + line
+        )
+
+    def addresses(self, rng, n):
+        """Single-line postal addresses (GhanaPost GPS digital addresses in Ghana mode)"""
+
+        number = rng.integers(1, 1000, size=n).astype(str).astype(object)
+        street = self._pick(rng, self.streets, n)
+        city = self._pick(rng, self.cities, n)
+        if self.ghana:
+            gps = (self._pick(rng, np.array(GHANA_GPS_REGIONS, dtype=object), n)
+                   + '-' + _digits(rng, n, 3) + '-' + _digits(rng, n, 4))
+            return number + ' ' + street + ', ' + city + ', ' + gps
+
+        state = self._pick(rng, self.states, n)
+        postcode = _digits(rng, n, 5)
+        return number + ' ' + street + ', ' + city + ', ' + state + ' ' + postcode
+
+    def contacts(self, rng, n):
+        """Contact person, phone, email and address columns for n suppliers"""
+        return {
+            'contact_person': self.person_names(rng, n),
+            'phone': self.phones(rng, n),
+            'email': self.emails(rng, n),
+            'address': self.addresses(rng, n)
+        }
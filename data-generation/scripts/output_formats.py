@@ -0,0 +1,324 @@
+"""
+Columnar Output Formats
+Typed Parquet / Arrow IPC writers (and readers) for the generated datasets
+Categoricals are dictionary-encoded, dates are real dates and money is decimal
+"""
+
+import os
+import shutil
+
+import pandas as pd
+
+from instrumentation import phase
+from streaming import write_csv_batches
+
+# pyarrow is optional; CSV output works without it
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+OUTPUT_FORMATS = ['csv', 'parquet', 'arrow']
+
+FILE_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Column holding the date each dataset is partitioned by (performance has a year column)
+PARTITION_DATE_COLUMNS = {
+    'suppliers': 'registration_date',
+    'procurement': 'transaction_date',
+    'performance': None,
+    'nadef': 'start_date'
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for parquet/arrow output: pip install pyarrow")
+
+
+def dataset_schema(dataset):
+    """Explicit Arrow schema for one of the four generated datasets"""
+
+    _require_pyarrow()
+    category = pa.dictionary(pa.int32(), pa.string())
+    money = pa.decimal128(18, 2)
+    score = pa.float64()
+
+    schemas = {
+        'suppliers': [
+            ('supplier_id', pa.string()),
+            ('company_name', pa.string()),
+            ('classification', category),
+            ('ownership_percentage', pa.float64()),
+            ('distance_from_mine_km', pa.float64()),
+            ('registration_date', pa.date32()),
+            ('primary_category', category),
+            ('secondary_category', category),
+            ('annual_revenue_usd', money),
+            ('certification_status', category),
+            ('contact_person', pa.string()),
+            ('phone', pa.string()),
+            ('email', pa.string()),
+            ('address', pa.string()),
+            ('tax_id', pa.string()),
+            ('employees_count', pa.int32()),
+            ('founded_year', pa.int16()),
+            ('website', pa.string())
+        ],
+        'procurement': [
+            ('transaction_id', pa.string()),
+            ('supplier_id', pa.string()),
+            ('transaction_date', pa.date32()),
+            ('contract_value_usd', money),
+            ('currency', category),
+            ('category', category),
+            ('subcategory', category),
+            ('department', category),
+            ('contract_duration_months', pa.int16()),
+            ('tender_type', category),
+            ('local_content_percentage', pa.float64()),
+            ('payment_terms', category),
+            ('contract_start_date', pa.date32()),
+            ('contract_end_date', pa.date32()),
+            ('po_number', pa.string()),
+            ('delivery_location', category),
+            ('project_code', pa.string()),
+            ('budget_code', pa.string()),
+            ('approval_level', category),
+            ('contract_status', category)
+        ],
+        'performance': [
+            ('performance_id', pa.string()),
+            ('supplier_id', pa.string()),
+            ('year', pa.int16()),
+            ('quarter', pa.int8()),
+            ('assessment_date', pa.date32()),
+            ('delivery_performance_pct', score),
+            ('quality_score', score),
+            ('cost_competitiveness_score', score),
+            ('safety_compliance_score', score),
+            ('contract_compliance_pct', score),
+            ('innovation_score', score),
+            ('capacity_utilization_pct', score),
+            ('overall_score', score),
+            ('improvement_recommendations', category),
+            ('contract_renewals_eligible', category),
+            ('assessed_by', category)
+        ],
+        'nadef': [
+            ('project_id', pa.string()),
+            ('project_name', pa.string()),
+            ('community', category),
+            ('category', category),
+            ('start_date', pa.date32()),
+            ('end_date', pa.date32()),
+            ('budget_usd', money),
+            ('actual_spend_usd', money),
+            ('beneficiaries_count', pa.int32()),
+            ('status', category),
+            ('impact_score', score),
+            ('completion_percentage', score),
+            ('project_manager', category),
+            ('implementing_partner', category),
+            ('funding_source', category)
+        ]
+    }
+
+    if dataset not in schemas:
+        raise ValueError(f"Unknown dataset '{dataset}', expected one of {sorted(schemas)}")
+    return pa.schema(schemas[dataset])
+
+
+def to_arrow_table(df, dataset, partition_by_year=False):
+    """Convert a generator DataFrame to an Arrow table with the dataset schema"""
+
+    schema = dataset_schema(dataset)
+    arrays = []
+    for field in schema:
+        column = df[field.name]
+        if pa.types.is_date32(field.type):
+            array = pa.array(pd.to_datetime(column).dt.date, type=pa.date32())
+        elif pa.types.is_decimal(field.type):
+            array = pc.round(pa.array(column, type=pa.float64()), 2).cast(field.type)
+        elif pa.types.is_dictionary(field.type):
+            array = pa.array(column, type=pa.string()).dictionary_encode()
+            array = array.cast(field.type)
+        else:
+            array = pa.array(column, type=field.type, from_pandas=True)
+        arrays.append(array)
+
+    table = pa.Table.from_arrays(arrays, schema=schema)
+
+    date_column = PARTITION_DATE_COLUMNS[dataset]
+    if partition_by_year and date_column is not None:
+        table = table.append_column('year', pc.year(table[date_column]).cast(pa.int16()))
+    return table
+
+
+def _extend_dictionaries(table, dictionaries):
+    """Re-encode dictionary columns against per-field dictionaries that only grow
+
+    An Arrow IPC file holds one dictionary per field plus delta batches, so
+    a batch may only append values to the dictionary earlier batches used.
+    dictionaries ({field: values so far}) is updated in place.
+    """
+
+    arrays = []
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_dictionary(field.type):
+            values = column.cast(field.type.value_type).combine_chunks()
+            previous = dictionaries.get(field.name, pa.array([], type=field.type.value_type))
+            unique = pc.unique(values).drop_null()
+            added = unique.filter(pc.invert(pc.is_in(unique, value_set=previous)))
+            dictionaries[field.name] = pa.concat_arrays([previous, added])
+            indices = pc.index_in(values, value_set=dictionaries[field.name]).cast(field.type.index_type)
+            column = pa.DictionaryArray.from_arrays(indices, dictionaries[field.name])
+        arrays.append(column)
+    return pa.Table.from_arrays(arrays, schema=table.schema)
+
+
+def from_arrow_table(table):
+    """Arrow table -> DataFrame with the generators' CSV dtypes
+
+    Used for in-memory handoff between generators: dictionary columns become
+    plain strings, dates ISO strings and decimals floats, matching what
+    pd.read_csv returns for the same dataset.
+    """
+
+    _require_pyarrow()
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        elif pa.types.is_date32(column.type):
+            column = pc.strftime(column.cast(pa.timestamp('s')), format='%Y-%m-%d')
+        elif pa.types.is_decimal(column.type):
+            column = column.cast(pa.float64())
+        columns[name] = column
+    return pa.table(columns).to_pandas()
+
+
+def as_dataframe(data):
+    """DataFrame view of a DataFrame or an Arrow table handed over in memory"""
+    if isinstance(data, pd.DataFrame):
+        return data
+    return from_arrow_table(data)
+
+
+def output_path_for(csv_path, fmt, partition_by_year=False):
+    """Swap the .csv extension of a default output path for the chosen format"""
+
+    base, _ = os.path.splitext(csv_path)
+    if partition_by_year and fmt != 'csv':
+        return base
+    return base + FILE_EXTENSIONS[fmt]
+
+
+def write_dataset(data, output_path, dataset, fmt='csv', partition_by_year=False):
+    """Write a DataFrame or an iterable of DataFrame batches in the chosen format
+
+    With partition_by_year, output_path is a directory of hive-style
+    year=YYYY partitions. Returns the number of rows written.
+    """
+
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{fmt}', expected one of {OUTPUT_FORMATS}")
+
+    batches = [data] if isinstance(data, pd.DataFrame) else data
+
+    if fmt == 'csv':
+        if partition_by_year:
+            raise ValueError("Year partitioning requires parquet or arrow output")
+        return write_csv_batches(batches, output_path)
+
+    _require_pyarrow()
+    file_format = 'parquet' if fmt == 'parquet' else 'ipc'
+
+    if partition_by_year:
+        if os.path.isdir(output_path):
+            shutil.rmtree(output_path)
+        rows_written = 0
+        for batch_number, batch in enumerate(batches):
+            with phase(f'write.{fmt}', rows=len(batch)):
+                table = to_arrow_table(batch, dataset, partition_by_year=True)
+                ds.write_dataset(
+                    table, output_path, format=file_format,
+                    partitioning=ds.partitioning(pa.schema([('year', pa.int16())]), flavor='hive'),
+                    basename_template=f'part-{batch_number:05d}-{{i}}{FILE_EXTENSIONS[fmt]}',
+                    existing_data_behavior='overwrite_or_ignore')
+            rows_written += table.num_rows
+        return rows_written
+
+    # Single file, appended batch by batch
+    schema = dataset_schema(dataset)
+    tmp_path = output_path + '.partial'
+    rows_written = 0
+    dictionaries = {}
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(tmp_path, schema)
+    else:
+        writer = pa.ipc.new_file(tmp_path, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+    try:
+        for batch in batches:
+            with phase(f'write.{fmt}', rows=len(batch)):
+                table = to_arrow_table(batch, dataset)
+                if fmt == 'arrow':
+                    table = _extend_dictionaries(table, dictionaries)
+                writer.write_table(table)
+            rows_written += table.num_rows
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+    writer.close()
+
+    os.replace(tmp_path, output_path)
+    return rows_written
+
+
+def _year_column(names):
+    """Column to filter years on: 'year' itself, else the first partition date column present"""
+
+    if 'year' in names:
+        return 'year'
+    for column in PARTITION_DATE_COLUMNS.values():
+        if column is not None and column in names:
+            return column
+    raise ValueError("Year filtering needs a 'year' column or one of the dataset date columns "
+                     f"{sorted(c for c in PARTITION_DATE_COLUMNS.values() if c)}")
+
+
+def read_dataset(path, columns=None, years=None):
+    """Read a csv/parquet/arrow dataset, optionally pruning columns and years
+
+    Year filtering prunes whole partitions when the dataset was written with
+    partition_by_year; otherwise it is applied as a row filter on the 'year'
+    column, or on the year of the dataset's date column (e.g. transaction_date).
+    """
+
+    if path.endswith('.csv'):
+        if years is None:
+            return pd.read_csv(path, usecols=columns)
+        year_column = _year_column(pd.read_csv(path, nrows=0).columns)
+        usecols = None if columns is None else list(dict.fromkeys(list(columns) + [year_column]))
+        df = pd.read_csv(path, usecols=usecols)
+        year = df[year_column] if year_column == 'year' else pd.to_datetime(df[year_column]).dt.year
+        df = df[year.isin(years).to_numpy()]
+        return df if columns is None else df[list(columns)]
+
+    _require_pyarrow()
+    if os.path.isdir(path):
+        fmt = 'ipc' if any(name.endswith('.arrow') for _, _, files in os.walk(path) for name in files) else 'parquet'
+        dataset = ds.dataset(path, format=fmt, partitioning='hive')
+    else:
+        dataset = ds.dataset(path, format='ipc' if path.endswith('.arrow') else 'parquet')
+
+    row_filter = None
+    if years is not None:
+        year_column = _year_column(dataset.schema.names)
+        year = ds.field('year') if year_column == 'year' else pc.year(ds.field(year_column))
+        row_filter = year.isin(list(years))
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
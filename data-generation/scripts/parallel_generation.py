@@ -0,0 +1,165 @@
+"""
+Parallel Generation Driver
+Shards procurement and performance generation across a process pool
+Each shard gets its own SeedSequence-spawned generator and a contiguous id
+range, so output is bit-identical for a given seed and shard count
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from generate_procurement import ProcurementGenerator
+from generate_supplier_performance import PerformanceGenerator
+
+
+def shard_bounds(total, num_shards):
+    """Contiguous [start, stop) ranges splitting total items into num_shards"""
+    edges = np.linspace(0, total, num_shards + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def spawn_seeds(seed, num_shards):
+    """Independent per-shard seed sequences derived from one root seed"""
+    return np.random.SeedSequence(seed).spawn(num_shards)
+
+
+def _write_part(df, part_path, header):
+    """Write one shard to its part file"""
+    df.to_csv(part_path, index=False, header=header)
+    return len(df)
+
+
+def _procurement_shard(supplier_file, start, stop, seed_seq, part_path, header):
+    """Worker: generate transactions [start, stop) with the shard's generator"""
+    generator = ProcurementGenerator(supplier_file=supplier_file, num_transactions=stop - start)
+    rng = np.random.default_rng(seed_seq)
+    df = generator.generate_transactions_vectorized(seed=rng, start_index=start, size=stop - start)
+    if part_path is None:
+        return df
+    return _write_part(df, part_path, header)
+
+
+def _performance_shard(supplier_file, supplier_start, supplier_stop, start_index, seed_seq,
+                       supplier_chunk_size, part_path, header):
+    """Worker: generate assessments for suppliers [supplier_start, supplier_stop)"""
+    generator = PerformanceGenerator(supplier_file=supplier_file)
+    blocks = list(generator._iter_supplier_blocks(
+        np.random.default_rng(seed_seq), supplier_chunk_size,
+        supplier_start=supplier_start, supplier_stop=supplier_stop, start_index=start_index))
+    df = pd.concat(blocks, ignore_index=True) if blocks else pd.DataFrame()
+    if part_path is None:
+        return df
+    return _write_part(df, part_path, header)
+
+
+def _run_shards(worker, shard_args, output_path, max_workers):
+    """Run shard workers and merge their results in shard order"""
+
+    if output_path is None:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(worker, *args, None, False) for args in shard_args]
+            frames = [future.result() for future in futures]
+        return pd.concat(frames, ignore_index=True)
+
+    # Shards write part files that are concatenated byte-for-byte in order
+    part_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        part_paths = [os.path.join(part_dir, f'part-{i:05d}.csv') for i in range(len(shard_args))]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(worker, *args, part_path, i == 0)
+                for i, (args, part_path) in enumerate(zip(shard_args, part_paths))
+            ]
+            rows = sum(future.result() for future in futures)
+
+        tmp_path = output_path + '.partial'
+        with open(tmp_path, 'wb') as out:
+            for part_path in part_paths:
+                with open(part_path, 'rb') as part:
+                    shutil.copyfileobj(part, out)
+        os.replace(tmp_path, output_path)
+        return rows
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+
+def generate_transactions_parallel(num_transactions, supplier_file='../output/supplier_registry.csv',
+                                   seed=42, num_shards=None, max_workers=None, output_path=None):
+    """Sharded ProcurementGenerator.generate_transactions_vectorized
+
+    Returns the merged DataFrame, or the row count when output_path is given.
+    """
+
+    num_shards = num_shards or os.cpu_count()
+    supplier_file = os.path.abspath(supplier_file)
+    seeds = spawn_seeds(seed, num_shards)
+
+    shard_args = [
+        (supplier_file, start, stop, seed_seq)
+        for (start, stop), seed_seq in zip(shard_bounds(num_transactions, num_shards), seeds)
+    ]
+    return _run_shards(_procurement_shard, shard_args, output_path, max_workers)
+
+
+def generate_performance_parallel(supplier_file='../output/supplier_registry.csv', seed=42,
+                                  num_shards=None, max_workers=None, output_path=None,
+                                  supplier_chunk_size=10000):
+    """Sharded PerformanceGenerator.generate_performance_vectorized
+
+    Suppliers are split into contiguous ranges; PERF ids for each shard start
+    after the assessments of all preceding suppliers.
+    """
+
+    num_shards = num_shards or os.cpu_count()
+    supplier_file = os.path.abspath(supplier_file)
+    seeds = spawn_seeds(seed, num_shards)
+
+    # Assessment counts are deterministic, so id offsets are known up front
+    counts = PerformanceGenerator(supplier_file=supplier_file).assessment_counts()
+    row_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    shard_args = [
+        (supplier_file, start, stop, int(row_offsets[start]), seed_seq, supplier_chunk_size)
+        for (start, stop), seed_seq in zip(shard_bounds(len(counts), num_shards), seeds)
+    ]
+    return _run_shards(_performance_shard, shard_args, output_path, max_workers)
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description="Sharded multi-process data generation")
+    parser.add_argument('dataset', choices=['procurement', 'performance'])
+    parser.add_argument('--num-transactions', type=int, default=5000)
+    parser.add_argument('--shards', type=int, default=os.cpu_count())
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"Starting parallel {args.dataset} generation ({args.shards} shards)...")
+    print("-" * 50)
+
+    if args.dataset == 'procurement':
+        output_path = '../output/procurement_transactions.csv'
+        rows = generate_transactions_parallel(
+            args.num_transactions, seed=args.seed, num_shards=args.shards,
+            max_workers=args.workers, output_path=output_path)
+    else:
+        output_path = '../output/supplier_performance.csv'
+        rows = generate_performance_parallel(
+            seed=args.seed, num_shards=args.shards, max_workers=args.workers,
+            output_path=output_path)
+
+    print(f"\nRows Generated: {rows}")
+    print(f"Data saved to: {output_path}")
+    print("-" * 50)
+    print("Parallel Generation Complete!")
+
+if __name__ == "__main__":
+    main()
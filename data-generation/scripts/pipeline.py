@@ -0,0 +1,316 @@
+"""
+Data Generation Pipeline
+Single entry point for the four generators, declared as a stage DAG:
+NADeF projects run alongside the supplier registry, then procurement,
+performance and the classification history run in parallel once the
+registry exists. Stages whose inputs,
+parameters, seed and code are unchanged are skipped (content-hash caching),
+and outputs seen before are restored from the shared dataset cache
+Paths are absolute, so the pipeline can be run from any directory
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from streaming import DEFAULT_BATCH_SIZE, seed_globals
+from dataset_cache import DatasetCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, cache_key
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_DIR = os.path.normpath(os.path.join(SCRIPTS_DIR, '..', 'output'))
+
+MANIFEST_NAME = '.pipeline_manifest.json'
+
+# Output file of each stage (relative to the output directory)
+STAGE_OUTPUTS = {
+    'suppliers': 'supplier_registry.csv',
+    'nadef': 'nadef_projects.csv',
+    'procurement': 'procurement_transactions.csv',
+    'performance': 'supplier_performance.csv',
+    'history': 'supplier_classification_history.csv'
+}
+
+
+def run_suppliers(params, output_dir):
+    from generate_suppliers import SupplierGenerator
+    from output_formats import write_dataset
+
+    seed_globals(params['seed'])
+    generator = SupplierGenerator(num_suppliers=params['num_suppliers'])
+    return write_dataset(generator.generate_suppliers(),
+                         os.path.join(output_dir, STAGE_OUTPUTS['suppliers']), 'suppliers')
+
+
+def run_nadef(params, output_dir):
+    from generate_nadef_projects import NADeFGenerator
+    from output_formats import write_dataset
+
+    seed_globals(params['seed'])
+    generator = NADeFGenerator(num_projects=params['num_projects'])
+    return write_dataset(generator.iter_project_batches(params['batch_size']),
+                         os.path.join(output_dir, STAGE_OUTPUTS['nadef']), 'nadef')
+
+
+def run_procurement(params, output_dir):
+    from generate_procurement import ProcurementGenerator
+    from output_formats import write_dataset
+
+    generator = ProcurementGenerator(
+        supplier_file=os.path.join(output_dir, STAGE_OUTPUTS['suppliers']),
+        num_transactions=params['num_transactions'])
+    batches = generator.iter_transaction_batches(params['batch_size'], seed=params['seed'])
+    return write_dataset(batches, os.path.join(output_dir, STAGE_OUTPUTS['procurement']), 'procurement')
+
+
+def run_performance(params, output_dir):
+    from generate_supplier_performance import PerformanceGenerator
+    from output_formats import write_dataset
+
+    generator = PerformanceGenerator(supplier_file=os.path.join(output_dir, STAGE_OUTPUTS['suppliers']))
+    batches = generator.iter_performance_batches(params['batch_size'], seed=params['seed'])
+    return write_dataset(batches, os.path.join(output_dir, STAGE_OUTPUTS['performance']), 'performance')
+
+
+def run_history(params, output_dir):
+    import pandas as pd
+    from classification_history import generate_history
+    from output_formats import write_dataset
+
+    supplier_df = pd.read_csv(os.path.join(output_dir, STAGE_OUTPUTS['suppliers']))
+    return write_dataset(generate_history(supplier_df, seed=params['seed']),
+                         os.path.join(output_dir, STAGE_OUTPUTS['history']), 'history')
+
+
+class Stage:
+    """One node of the generation DAG"""
+
+    def __init__(self, name, run, depends_on=(), params=(), modules=()):
+        # modules: the stage's entry script and any data files it reads; the
+        # local scripts it imports are found by local_modules()
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.params = list(params)
+        self.modules = list(modules)
+
+
+# Business rules read through scenario_config (relative to the scripts directory)
+SCENARIO_FILE = os.path.join('..', 'config', 'default_scenario.json')
+
+STAGES = [
+    Stage('suppliers', run_suppliers, params=['num_suppliers', 'seed'],
+          modules=['generate_suppliers.py']),
+    Stage('nadef', run_nadef, params=['num_projects', 'batch_size', 'seed'],
+          modules=['generate_nadef_projects.py', SCENARIO_FILE]),
+    Stage('procurement', run_procurement, depends_on=['suppliers'],
+          params=['num_transactions', 'batch_size', 'seed'],
+          modules=['generate_procurement.py', SCENARIO_FILE]),
+    Stage('performance', run_performance, depends_on=['suppliers'],
+          params=['batch_size', 'seed'],
+          modules=['generate_supplier_performance.py', SCENARIO_FILE]),
+    Stage('history', run_history, depends_on=['suppliers'], params=['seed'],
+          modules=['classification_history.py'])
+]
+
+
+def _imported_names(path):
+    """Top-level names of every absolute import in a Python file, including function-level imports"""
+    with open(path) as handle:
+        tree = ast.parse(handle.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name.split('.')[0]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            yield node.module.split('.')[0]
+
+
+def local_modules(modules):
+    """The given files plus every script in SCRIPTS_DIR they import, directly or transitively"""
+
+    found = set()
+    pending = list(modules)
+    while pending:
+        module = pending.pop()
+        if module in found:
+            continue
+        found.add(module)
+        if module.endswith('.py'):
+            for name in _imported_names(os.path.join(SCRIPTS_DIR, module)):
+                if os.path.exists(os.path.join(SCRIPTS_DIR, name + '.py')):
+                    pending.append(name + '.py')
+    return sorted(found)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """BLAKE2b digest of a file's contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_key(stage, params, output_digests):
+    """Cache key over the stage's parameters, seed, source code and input files"""
+
+    stage_params = {name: params[name] for name in stage.params if name != 'seed'}
+    stage_params['inputs'] = {dependency: output_digests[dependency] for dependency in stage.depends_on}
+    code_version = {module: file_digest(os.path.join(SCRIPTS_DIR, module))
+                    for module in local_modules(stage.modules)}
+    return cache_key(stage.name, stage_params, params['seed'], code_version)
+
+
+def _load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + '.partial', 'w') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(path + '.partial', path)
+
+
+def run_pipeline(params, output_dir=DEFAULT_OUTPUT_DIR, max_workers=None, force=False, stages=STAGES,
+                 cache=None):
+    """Run the stage DAG; returns {stage: {'status', 'seconds', 'rows'}}
+
+    Independent stages run concurrently in worker processes. A stage is
+    skipped when its cache key matches the manifest and its output file
+    still has the recorded digest; otherwise it is restored from cache (a
+    DatasetCache) when the key was generated before, and run if not.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {} if force else _load_manifest(output_dir)
+    by_name = {stage.name: stage for stage in stages}
+    pending = dict(by_name)
+    output_digests = {}
+    report = {}
+
+    def ready_stages():
+        return [stage for stage in pending.values()
+                if all(dependency in output_digests for dependency in stage.depends_on)]
+
+    def up_to_date(stage, key):
+        entry = manifest.get(stage.name)
+        output_path = os.path.join(output_dir, STAGE_OUTPUTS[stage.name])
+        return (entry is not None and entry['key'] == key and os.path.exists(output_path)
+                and file_digest(output_path) == entry['output_digest'])
+
+    def record(stage, key):
+        output_path = os.path.join(output_dir, STAGE_OUTPUTS[stage.name])
+        digest = file_digest(output_path)
+        output_digests[stage.name] = digest
+        manifest[stage.name]['output_digest'] = digest
+        manifest[stage.name]['key'] = key
+        _save_manifest(output_dir, manifest)
+        return output_path
+
+    def restore(stage, key):
+        started = time.perf_counter()
+        metadata = cache.fetch(key, os.path.join(output_dir, STAGE_OUTPUTS[stage.name]))
+        if metadata is None:
+            return None
+        manifest[stage.name] = {'rows': metadata['rows']}
+        record(stage, key)
+        return {'status': 'cached', 'seconds': time.perf_counter() - started, 'rows': metadata['rows']}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        while pending or running:
+            # Skipping a stage can unblock its dependents, so drain until nothing is ready
+            ready = ready_stages()
+            while ready:
+                for stage in ready:
+                    del pending[stage.name]
+                    key = stage_key(stage, params, output_digests)
+                    if up_to_date(stage, key):
+                        output_digests[stage.name] = manifest[stage.name]['output_digest']
+                        report[stage.name] = {'status': 'skipped', 'seconds': 0.0,
+                                              'rows': manifest[stage.name]['rows']}
+                        continue
+                    if cache is not None and not force:
+                        restored = restore(stage, key)
+                        if restored is not None:
+                            report[stage.name] = restored
+                            continue
+                    future = executor.submit(stage.run, params, output_dir)
+                    running[future] = (stage, key, time.perf_counter())
+                ready = ready_stages()
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key, started = running.pop(future)
+                rows = future.result()
+                manifest[stage.name] = {'rows': rows}
+                output_path = record(stage, key)
+                if cache is not None:
+                    cache.store(key, output_path, stage=stage.name, rows=rows,
+                                params={name: params[name] for name in stage.params})
+                report[stage.name] = {'status': 'ran', 'seconds': time.perf_counter() - started,
+                                      'rows': rows}
+
+    return report
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description='Run the full data generation pipeline')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--num-suppliers', type=int, default=500)
+    parser.add_argument('--num-transactions', type=int, default=5000)
+    parser.add_argument('--num-projects', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for independent stages (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Re-run every stage, ignoring the cache')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Shared dataset cache (set LOCAL_CONTENT_CACHE_DIR to change the default)')
+    parser.add_argument('--cache-max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help='Disk budget of the dataset cache; least recently used entries are evicted')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read from or write to the dataset cache')
+    args = parser.parse_args()
+
+    params = {
+        'num_suppliers': args.num_suppliers,
+        'num_transactions': args.num_transactions,
+        'num_projects': args.num_projects,
+        'batch_size': args.batch_size,
+        'seed': args.seed
+    }
+
+    print("Starting Data Generation Pipeline...")
+    print("-" * 50)
+
+    started = time.perf_counter()
+    cache = None if args.no_cache else DatasetCache(args.cache_dir, args.cache_max_bytes)
+    report = run_pipeline(params, os.path.abspath(args.output_dir), args.workers, args.force, cache=cache)
+
+    print("\nStage Summary:")
+    for stage in STAGES:
+        entry = report[stage.name]
+        print(f"  {stage.name:<12} {entry['status']:<8} {entry['rows']:>10,} rows  {entry['seconds']:6.1f}s")
+    print(f"\nTotal Wall-Clock Time: {time.perf_counter() - started:.1f}s")
+    print(f"Output Directory: {os.path.abspath(args.output_dir)}")
+    print("-" * 50)
+    print("Data Generation Pipeline Complete!")
+
+if __name__ == "__main__":
+    main()
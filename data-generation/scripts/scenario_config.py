@@ -0,0 +1,213 @@
+"""
+Scenario Configuration
+Loads the business rules in data-generation/config (contract value and local
+content ranges, performance baselines, NADeF budgets, durations and
+beneficiary multipliers) once, and compiles them into integer-indexed NumPy
+lookup arrays so generators look rules up by coded category
+A scenario file may extend another and override only what changes (what-if runs)
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_DIR = os.path.normpath(os.path.join(SCRIPTS_DIR, '..', 'config'))
+DEFAULT_SCENARIO = os.path.join(CONFIG_DIR, 'default_scenario.json')
+
+# Approximate USD to GHS rate used for the injected currency-mixing rows
+GHS_PER_USD = 12.5
+
+# Compiled scenarios by (absolute path, modification times of its extends chain)
+_loaded = {}
+
+
+def _merge(base, override):
+    """Recursive dict merge; override wins"""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _parent_path(path, config):
+    """Absolute path of the scenario a config extends, or None"""
+    parent = config.get('extends')
+    return None if parent is None else os.path.normpath(os.path.join(os.path.dirname(path), parent))
+
+
+def scenario_files(path):
+    """A scenario file and every file of its 'extends' chain, leaf first"""
+    files = []
+    while path is not None:
+        files.append(path)
+        with open(path) as handle:
+            path = _parent_path(path, json.load(handle))
+    return files
+
+
+def read_scenario(path):
+    """Raw scenario dict with any 'extends' chain resolved"""
+
+    with open(path) as handle:
+        config = json.load(handle)
+    parent_path = _parent_path(path, config)
+    config.pop('extends', None)
+    if parent_path is not None:
+        config = _merge(read_scenario(parent_path), config)
+    return config
+
+
+def load_scenario(scenario=None):
+    """Compiled Scenario for a path (default scenario when None); parsed once per version of its files
+
+    A Scenario instance is passed through unchanged.
+    """
+
+    if isinstance(scenario, Scenario):
+        return scenario
+    path = os.path.abspath(scenario or DEFAULT_SCENARIO)
+    key = (path, tuple(os.path.getmtime(f) for f in scenario_files(path)))
+    if key not in _loaded:
+        _loaded[key] = Scenario(read_scenario(path), path)
+    return _loaded[key]
+
+
+def _codes(index, values, default=None):
+    """Integer codes of values in index; unknown values map to default (or raise KeyError)"""
+
+    codes = index.get_indexer(pd.Index(values))
+    unknown = codes < 0
+    if unknown.any():
+        if default is None:
+            raise KeyError(pd.Index(values)[unknown][0])
+        codes[unknown] = default
+    return codes
+
+
+class Scenario:
+    """Business rules compiled to lookup arrays
+
+    Rows of the classification tables follow classification order; NADeF
+    tables have a trailing row holding the default used for categories the
+    scenario does not list (as do the base performance parameters).
+    """
+
+    def __init__(self, config, path=None):
+        self.config = config
+        self.path = path
+        self.name = config.get('name', os.path.splitext(os.path.basename(path or 'scenario'))[0])
+
+        # Supplier classifications
+        tiers = config['classifications']
+        self.classifications = pd.Index(list(tiers))
+        self.contract_value_bounds = np.array([tiers[t]['contract_value_usd'] for t in tiers], dtype=float)
+        self.local_content_bounds = np.array([tiers[t]['local_content_pct'] for t in tiers], dtype=float)
+        default_performance = config['default_base_performance']
+        self.base_performance_params = np.array(
+            [[tiers[t]['base_performance']['mean'], tiers[t]['base_performance']['sd']] for t in tiers]
+            + [[default_performance['mean'], default_performance['sd']]], dtype=float)
+
+        # Procurement category adjustments
+        procurement = config['procurement']
+        self.high_value_categories = pd.Index(procurement['high_value_categories'])
+        self.high_value_multipliers = np.array(procurement['high_value_multipliers'], dtype=float)
+
+        # NADeF project categories
+        nadef = config['nadef']
+        categories = nadef['categories']
+        rules = [categories[c] for c in categories] + [nadef['default_category']]
+        self.nadef_categories = pd.Index(list(categories))
+        self.budget_bounds = np.array([r['budget_usd'] for r in rules], dtype=float)
+        self.beneficiary_multipliers = np.array([r['beneficiary_multiplier'] for r in rules], dtype=float)
+        self.min_beneficiaries = nadef['min_beneficiaries']
+        # Ragged duration lists as a padded table plus per-row lengths
+        self.duration_counts = np.array([len(r['duration_months']) for r in rules])
+        self.duration_options = np.zeros((len(rules), self.duration_counts.max()), dtype=int)
+        for row, rule in enumerate(rules):
+            self.duration_options[row, :len(rule['duration_months'])] = rule['duration_months']
+
+    def classification_codes(self, classifications):
+        """Row codes for classifications (KeyError on an unknown tier)"""
+        return _codes(self.classifications, classifications)
+
+    def nadef_category_codes(self, categories):
+        """Row codes for NADeF categories; unknown categories get the default row"""
+        return _codes(self.nadef_categories, categories, default=len(self.nadef_categories))
+
+    def contract_value_ranges(self, classifications, categories):
+        """(n, 2) contract value bounds by classification, widened for high-value categories"""
+        bounds = self.contract_value_bounds[self.classification_codes(classifications)]
+        high_value = self.high_value_categories.get_indexer(pd.Index(categories)) >= 0
+        bounds[high_value] *= self.high_value_multipliers
+        return bounds
+
+    def local_content_ranges(self, classifications):
+        """(n, 2) local content percentage bounds by classification"""
+        return self.local_content_bounds[self.classification_codes(classifications)]
+
+    def base_performance(self, classifications):
+        """(n, 2) base performance mean and sd; unknown tiers get the default"""
+        codes = _codes(self.classifications, classifications, default=len(self.classifications))
+        return self.base_performance_params[codes]
+
+    def sample_base_performance(self, rng, classifications):
+        """One base performance draw per supplier from its own tier's normal distribution
+
+        Every supplier consumes exactly one draw whatever its tier, so a
+        supplier's score does not depend on the tiers of the others.
+        rng is a np.random.Generator or the legacy np.random module.
+        """
+        params = self.base_performance(classifications)
+        return rng.normal(params[:, 0], params[:, 1])
+
+    def budget_ranges(self, categories):
+        """(n, 2) NADeF budget bounds by category"""
+        return self.budget_bounds[self.nadef_category_codes(categories)]
+
+    def sample_durations(self, rng, categories):
+        """Project durations (months) drawn uniformly from each category's options"""
+        codes = self.nadef_category_codes(categories)
+        choice = (rng.random(len(codes)) * self.duration_counts[codes]).astype(int)
+        return self.duration_options[codes, choice]
+
+    def beneficiaries(self, categories, budgets):
+        """Estimated beneficiaries from budget and category multiplier"""
+        multiplier = self.beneficiary_multipliers[self.nadef_category_codes(categories)]
+        estimate = (np.asarray(budgets, dtype=float) / 1000 * multiplier / 100).astype(int)
+        return np.maximum(self.min_beneficiaries, estimate)
+
+    # Scalar lookups for the row-at-a-time engines
+
+    def _nadef_code(self, category):
+        if category in self.nadef_categories:
+            return self.nadef_categories.get_loc(category)
+        return len(self.nadef_categories)
+
+    def contract_value_range(self, classification, category):
+        min_val, max_val = self.contract_value_bounds[self.classifications.get_loc(classification)]
+        if category in self.high_value_categories:
+            min_val *= self.high_value_multipliers[0]
+            max_val *= self.high_value_multipliers[1]
+        return min_val, max_val
+
+    def local_content_range(self, classification):
+        min_pct, max_pct = self.local_content_bounds[self.classifications.get_loc(classification)]
+        return min_pct, max_pct
+
+    def budget_range(self, category):
+        min_budget, max_budget = self.budget_bounds[self._nadef_code(category)]
+        return min_budget, max_budget
+
+    def duration_choices(self, category):
+        """Duration options (months) for one NADeF category, as a list"""
+        code = self._nadef_code(category)
+        return self.duration_options[code, :self.duration_counts[code]].tolist()
+
+    def beneficiary_multiplier(self, category):
+        return self.beneficiary_multipliers[self._nadef_code(category)]
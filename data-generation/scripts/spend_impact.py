@@ -0,0 +1,254 @@
+"""
+Spend / Community Impact Correlation
+Links procurement spend to NADeF project outcomes: supplier spend is bucketed
+by delivery location and by the supplier's distance from the mine and
+accumulated per day, so the spend during any project's time window is a
+range lookup on prefix sums (no transaction x project merge). Rolling
+windowed correlations between spend and project outcomes are computed from
+prefix sums over projects sorted by start date
+Transactions are delivered to mine sites, not to the host communities, so
+spend reaches a community only through a community -> delivery location
+mapping; without one every project is matched to mine-wide spend in its
+window and a per-community view is a grouping of the outcomes only
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from local_content_kpis import as_list, normalize_currency
+from community_roi import project_roi
+from classification_history import epoch_days
+from supplier_index import DISTANCE_BAND_EDGES, DISTANCE_BAND_LABELS
+
+OUTCOMES = ['impact_score', 'roi', 'cost_per_beneficiary_usd']
+
+
+class SpendTimeline:
+    """Daily spend per delivery location and distance band, as prefix sums over a dense date axis
+
+    Distance bands are the supplier index's geographic pools. Rows without
+    a delivery location get a trailing site slot of their own, which only
+    counts towards mine-wide spend. spend_between(start, end) answers any
+    number of inclusive date-range queries in one vectorized lookup.
+    """
+
+    def __init__(self, transactions_df, supplier_df):
+        df = normalize_currency(transactions_df)
+        self.labels = list(DISTANCE_BAND_LABELS)
+
+        distance = df['supplier_id'].map(supplier_df.set_index('supplier_id')['distance_from_mine_km'])
+        known = distance.notna().to_numpy()
+        band = np.searchsorted(DISTANCE_BAND_EDGES, distance.to_numpy(dtype=float)[known], side='right') - 1
+        band = np.clip(band, 0, len(self.labels) - 1)
+
+        site_codes, self.sites = pd.factorize(df['delivery_location'])
+        site = np.where(site_codes >= 0, site_codes, len(self.sites))[known]
+
+        day = epoch_days(df['transaction_date'])[known]
+        value = df['contract_value_usd'].to_numpy(dtype=float)[known]
+        self.first_day = int(day.min()) if len(day) else 0
+        self.num_days = int(day.max()) - self.first_day + 1 if len(day) else 1
+
+        # Row 0 is an empty prefix so cumulative[d + 1] - cumulative[s] covers days s..d
+        shape = (self.num_days, len(self.sites) + 1, len(self.labels))
+        flat = np.ravel_multi_index((day - self.first_day, site, band), shape)
+        daily = np.bincount(flat, weights=value, minlength=int(np.prod(shape)))
+        self.cumulative = np.zeros((self.num_days + 1,) + shape[1:])
+        np.cumsum(daily.reshape(shape), axis=0, out=self.cumulative[1:])
+
+    def spend_between(self, start, end, sites=None):
+        """(n, bands) spend with transaction dates in [start, end] (int64 epoch days, inclusive)
+
+        sites is an optional (n, len(self.sites)) boolean mask of the
+        delivery locations counted for each query; all spend counts when
+        it is None.
+        """
+
+        lo = np.clip(np.asarray(start) - self.first_day, 0, self.num_days)
+        hi = np.clip(np.asarray(end) - self.first_day + 1, 0, self.num_days)
+        hi = np.maximum(hi, lo)
+        window = self.cumulative[hi] - self.cumulative[lo]
+        if sites is None:
+            return window.sum(axis=1)
+        return np.einsum('nsb,ns->nb', window[:, :-1], np.asarray(sites, dtype=float))
+
+    def site_mask(self, communities, community_sites):
+        """(n, len(self.sites)) delivery locations of each community and whether it is mapped
+
+        community_sites maps a community to one delivery location or a list
+        of them; locations with no recorded spend are ignored.
+        """
+
+        community_codes, uniques = pd.factorize(pd.Series(communities))
+        site_index = pd.Index(self.sites)
+        table = np.zeros((len(uniques) + 1, len(self.sites)), dtype=bool)
+        mapped = np.zeros(len(uniques) + 1, dtype=bool)
+        for i, community in enumerate(uniques):
+            if community in community_sites:
+                positions = site_index.get_indexer(as_list(community_sites[community]))
+                table[i, positions[positions >= 0]] = True
+                mapped[i] = True
+        return table[community_codes], mapped[community_codes]
+
+
+def project_spend(projects_df, timeline, lead_days=365, community_sites=None):
+    """NADeF projects with their outcomes and the spend per distance band in each project's window
+
+    A project's window runs from lead_days before its start to its end date,
+    so spend that precedes (and may enable) a project is included. With
+    community_sites ({community: delivery location(s)}) only the spend
+    delivered to the project's community counts, and projects in unmapped
+    communities get NaN spend; without it the spend is mine-wide.
+    """
+
+    start = epoch_days(projects_df['start_date'])
+    end = epoch_days(projects_df['end_date'])
+    if community_sites is None:
+        spend = timeline.spend_between(start - lead_days, end)
+    else:
+        sites, mapped = timeline.site_mask(projects_df['community'], community_sites)
+        spend = timeline.spend_between(start - lead_days, end, sites)
+        spend[~mapped] = np.nan
+
+    frame = projects_df[['project_id', 'community', 'category', 'start_date', 'end_date']].copy()
+    frame['start_day'] = start
+    frame['impact_score'] = pd.to_numeric(projects_df['impact_score'], errors='coerce')
+    frame['roi'] = project_roi(projects_df)
+    beneficiaries = projects_df['beneficiaries_count'].to_numpy(dtype=float)
+    frame['cost_per_beneficiary_usd'] = np.where(
+        beneficiaries > 0, projects_df['actual_spend_usd'].to_numpy(dtype=float) / np.maximum(beneficiaries, 1),
+        np.nan)
+    for i, label in enumerate(timeline.labels):
+        frame[f'spend_{label}'] = spend[:, i]
+    return frame
+
+
+def _pearson(n, sx, sy, sxx, syy, sxy):
+    """Pearson r from sums (NaN with fewer than 3 points or zero variance)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    return np.where((n >= 3) & (var_x > 0) & (var_y > 0), r, np.nan)
+
+
+def rolling_correlation(features, outcome='impact_score', window_days=3 * 365, step_days=91):
+    """Correlation of band spend with a project outcome over rolling start-date windows
+
+    Each window covers projects starting in (t - window_days, t], with t
+    stepping every step_days. Projects without the outcome or without
+    matched spend are left out.
+    Sums of x, y, x^2, y^2 and xy are prefix-summed over projects sorted by
+    start date, so every window and band is a constant-time difference.
+    """
+
+    spend_columns = [c for c in features.columns if c.startswith('spend_')]
+    scored = features[outcome].notna() & features[spend_columns].notna().all(axis=1)
+    data = features[scored].sort_values('start_day')
+    start = data['start_day'].to_numpy()
+    if len(start) == 0:
+        return pd.DataFrame(columns=['window_end', 'projects'] + spend_columns)
+
+    # Centred first (correlation is shift-invariant) to keep the sums well conditioned
+    y = data[outcome].to_numpy(dtype=float)[:, None]
+    x = data[spend_columns].to_numpy(dtype=float)
+    y = y - y.mean()
+    x = x - x.mean(axis=0)
+
+    def prefix(values):
+        out = np.zeros((len(values) + 1,) + values.shape[1:])
+        np.cumsum(values, axis=0, out=out[1:])
+        return out
+
+    ones = np.ones_like(y)
+    sums = [prefix(v) for v in (ones, x, np.broadcast_to(y, x.shape), x * x,
+                                np.broadcast_to(y * y, x.shape), x * y)]
+
+    window_end = np.arange(start.min() + window_days - 1, start.max() + step_days, step_days)
+    lo = np.searchsorted(start, window_end - window_days, side='right')
+    hi = np.searchsorted(start, window_end, side='right')
+    n, sx, sy, sxx, syy, sxy = (s[hi] - s[lo] for s in sums)
+    r = _pearson(n, sx, sy, sxx, syy, sxy)
+
+    result = pd.DataFrame(r, columns=spend_columns)
+    result.insert(0, 'projects', n[:, 0].astype(int))
+    result.insert(0, 'window_end', window_end.astype('datetime64[D]'))
+    return result
+
+
+def correlations(features, outcomes=OUTCOMES, by=None):
+    """Whole-period correlation of each band's spend with each outcome (optionally per group)"""
+
+    spend_columns = [c for c in features.columns if c.startswith('spend_')]
+    groups = [(None, features)] if by is None else features.groupby(by)
+    rows = []
+    for key, group in groups:
+        for outcome in outcomes:
+            row = {} if by is None else {by: key}
+            row['outcome'] = outcome
+            row.update(group[spend_columns].corrwith(group[outcome]).to_dict())
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main():
+    """Main execution function"""
+
+    parser = argparse.ArgumentParser(description="Correlate procurement spend with NADeF community outcomes")
+    parser.add_argument('--transactions', default='../output/procurement_transactions.csv')
+    parser.add_argument('--suppliers', default='../output/supplier_registry.csv')
+    parser.add_argument('--projects', default='../output/nadef_projects.csv')
+    parser.add_argument('--lead-days', type=int, default=365,
+                        help="Spend this many days before a project start counts towards it")
+    parser.add_argument('--window-days', type=int, default=3 * 365)
+    parser.add_argument('--step-days', type=int, default=91)
+    parser.add_argument('--community-sites',
+                        help="JSON {community: delivery location(s)}; only spend delivered there counts "
+                             "towards the community's projects (default: mine-wide spend)")
+    parser.add_argument('--outcome', choices=OUTCOMES, default='impact_score')
+    parser.add_argument('--output', help="Write the rolling correlations as CSV to this path")
+    args = parser.parse_args()
+
+    print("Correlating Supplier Spend with Community Impact...")
+    print("-" * 50)
+
+    transactions_df = pd.read_csv(args.transactions, usecols=[
+        'supplier_id', 'transaction_date', 'contract_value_usd', 'currency', 'delivery_location'])
+    supplier_df = pd.read_csv(args.suppliers, usecols=['supplier_id', 'distance_from_mine_km'])
+    projects_df = pd.read_csv(args.projects)
+
+    community_sites = None
+    if args.community_sites:
+        with open(args.community_sites) as handle:
+            community_sites = json.load(handle)
+
+    timeline = SpendTimeline(transactions_df, supplier_df)
+    features = project_spend(projects_df, timeline, lead_days=args.lead_days, community_sites=community_sites)
+
+    print(f"\nProjects: {len(features):,}  Transactions: {len(transactions_df):,}")
+    if community_sites is None:
+        print("Spend Attribution: mine-wide (no community -> delivery location mapping)")
+    else:
+        matched = features[[c for c in features.columns if c.startswith('spend_')]].notna().all(axis=1)
+        print(f"Spend Attribution: by delivery location, {matched.sum():,} projects in mapped communities")
+    print("\nCorrelation of Spend by Supplier Distance with Project Outcomes:")
+    print(correlations(features).set_index('outcome').round(3))
+
+    rolling = rolling_correlation(features, args.outcome, args.window_days, args.step_days)
+    print(f"\nRolling {args.window_days}-day Correlation with {args.outcome} (latest windows):")
+    spend_columns = [c for c in rolling.columns if c.startswith('spend_')]
+    print(rolling.tail(8).round({c: 3 for c in spend_columns}).to_string(index=False))
+
+    if args.output:
+        rolling.to_csv(args.output, index=False)
+        print(f"\nRolling correlations saved to: {args.output}")
+
+    print("-" * 50)
+    print("Spend / Impact Correlation Complete!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Streaming Output Helpers
+Appends generator record batches to disk as they are produced so peak
+memory is bounded by the batch size rather than the dataset size
+"""
+
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import phase
+
+# Rows per batch when a generator runs in streaming mode
+DEFAULT_BATCH_SIZE = 100000
+
+
+def write_csv_batches(batches, output_path):
+    """Append DataFrame batches to a single CSV, writing the header once
+
+    Returns the total number of rows written.
+    """
+
+    rows_written = 0
+    header = True
+    tmp_path = output_path + '.partial'
+
+    # Write to a side file so a failed run never leaves a truncated dataset behind
+    with open(tmp_path, 'w', newline='') as handle:
+        for batch in batches:
+            with phase('write.csv', rows=len(batch)):
+                batch.to_csv(handle, index=False, header=header)
+            header = False
+            rows_written += len(batch)
+
+    os.replace(tmp_path, output_path)
+    return rows_written
+
+
+def format_ids(prefix, first, count, width):
+    """Vectorized f'{prefix}{i:0{width}d}' for i in first..first+count-1"""
+    numbers = pd.Series(np.arange(first, first + count)).astype(str).str.zfill(width)
+    return numbers.radd(prefix).to_numpy()
+
+
+def seed_globals(seed):
+    """Re-seed the module-level RNGs the loop-based generators draw from"""
+    np.random.seed(seed)
+    random.seed(seed)
+    # Imported here: generate_suppliers itself imports this module
+    import generate_suppliers
+    if generate_suppliers.fake is not None:
+        generate_suppliers.Faker.seed(seed)
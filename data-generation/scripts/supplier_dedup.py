@@ -0,0 +1,359 @@
+"""
+Supplier Entity Resolution
+Clusters duplicate supplier records (Ltd/Limited variants, re-registrations,
+merged registries) without O(n^2) pairwise comparison: candidate pairs come
+from blocking keys (normalized name, TIN, website domain, MinHash LSH bands)
+and are scored with vectorized signature comparisons, confirmed on exact
+trigram similarity. Records are never clustered with a different TIN
+"""
+
+import pandas as pd
+import numpy as np
+
+# Legal-form tokens ignored when comparing company names
+LEGAL_SUFFIXES = ['ltd', 'limited', 'co', 'company', 'plc', 'llc', 'inc', 'group', 'and', 'sons']
+
+# Tokens most registered names share, which would otherwise dominate short names
+COMMON_NAME_TOKENS = ['ghana']
+
+NUM_HASHES = 16
+BAND_SIZE = 4
+NAME_WIDTH = 48
+
+# Largest sorted-neighbourhood window compared inside one block
+MAX_BLOCK_WINDOW = 50
+
+# Candidate pairs scored per vectorized step (bounds scoring memory)
+SCORE_CHUNK = 1000000
+
+# Pairs checked per exact trigram comparison step (each pair compares two trigram rows)
+VERIFY_CHUNK = 20000
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+_NO_TRIGRAM = np.uint32(0xFFFFFFFF)
+
+# Union-find state of a TIN-less component that matches several TINs equally well
+_BLOCKED = -2
+
+
+def normalize_company_names(names):
+    """Lower-case, strip punctuation, legal suffixes and common tokens, collapse whitespace"""
+
+    normalized = (
+        pd.Series(names, dtype='string').fillna('')
+        .str.lower()
+        .str.replace(r'[^a-z0-9 ]+', ' ', regex=True)
+        .str.replace(r'\b(?:' + '|'.join(LEGAL_SUFFIXES + COMMON_NAME_TOKENS) + r')\b', ' ', regex=True)
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+    )
+    return normalized
+
+
+def website_domains(websites):
+    """Registrable part of the website (scheme and www. removed)"""
+    return (
+        pd.Series(websites, dtype='string').fillna('')
+        .str.lower()
+        .str.replace(r'^(?:https?://)?(?:www\.)?', '', regex=True)
+        .str.split('/').str[0]
+    )
+
+
+def minhash_signatures(normalized_names, num_hashes=NUM_HASHES, seed=42, chunk_size=100000):
+    """MinHash signatures over character trigrams, computed on a byte matrix
+
+    Names shorter than three characters have no trigrams and all get the
+    same all-0xFFFFFFFF signature; callers must not compare those rows by
+    signature (see has_trigrams).
+    """
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, size=num_hashes, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, size=num_hashes, dtype=np.uint64)
+    empty = np.iinfo(np.uint64).max
+
+    names = normalized_names.str.slice(0, NAME_WIDTH).fillna('').tolist()
+    signatures = np.empty((len(names), num_hashes), dtype=np.uint32)
+
+    for start in range(0, len(names), chunk_size):
+        padded = np.array(names[start:start + chunk_size], dtype=f'S{NAME_WIDTH}')
+        chars = padded.view(np.uint8).reshape(len(padded), NAME_WIDTH).astype(np.uint64)
+
+        trigrams = (chars[:, :-2] << np.uint64(16)) | (chars[:, 1:-1] << np.uint64(8)) | chars[:, 2:]
+        valid = chars[:, 2:] != 0
+
+        for k in range(num_hashes):
+            hashed = (trigrams * a[k] + b[k]) % _MERSENNE_PRIME
+            # Keeping the low 32 bits halves pair-scoring memory traffic
+            signatures[start:start + len(padded), k] = np.where(valid, hashed, empty).min(axis=1) & np.uint64(0xFFFFFFFF)
+    return signatures
+
+
+def has_trigrams(normalized_names):
+    """Rows whose normalized name has at least one character trigram"""
+    return (normalized_names.fillna('').str.len() >= 3).to_numpy(dtype=bool)
+
+
+def _trigram_rows(names):
+    """Distinct character trigrams of each name, one sorted uint32 row per name
+
+    Rows are padded (and repeated trigrams blanked) with _NO_TRIGRAM.
+    """
+
+    padded = np.array(names, dtype=f'S{NAME_WIDTH}')
+    chars = padded.view(np.uint8).reshape(len(padded), NAME_WIDTH).astype(np.uint32)
+    trigrams = (chars[:, :-2] << np.uint32(16)) | (chars[:, 1:-1] << np.uint32(8)) | chars[:, 2:]
+    trigrams = np.sort(np.where(chars[:, 2:] != 0, trigrams, _NO_TRIGRAM), axis=1)
+    trigrams[:, 1:][trigrams[:, 1:] == trigrams[:, :-1]] = _NO_TRIGRAM
+    return trigrams
+
+
+def trigram_jaccard(left_names, right_names):
+    """Exact Jaccard similarity of the character trigram sets of paired names"""
+
+    left, right = _trigram_rows(left_names), _trigram_rows(right_names)
+    valid = left != _NO_TRIGRAM
+    shared = ((left[:, :, None] == right[:, None, :]) & valid[:, :, None]).sum(axis=(1, 2))
+    union = valid.sum(axis=1) + (right != _NO_TRIGRAM).sum(axis=1) - shared
+    return np.where(union > 0, shared / np.maximum(union, 1), 0.0)
+
+
+def _band_keys(signatures, band_size=BAND_SIZE):
+    """One hashable key per LSH band (rows agreeing on a band are candidates)"""
+    keys = []
+    for start in range(0, signatures.shape[1], band_size):
+        band = signatures[:, start:start + band_size]
+        mixed = np.zeros(len(band), dtype=np.uint64)
+        for column in band.T:
+            mixed = mixed * np.uint64(1000003) ^ column.astype(np.uint64)
+        keys.append(mixed)
+    return keys
+
+
+def _block_pairs(keys, valid, window=MAX_BLOCK_WINDOW):
+    """Candidate pairs sharing a blocking key, via a sorted-neighbourhood sweep"""
+
+    positions = np.flatnonzero(valid)
+    if len(positions) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    codes = pd.factorize(keys[positions])[0]
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    sorted_positions = positions[order]
+
+    pairs = []
+    for offset in range(1, min(window, len(order))):
+        same = sorted_codes[:-offset] == sorted_codes[offset:]
+        if not same.any():
+            break
+        pairs.append(np.column_stack([sorted_positions[:-offset][same], sorted_positions[offset:][same]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(pairs)
+
+
+def connected_components(num_nodes, edges):
+    """Component label (smallest member position) for each node"""
+
+    labels = np.arange(num_nodes)
+    if len(edges) == 0:
+        return labels
+    u, v = edges[:, 0], edges[:, 1]
+    while True:
+        previous = labels.copy()
+        low = np.minimum(labels[u], labels[v])
+        np.minimum.at(labels, u, low)
+        np.minimum.at(labels, v, low)
+        labels = labels[labels]  # pointer jumping
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def _ambiguous_records(components, scores, component_tin):
+    """TIN-less components whose best matches hold different TINs
+
+    Such a record (e.g. a name shared by several registered suppliers)
+    cannot be attributed to any of them.
+    """
+
+    tins = component_tin[components]
+    source = np.concatenate([components[:, 0], components[:, 1]])
+    source_tin = np.concatenate([tins[:, 0], tins[:, 1]])
+    target_tin = np.concatenate([tins[:, 1], tins[:, 0]])
+    links = pd.DataFrame({'source': source, 'tin': target_tin, 'score': np.concatenate([scores, scores])})
+    links = links[(source_tin < 0) & (target_tin >= 0)]
+    best = links[links['score'] == links.groupby('source')['score'].transform('max')]
+    distinct = best.groupby('source')['tin'].nunique()
+    ambiguous = np.zeros(len(component_tin), dtype=bool)
+    ambiguous[distinct.index[distinct > 1].to_numpy()] = True
+    return ambiguous
+
+
+def tin_consistent_components(num_nodes, tin_edges, soft_edges, scores, tin_codes):
+    """Component labels (smallest member position) that never mix two TINs
+
+    Same-TIN edges are merged first; soft edges (strongest first) are then
+    applied with a union-find that refuses a merge when both components
+    already hold a TIN and the TINs differ, so a record without a TIN cannot
+    bridge two registered suppliers. A component holding an ambiguous
+    record (_BLOCKED) may grow with TIN-less records but never joins a TIN.
+    """
+
+    labels = connected_components(num_nodes, tin_edges)
+    component_tin = np.full(num_nodes, -1, dtype=np.int64)
+    np.maximum.at(component_tin, labels, tin_codes)
+    # Between two TIN holders a soft edge is either redundant or vetoed
+    open_ended = (tin_codes[soft_edges] < 0).any(axis=1)
+    soft_edges, scores = soft_edges[open_ended], scores[open_ended]
+
+    parent = list(range(num_nodes))
+    tin = np.where(_ambiguous_records(labels[soft_edges], scores, component_tin),
+                   _BLOCKED, component_tin).tolist()
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for u, v in labels[soft_edges].tolist():
+        root_u, root_v = find(u), find(v)
+        if root_u == root_v:
+            continue
+        tin_u, tin_v = tin[root_u], tin[root_v]
+        if (tin_u >= 0 and tin_v >= 0 and tin_u != tin_v) or min(tin_u, tin_v) == _BLOCKED and max(tin_u, tin_v) >= 0:
+            continue
+        root, child = min(root_u, root_v), max(root_u, root_v)
+        parent[child] = root
+        tin[root] = max(tin_u, tin_v) if max(tin_u, tin_v) >= 0 else min(tin_u, tin_v)
+
+    roots = np.array([find(label) for label in labels.tolist()], dtype=np.int64)
+    smallest = np.full(num_nodes, num_nodes, dtype=np.int64)
+    np.minimum.at(smallest, roots, np.arange(num_nodes))
+    return smallest[roots]
+
+
+def resolve_suppliers(supplier_df, name_threshold=0.75, tin_veto=True):
+    """Cluster duplicate suppliers and return the registry with canonical ids
+
+    Adds cluster_id (the first supplier_id of each cluster) and cluster_size.
+    Same TIN always matches; same domain or a name similarity of at least
+    name_threshold matches (MinHash candidates confirmed on exact trigram
+    Jaccard). With tin_veto, no cluster holds two different TINs, even
+    through records that have none. Soft matches are merged strongest first.
+    """
+
+    df = supplier_df.reset_index(drop=True)
+    n = len(df)
+
+    names = normalize_company_names(df['company_name'])
+    tins = pd.Series(df['tax_id'], dtype='string').str.upper().str.replace(r'[^A-Z0-9]', '', regex=True)
+    domains = website_domains(df['website']) if 'website' in df else pd.Series('', index=df.index)
+    signatures = minhash_signatures(names)
+
+    # Integer codes (-1 = missing) keep pair comparisons off Python objects
+    tin_codes = pd.factorize(tins.replace('', pd.NA))[0]
+    domain_codes = pd.factorize(domains.replace('', pd.NA))[0]
+    name_codes = pd.factorize(names.replace('', pd.NA))[0]
+    has_tin = tin_codes >= 0
+    has_domain = domain_codes >= 0
+    has_name = name_codes >= 0
+    # Names without trigrams share one signature, so they only match exactly
+    shingled = has_trigrams(names)
+    name_values = names.to_numpy(dtype=object)
+
+    def accept(pairs):
+        """Vectorized scoring of soft candidate pairs, in bounded-size chunks
+
+        Returns the accepted pairs and their scores (name similarity, 1 for a
+        shared domain).
+        """
+        kept, scores = [], []
+        for start in range(0, len(pairs), SCORE_CHUNK):
+            chunk = pairs[start:start + SCORE_CHUNK]
+            left, right = chunk[:, 0], chunk[:, 1]
+            allowed = np.ones(len(chunk), dtype=bool)
+            if tin_veto:
+                allowed = ~(has_tin[left] & has_tin[right] & (tin_codes[left] != tin_codes[right]))
+            compared = shingled[left] & shingled[right]
+            similarity = np.where(
+                compared,
+                (signatures[left] == signatures[right]).mean(axis=1),
+                (name_codes[left] == name_codes[right]) & has_name[left])
+            # 16 hashes give a noisy estimate: confirm MinHash matches of distinct names
+            # on the exact trigram sets
+            check = np.flatnonzero(allowed & compared & (similarity >= name_threshold)
+                                   & (name_codes[left] != name_codes[right]))
+            for first in range(0, len(check), VERIFY_CHUNK):
+                rows = check[first:first + VERIFY_CHUNK]
+                similarity[rows] = trigram_jaccard(name_values[left[rows]], name_values[right[rows]])
+            same_domain = (domain_codes[left] == domain_codes[right]) & has_domain[left]
+            accepted = allowed & ((similarity >= name_threshold) | same_domain)
+            kept.append(chunk[accepted])
+            scores.append(np.where(same_domain, 1.0, similarity)[accepted])
+        if not kept:
+            return np.empty((0, 2), dtype=np.int64), np.empty(0)
+        return np.concatenate(kept), np.concatenate(scores)
+
+    def unique_pairs(pairs, scores):
+        """Drop duplicate (unordered) pairs found by several blocking keys; (pairs, scores) strongest first"""
+        if len(pairs) == 0:
+            return pairs, scores
+        pairs = np.sort(pairs, axis=1)
+        first = np.unique(pairs[:, 0] * n + pairs[:, 1], return_index=True)[1]
+        first = first[np.argsort(-scores[first], kind='stable')]
+        return pairs[first], scores[first]
+
+    # Strong key: identical TIN
+    tin_pairs = _block_pairs(tin_codes, has_tin)
+
+    # Soft keys (identical normalized name, identical domain, shared LSH band),
+    # scored key by key so only accepted pairs are held in memory
+    soft = [accept(_block_pairs(name_codes, has_name)), accept(_block_pairs(domain_codes, has_domain))]
+    for band in _band_keys(signatures):
+        soft.append(accept(_block_pairs(band, shingled)))
+    soft_edges, soft_scores = unique_pairs(np.concatenate([pairs for pairs, _ in soft]),
+                              np.concatenate([scores for _, scores in soft]))
+
+    if tin_veto:
+        labels = tin_consistent_components(n, tin_pairs, soft_edges, soft_scores, tin_codes)
+    else:
+        labels = connected_components(n, np.concatenate([tin_pairs, soft_edges]))
+
+    result = df.copy()
+    result['cluster_id'] = df['supplier_id'].to_numpy()[labels]
+    result['cluster_size'] = result.groupby('cluster_id')['supplier_id'].transform('size')
+    return result
+
+
+def merge_registries(*registries, name_threshold=0.75, tin_veto=True):
+    """Concatenate registries and resolve duplicates across (and within) them"""
+    combined = pd.concat(registries, ignore_index=True)
+    return resolve_suppliers(combined, name_threshold=name_threshold, tin_veto=tin_veto)
+
+
+def main():
+    """Main execution function"""
+
+    print("Starting Supplier Entity Resolution...")
+    print("-" * 50)
+
+    supplier_df = pd.read_csv('../output/supplier_registry.csv')
+    resolved = resolve_suppliers(supplier_df)
+
+    duplicates = resolved[resolved['cluster_size'] > 1]
+    print(f"\nSuppliers: {len(resolved)}")
+    print(f"Canonical Entities: {resolved['cluster_id'].nunique()}")
+    print(f"Records in Duplicate Clusters: {len(duplicates)}")
+    if len(duplicates):
+        print("\nSample Clusters:")
+        print(duplicates.sort_values('cluster_id')[['cluster_id', 'supplier_id', 'company_name', 'tax_id']].head(10))
+
+    print("-" * 50)
+    print("Supplier Entity Resolution Complete!")
+
+if __name__ == "__main__":
+    main()
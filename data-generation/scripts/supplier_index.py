@@ -0,0 +1,173 @@
+"""
+Supplier Sampling Index
+Precomputed, integer-coded supplier pools for fast weighted supplier draws
+Built once from the supplier registry and shared by all simulations
+"""
+
+import pandas as pd
+import numpy as np
+
+# Distance bands (km from mine) used for geographic pools
+DISTANCE_BAND_EDGES = [0, 25, 100, 500]
+DISTANCE_BAND_LABELS = ['0-25km', '25-100km', '100-500km', '500km+']
+
+LOCAL_CLASSIFICATIONS = ['Local-Local', 'Ghanaian Owned']
+
+
+class LocalPreferenceCurve:
+    """Probability that a transaction is steered to a local supplier, by year
+
+    Defaults reproduce the original policy ramp min(0.7, 0.2 + (year-2010)*0.03).
+    overrides maps individual years to an explicit share.
+    """
+
+    def __init__(self, base=0.2, slope=0.03, cap=0.7, start_year=2010, overrides=None):
+        self.base = base
+        self.slope = slope
+        self.cap = cap
+        self.start_year = start_year
+        self.overrides = dict(overrides or {})
+
+    def __call__(self, year):
+        """Local preference for a scalar year or an array of years"""
+        if np.ndim(year) == 0:
+            if year in self.overrides:
+                return self.overrides[year]
+            return min(self.cap, self.base + (year - self.start_year) * self.slope)
+
+        year = np.asarray(year)
+        share = np.minimum(self.cap, self.base + (year - self.start_year) * self.slope)
+        for override_year, override_share in self.overrides.items():
+            share = np.where(year == override_year, override_share, share)
+        return share
+
+
+def build_alias_table(weights):
+    """Vose alias table for O(1) weighted draws"""
+
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    total = weights.sum()
+    if n == 0 or total <= 0:
+        raise ValueError("Alias table requires positive weights")
+
+    scaled = weights * n / total
+    prob = np.zeros(n)
+    alias = np.zeros(n, dtype=np.int64)
+
+    small = [i for i in range(n) if scaled[i] < 1.0]
+    large = [i for i in range(n) if scaled[i] >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+
+    # Leftovers are 1.0 up to floating point error
+    for i in large + small:
+        prob[i] = 1.0
+        alias[i] = i
+
+    return prob, alias
+
+
+class SupplierPool:
+    """Supplier row positions plus an optional alias table for weighted draws"""
+
+    def __init__(self, positions, weights=None):
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.alias = None
+        if weights is not None and len(self.positions) > 0:
+            self.alias = build_alias_table(weights)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def sample(self, rng, size):
+        """Draw supplier row positions from the pool in O(1) per draw"""
+        if len(self.positions) == 0:
+            raise ValueError("Cannot sample from an empty supplier pool")
+
+        column = rng.integers(0, len(self.positions), size=size)
+        if self.alias is not None:
+            prob, alias = self.alias
+            column = np.where(rng.random(size) < prob[column], column, alias[column])
+        return self.positions[column]
+
+
+class SupplierIndex:
+    """Integer-coded supplier pools by tier, category and distance band"""
+
+    def __init__(self, supplier_df, weight_column=None):
+        self.supplier_df = supplier_df.reset_index(drop=True)
+        self.weight_column = weight_column
+
+        # Integer codes for each pool dimension
+        self.classification_codes, self.classifications = pd.factorize(
+            self.supplier_df['classification'])
+        self.category_codes, self.categories = pd.factorize(
+            self.supplier_df['primary_category'])
+        self.distance_band_codes = np.searchsorted(
+            DISTANCE_BAND_EDGES, self.supplier_df['distance_from_mine_km'].to_numpy(),
+            side='right') - 1
+        self.is_local = self.supplier_df['classification'].isin(LOCAL_CLASSIFICATIONS).to_numpy()
+
+        if weight_column is not None:
+            self.weights = self.supplier_df[weight_column].fillna(0).to_numpy(dtype=float)
+        else:
+            self.weights = None
+
+        self._pools = {}
+
+    @classmethod
+    def from_csv(cls, supplier_file='../output/supplier_registry.csv', weight_column=None):
+        """Build the index straight from supplier_registry.csv"""
+        return cls(pd.read_csv(supplier_file), weight_column=weight_column)
+
+    def _code(self, labels, value):
+        """Integer code for a label, -1 when the label is not in the registry"""
+        matches = np.flatnonzero(np.asarray(labels) == value)
+        return matches[0] if len(matches) else -1
+
+    def pool(self, tier=None, category=None, distance_band=None, local=None):
+        """Supplier pool matching all given filters (built once, then cached)"""
+
+        key = (tier, category, distance_band, local)
+        if key not in self._pools:
+            mask = np.ones(len(self.supplier_df), dtype=bool)
+            if tier is not None:
+                tiers = [tier] if isinstance(tier, str) else list(tier)
+                codes = [self._code(self.classifications, t) for t in tiers]
+                mask &= np.isin(self.classification_codes, codes)
+            if category is not None:
+                mask &= self.category_codes == self._code(self.categories, category)
+            if distance_band is not None:
+                mask &= self.distance_band_codes == DISTANCE_BAND_LABELS.index(distance_band)
+            if local is not None:
+                mask &= self.is_local == local
+
+            positions = np.flatnonzero(mask)
+            weights = self.weights[positions] if self.weights is not None else None
+            self._pools[key] = SupplierPool(positions, weights)
+
+        return self._pools[key]
+
+    def sample(self, rng, size, **filters):
+        """Draw supplier row positions from the pool matching the filters"""
+        return self.pool(**filters).sample(rng, size)
+
+    def sample_local_biased(self, rng, years, local_preference):
+        """Draw one supplier per transaction year, steering to local tiers by year"""
+
+        years = np.asarray(years)
+        positions = self.pool().sample(rng, len(years))
+        local_pool = self.pool(local=True)
+        if len(local_pool) > 0:
+            prefer_local = rng.random(len(years)) < local_preference(years)
+            positions[prefer_local] = local_pool.sample(rng, prefer_local.sum())
+        return positions